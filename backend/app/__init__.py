@@ -1,2 +1,7 @@
-# app/routers/__init__.py
-# Makes "routers" a Python package.
+# app/__init__.py
+# Makes "app" a Python package, and loads backend/.env once, before any
+# app module reads its settings with os.getenv at import time.
+
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,260 @@
+# app/admin_analytics.py
+# Materialised institution analytics for the admin dashboards.
+#
+# institution_daily_stats (institution x day x role) and
+# teacher_roster_daily_stats (teacher x day) are derived from the per-user
+# rollup in user_daily_stats. course_daily_stats (institution x day x
+# course) needs the course of each task, so it is computed from tasks and
+# task_sessions, but only for the institution days the rollup flags. A
+# refresh only recomputes the (institution, day) / (teacher, day) keys
+# whose source rows changed since the last run, so its cost follows
+# recent activity rather than institution size.
+#
+# Membership changes (institution_users, student_teacher) and tasks moved
+# to another course don't touch user_daily_stats; they are folded in by
+# the periodic full refresh, or on demand with
+# `python -m app.cli refresh-analytics --full`.
+#
+# Each refresh first counts the open tasks that went past their due date
+# since the last one (app.rollups.record_overdue), so tasks_overdue lags
+# by at most one refresh interval.
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app import models, rollups
+from app.db import async_engine
+
+logger = logging.getLogger(__name__)
+
+REFRESH_JOB = "institution_analytics"
+
+# 0 disables the in-process scheduler (e.g. when a cron job runs the CLI)
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+# 0 disables periodic full refreshes
+ANALYTICS_FULL_REFRESH_HOURS = float(os.getenv("ANALYTICS_FULL_REFRESH_HOURS", "24"))
+
+# Rows whose transaction commits after a later updated_at was already seen
+# would otherwise be skipped; recomputing a key twice is harmless.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+_ACTIVE = "u.planned_minutes > 0 OR u.tasks_completed > 0"
+_SUMS = """
+    sum(u.planned_minutes), sum(u.completed_minutes), sum(u.skipped_sessions),
+    sum(u.tasks_completed), sum(u.tasks_overdue)
+"""
+_FIELDS = "planned_minutes, completed_minutes, skipped_sessions, tasks_completed, tasks_overdue"
+
+_INSERT_INSTITUTION_DAYS = f"""
+    INSERT INTO institution_daily_stats (institution_id, day, role, active_users, {_FIELDS})
+    SELECT iu.institution_id, u.day, iu.role, count(*) FILTER (WHERE {_ACTIVE}), {_SUMS}
+    FROM user_daily_stats u
+    JOIN institution_users iu ON iu.user_id = u.user_id
+    {{scope}}
+    GROUP BY iu.institution_id, u.day, iu.role
+"""
+
+_INSERT_ROSTER_DAYS = f"""
+    INSERT INTO teacher_roster_daily_stats (institution_id, teacher_id, day, active_students, {_FIELDS})
+    SELECT iu.institution_id, st.teacher_id, u.day, count(*) FILTER (WHERE {_ACTIVE}), {_SUMS}
+    FROM user_daily_stats u
+    JOIN student_teacher st ON st.student_id = u.user_id
+    JOIN institution_users iu ON iu.user_id = st.teacher_id AND iu.role = 'teacher'
+    {{scope}}
+    GROUP BY iu.institution_id, st.teacher_id, u.day
+"""
+
+# {scope} limits a timestamp column to the institution days being refreshed
+_COURSE_WORK = """
+    SELECT iu.institution_id, (s.start_at AT TIME ZONE 'UTC')::date AS day, t.course_id, s.user_id,
+        floor(extract(epoch FROM s.end_at - s.start_at) / 60)::int AS planned_minutes,
+        CASE WHEN s.status = 'completed'
+            THEN floor(extract(epoch FROM s.end_at - s.start_at) / 60)::int ELSE 0 END AS completed_minutes,
+        (s.status = 'skipped')::int AS skipped_sessions, 0 AS tasks_completed, 0 AS tasks_overdue
+    FROM task_sessions s
+    JOIN tasks t ON t.id = s.task_id AND t.course_id IS NOT NULL
+    JOIN institution_users iu ON iu.user_id = s.user_id AND iu.role = 'student'
+    {sessions}
+    UNION ALL
+    SELECT iu.institution_id, (t.completed_at AT TIME ZONE 'UTC')::date, t.course_id, t.user_id, 0, 0, 0, 1, 0
+    FROM tasks t
+    JOIN institution_users iu ON iu.user_id = t.user_id AND iu.role = 'student'
+    {completed}
+    WHERE t.course_id IS NOT NULL AND t.status = 'completed' AND t.completed_at IS NOT NULL
+    UNION ALL
+    SELECT iu.institution_id, (t.due_at AT TIME ZONE 'UTC')::date, t.course_id, t.user_id, 0, 0, 0, 0, 1
+    FROM tasks t
+    JOIN institution_users iu ON iu.user_id = t.user_id AND iu.role = 'student'
+    {due}
+    WHERE t.course_id IS NOT NULL AND t.overdue_counted
+"""
+
+_INSERT_COURSE_DAYS = f"""
+    INSERT INTO course_daily_stats (institution_id, day, course, active_students, {_FIELDS})
+    SELECT w.institution_id, w.day, lower(btrim(c.title)),
+        count(DISTINCT w.user_id) FILTER (WHERE w.planned_minutes > 0 OR w.tasks_completed > 0),
+        sum(w.planned_minutes), sum(w.completed_minutes), sum(w.skipped_sessions),
+        sum(w.tasks_completed), sum(w.tasks_overdue)
+    FROM ({{work}}) w
+    JOIN courses c ON c.id = w.course_id
+    GROUP BY w.institution_id, w.day, lower(btrim(c.title))
+"""
+
+
+def _in_refresh_days(column: str) -> str:
+    return (
+        "JOIN refresh_institution_days k ON k.institution_id = iu.institution_id"
+        f" AND {column} >= k.day::timestamp AT TIME ZONE 'UTC'"
+        f" AND {column} < (k.day + 1)::timestamp AT TIME ZONE 'UTC'"
+    )
+
+FULL_REFRESH_SQL = (
+    "DELETE FROM institution_daily_stats",
+    "DELETE FROM teacher_roster_daily_stats",
+    "DELETE FROM course_daily_stats",
+    _INSERT_INSTITUTION_DAYS.format(scope=""),
+    _INSERT_ROSTER_DAYS.format(scope=""),
+    _INSERT_COURSE_DAYS.format(work=_COURSE_WORK.format(sessions="", completed="", due="")),
+)
+
+# :since is bound; the temp tables hold the keys to recompute
+INCREMENTAL_REFRESH_SQL = (
+    """
+    CREATE TEMP TABLE refresh_user_days ON COMMIT DROP AS
+    SELECT DISTINCT user_id, day FROM user_daily_stats WHERE updated_at > :since
+    """,
+    """
+    CREATE TEMP TABLE refresh_institution_days ON COMMIT DROP AS
+    SELECT DISTINCT iu.institution_id, k.day
+    FROM refresh_user_days k
+    JOIN institution_users iu ON iu.user_id = k.user_id
+    """,
+    """
+    CREATE TEMP TABLE refresh_roster_days ON COMMIT DROP AS
+    SELECT DISTINCT iu.institution_id, st.teacher_id, k.day
+    FROM refresh_user_days k
+    JOIN student_teacher st ON st.student_id = k.user_id
+    JOIN institution_users iu ON iu.user_id = st.teacher_id AND iu.role = 'teacher'
+    """,
+    """
+    DELETE FROM institution_daily_stats s USING refresh_institution_days k
+    WHERE s.institution_id = k.institution_id AND s.day = k.day
+    """,
+    """
+    DELETE FROM teacher_roster_daily_stats s USING refresh_roster_days k
+    WHERE s.institution_id = k.institution_id AND s.teacher_id = k.teacher_id AND s.day = k.day
+    """,
+    """
+    DELETE FROM course_daily_stats s USING refresh_institution_days k
+    WHERE s.institution_id = k.institution_id AND s.day = k.day
+    """,
+    _INSERT_INSTITUTION_DAYS.format(
+        scope="JOIN refresh_institution_days k ON k.institution_id = iu.institution_id AND k.day = u.day"
+    ),
+    _INSERT_ROSTER_DAYS.format(
+        scope="JOIN refresh_roster_days k ON k.institution_id = iu.institution_id"
+              " AND k.teacher_id = st.teacher_id AND k.day = u.day"
+    ),
+    _INSERT_COURSE_DAYS.format(work=_COURSE_WORK.format(
+        sessions=_in_refresh_days("s.start_at"),
+        completed=_in_refresh_days("t.completed_at"),
+        due=_in_refresh_days("t.due_at"),
+    )),
+)
+
+
+def _full_refresh_due(state, now: datetime) -> bool:
+    if state is None or state.watermark is None or state.full_refreshed_at is None:
+        return True
+    if ANALYTICS_FULL_REFRESH_HOURS <= 0:
+        return False
+    return now - state.full_refreshed_at >= timedelta(hours=ANALYTICS_FULL_REFRESH_HOURS)
+
+
+async def refresh(
+    conn: AsyncConnection, full: bool = False, min_interval: timedelta | None = None,
+) -> dict | None:
+    """
+    Bring the materialised tables up to date inside the caller's
+    transaction. Returns a summary, or None if another process is
+    already refreshing, or (with min_interval) refreshed less than
+    min_interval ago.
+    """
+    locked = await conn.scalar(
+        text("SELECT pg_try_advisory_xact_lock(hashtext(:job))"), {"job": REFRESH_JOB}
+    )
+    if not locked:
+        return None
+
+    started = time.monotonic()
+    now = datetime.now(timezone.utc)
+    state_table = models.AnalyticsRefreshState.__table__
+    state = (await conn.execute(
+        select(state_table).where(state_table.c.name == REFRESH_JOB)
+    )).first()
+    if (
+        min_interval is not None and state is not None and state.refreshed_at is not None
+        and now - state.refreshed_at < min_interval
+    ):
+        return None
+    full = full or _full_refresh_due(state, now)
+
+    newly_overdue = await rollups.record_overdue(conn, now)
+    new_watermark = await conn.scalar(text("SELECT max(updated_at) FROM user_daily_stats"))
+    if full:
+        mode = "full"
+        for statement in FULL_REFRESH_SQL:
+            await conn.execute(text(statement))
+    elif new_watermark is None or new_watermark <= state.watermark:
+        mode = "unchanged"
+        new_watermark = state.watermark
+    else:
+        mode = "incremental"
+        params = {"since": state.watermark - REFRESH_OVERLAP}
+        for statement in INCREMENTAL_REFRESH_SQL:
+            await conn.execute(text(statement), params)
+
+    duration_ms = int((time.monotonic() - started) * 1000)
+    values = {
+        "watermark": new_watermark,
+        "refreshed_at": now,
+        "duration_ms": duration_ms,
+    }
+    if full:
+        values["full_refreshed_at"] = now
+    stmt = pg_insert(state_table).values(name=REFRESH_JOB, **values)
+    await conn.execute(stmt.on_conflict_do_update(index_elements=[state_table.c.name], set_=values))
+
+    return {"mode": mode, "duration_ms": duration_ms, "refreshed_at": now, "newly_overdue": newly_overdue}
+
+
+async def run_refresh(full: bool = False, min_interval: timedelta | None = None) -> dict | None:
+    async with async_engine.begin() as conn:
+        return await refresh(conn, full=full, min_interval=min_interval)
+
+
+async def refresh_periodically() -> None:
+    """
+    Scheduler loop started from app.main in every worker. The first run
+    waits a random part of the interval, so workers started together
+    don't all refresh at boot; the advisory lock keeps runs apart, and a
+    run is skipped when another worker refreshed within half an interval.
+    """
+    min_interval = timedelta(seconds=ANALYTICS_REFRESH_SECONDS / 2)
+    await asyncio.sleep(random.uniform(0, ANALYTICS_REFRESH_SECONDS))
+    while True:
+        try:
+            await run_refresh(min_interval=min_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Institution analytics refresh failed")
+        await asyncio.sleep(ANALYTICS_REFRESH_SECONDS)
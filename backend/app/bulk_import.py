@@ -0,0 +1,218 @@
+# app/bulk_import.py
+# Streaming CSV user import used by POST /api/admin/import-users.
+#
+# Rows are parsed in fixed-size batches and copied into a temporary
+# staging table. Duplicate detection and the inserts into `users` and
+# `institution_users` then run as a few set-based statements, so memory
+# stays flat regardless of file size.
+#
+# The csv module reads the upload as a text stream, so quoted fields may
+# contain newlines; row numbers in the report are the line each record
+# starts on. Only the first IMPORT_MAX_REPORTED_ERRORS failed rows are
+# listed, with the number left out.
+
+import csv
+import io
+from uuid import UUID
+
+from email_validator import EmailNotValidError, validate_email
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_COLUMNS = ("email", "mobile_number", "user_id", "role")
+IMPORT_ROLES = ("student", "teacher")
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file isn't a CSV with the expected header."""
+
+
+_CREATE_STAGING = text("""
+    CREATE TEMPORARY TABLE user_import_staging (
+        row_no integer PRIMARY KEY,
+        email text,
+        mobile_number text,
+        name text,
+        role text,
+        error text,
+        user_id uuid
+    ) ON COMMIT DROP
+""")
+
+_INSERT_STAGING = text("""
+    INSERT INTO user_import_staging (row_no, email, mobile_number, name, role, error)
+    VALUES (:row_no, :email, :mobile_number, :name, :role, :error)
+""")
+
+# First occurrence of an email in the file wins.
+_MARK_FILE_DUPLICATES = text("""
+    UPDATE user_import_staging s
+    SET error = 'Duplicate email in file'
+    FROM (
+        SELECT row_no, row_number() OVER (PARTITION BY email ORDER BY row_no) AS rn
+        FROM user_import_staging
+        WHERE error IS NULL
+    ) d
+    WHERE d.row_no = s.row_no AND d.rn > 1
+""")
+
+_MARK_EXISTING = text("""
+    UPDATE user_import_staging s
+    SET error = 'Email already registered'
+    FROM users u
+    WHERE s.error IS NULL AND u.email = s.email
+""")
+
+_INSERT_USERS = text("""
+    WITH new_users AS (
+        INSERT INTO users (email, mobile_number, password_hash, account_type, name)
+        SELECT email, mobile_number, :password_hash, role, name
+        FROM user_import_staging
+        WHERE error IS NULL
+        ORDER BY row_no
+        ON CONFLICT (email) DO NOTHING
+        RETURNING id, email, account_type
+    ),
+    memberships AS (
+        INSERT INTO institution_users (user_id, institution_id, role)
+        SELECT id, :institution_id, account_type
+        FROM new_users
+    )
+    UPDATE user_import_staging s
+    SET user_id = n.id
+    FROM new_users n
+    WHERE s.email = n.email AND s.error IS NULL
+""")
+
+# Rows that lost an ON CONFLICT race with a concurrent registration
+_MARK_CONFLICTS = text("""
+    UPDATE user_import_staging
+    SET error = 'Email already registered'
+    WHERE error IS NULL AND user_id IS NULL
+""")
+
+_SUMMARY = text("""
+    SELECT count(*) FILTER (WHERE error IS NULL), count(*) FILTER (WHERE error IS NOT NULL)
+    FROM user_import_staging
+""")
+
+_ERRORS = text("""
+    SELECT row_no, email, error
+    FROM user_import_staging
+    WHERE error IS NOT NULL
+    ORDER BY row_no
+    LIMIT :limit
+""")
+
+
+def _read_records(reader, count: int) -> list[tuple[int, list[str]]]:
+    """Up to `count` non-blank (start line, values) records from a csv reader."""
+    records = []
+    while len(records) < count:
+        start_line = reader.line_num + 1
+        values = next(reader, None)
+        if values is None:
+            break
+        if any(value.strip() for value in values):
+            records.append((start_line, values))
+    return records
+
+
+def _parse_row(row_no: int, values: list[str], positions: dict) -> dict:
+    def field(name):
+        index = positions[name]
+        return values[index].strip() if index < len(values) else ""
+
+    row = {
+        "row_no": row_no,
+        "email": field("email") or None,
+        "mobile_number": field("mobile_number") or None,
+        "name": field("user_id") or None,
+        "role": field("role").lower() or None,
+        "error": None,
+    }
+
+    if not row["email"]:
+        row["error"] = "Missing email"
+    elif not row["name"]:
+        row["error"] = "Missing user_id"
+    elif row["role"] not in IMPORT_ROLES:
+        row["error"] = f"Role must be one of: {', '.join(IMPORT_ROLES)}"
+    else:
+        try:
+            row["email"] = validate_email(row["email"], check_deliverability=False).normalized
+        except EmailNotValidError:
+            row["error"] = "Invalid email"
+    return row
+
+
+async def _stage_rows(db: AsyncSession, upload: UploadFile) -> None:
+    # upload.file is a spooled temporary file: reads run in the threadpool
+    await upload.seek(0)
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        reader = csv.reader(stream)
+        try:
+            header = await run_in_threadpool(next, reader, None)
+        except csv.Error as exc:
+            raise ImportFormatError(f"Invalid CSV header: {exc}")
+        if header is None:
+            raise ImportFormatError("CSV file is empty")
+        header = [name.strip().lower() for name in header]
+        missing = [name for name in IMPORT_COLUMNS if name not in header]
+        if missing:
+            raise ImportFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+        positions = {name: header.index(name) for name in IMPORT_COLUMNS}
+
+        while True:
+            try:
+                records = await run_in_threadpool(_read_records, reader, IMPORT_BATCH_SIZE)
+            except csv.Error as exc:
+                raise ImportFormatError(f"Invalid CSV near line {reader.line_num}: {exc}")
+            if not records:
+                break
+            await db.execute(_INSERT_STAGING, [_parse_row(line, values, positions) for line, values in records])
+    finally:
+        # Leave the upload's file open for FastAPI to close
+        stream.detach()
+
+
+async def import_users_csv(
+    db: AsyncSession,
+    upload: UploadFile,
+    institution_id: UUID,
+    password_hash: str,
+) -> dict:
+    """
+    Load every row of `upload` into users + institution_users.
+
+    Runs in the caller's transaction; the caller commits. Returns counts
+    and the first IMPORT_MAX_REPORTED_ERRORS failed rows (row numbers are
+    the CSV lines the records start on).
+    """
+    await db.execute(_CREATE_STAGING)
+    await _stage_rows(db, upload)
+
+    await db.execute(_MARK_FILE_DUPLICATES)
+    await db.execute(_MARK_EXISTING)
+    await db.execute(
+        _INSERT_USERS,
+        {"password_hash": password_hash, "institution_id": institution_id},
+    )
+    await db.execute(_MARK_CONFLICTS)
+
+    imported, failed = (await db.execute(_SUMMARY)).one()
+    errors = [
+        {"row": row_no, "email": email, "error": error}
+        for row_no, email, error in await db.execute(_ERRORS, {"limit": IMPORT_MAX_REPORTED_ERRORS})
+    ]
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_omitted": failed - len(errors),
+    }
@@ -0,0 +1,164 @@
+# app/cli.py
+# Maintenance commands, run from the backend folder:
+#
+#   python -m app.cli migrate [--list]
+#   python -m app.cli backfill-rollups
+#   python -m app.cli refresh-analytics [--full]
+#   python -m app.cli seed [--users 200000 --institutions 100 ...]
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+import bcrypt
+from sqlalchemy import text
+
+from app.db import engine
+from app import admin_analytics, migrations, rollups, seed as seeding
+from app.hashing import BCRYPT_ROUNDS
+
+
+def migrate(args: argparse.Namespace) -> None:
+    """Apply pending schema migrations (see app.migrations)."""
+    if args.list:
+        raw = engine.raw_connection()
+        try:
+            for entry in migrations.status(raw):
+                applied = f"applied {entry.applied_at:%Y-%m-%d %H:%M}" if entry.applied_at else "pending"
+                print(f"  {entry.migration.path.name:40} {applied}")
+        finally:
+            raw.close()
+        return
+
+    started = time.perf_counter()
+    try:
+        applied = migrations.apply_pending(engine)
+    except migrations.MigrationError as exc:
+        raise SystemExit(str(exc))
+    for migration in applied:
+        print(f"  applied {migration.path.name}")
+    if applied:
+        print(f"Applied {len(applied)} migration(s) in {time.perf_counter() - started:.1f}s")
+    else:
+        print("Schema is up to date")
+
+
+def backfill_rollups(args: argparse.Namespace) -> None:
+    """Rebuild user_daily_stats from tasks and task_sessions."""
+    with engine.begin() as conn:
+        for statement in rollups.BACKFILL_SQL:
+            conn.execute(text(statement))
+        count = conn.execute(text("SELECT count(*) FROM user_daily_stats")).scalar_one()
+    print(f"user_daily_stats rebuilt: {count} rows")
+
+
+def refresh_analytics(args: argparse.Namespace) -> None:
+    """Refresh the materialised institution / teacher-roster analytics."""
+    result = asyncio.run(admin_analytics.run_refresh(full=args.full))
+    if result is None:
+        print("Another refresh is running, skipped")
+    else:
+        print(
+            f"Institution analytics refresh ({result['mode']}): {result['duration_ms']} ms, "
+            f"{result['newly_overdue']} task(s) newly overdue"
+        )
+
+
+def seed(args: argparse.Namespace) -> None:
+    """Load a synthetic dataset (see app.seed) through COPY."""
+    migrations.apply_pending(engine)
+    with engine.connect() as conn:
+        existing = conn.execute(text("SELECT EXISTS (SELECT 1 FROM users)")).scalar()
+    if existing and not args.allow_existing:
+        raise SystemExit("users is not empty; pass --allow-existing to seed anyway")
+
+    password_hash = bcrypt.hashpw(args.password.encode("utf-8"), bcrypt.gensalt(BCRYPT_ROUNDS)).decode("utf-8")
+    config = seeding.SeedConfig(
+        institutions=args.institutions,
+        users=args.users,
+        tasks_per_user=args.tasks_per_user,
+        sessions_per_task=args.sessions_per_task,
+        days=args.days,
+        anchor=args.anchor,
+        seed=args.seed,
+        chunk_rows=args.chunk_rows,
+        password_hash=password_hash,
+    )
+
+    started = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        # Rebuilding indexes only pays off when the tables start out empty
+        counts = seeding.seed(config, raw, defer_indexes=not existing)
+    finally:
+        raw.close()
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"  {table:18} {count:>10}")
+    print(f"Seeded {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"Every user and admin has the password {args.password!r}")
+
+    if args.rollups:
+        backfill_rollups(args)
+        args.full = True
+        refresh_analytics(args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrator = commands.add_parser(
+        "migrate",
+        help="apply pending schema migrations from backend/migrations",
+    )
+    migrator.add_argument("--list", action="store_true", help="show each migration and whether it is applied")
+    migrator.set_defaults(func=migrate)
+
+    commands.add_parser(
+        "backfill-rollups",
+        help="rebuild the per-user daily analytics rollup",
+    ).set_defaults(func=backfill_rollups)
+
+    refresh = commands.add_parser(
+        "refresh-analytics",
+        help="refresh the institution analytics behind /api/admin/analytics",
+    )
+    refresh.add_argument(
+        "--full",
+        action="store_true",
+        help="recompute everything (picks up membership changes)",
+    )
+    refresh.set_defaults(func=refresh_analytics)
+
+    seeder = commands.add_parser(
+        "seed",
+        help="bulk-load a deterministic synthetic dataset",
+    )
+    seeder.add_argument("--institutions", type=int, default=100)
+    seeder.add_argument("--users", type=int, default=200_000)
+    seeder.add_argument("--tasks-per-user", type=float, default=20.0, help="mean")
+    seeder.add_argument("--sessions-per-task", type=float, default=1.5, help="mean")
+    seeder.add_argument("--days", type=int, default=365, help="history before the anchor date")
+    seeder.add_argument(
+        "--anchor",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="'today' of the dataset, YYYY-MM-DD (fix it for identical reruns)",
+    )
+    seeder.add_argument("--seed", type=int, default=42)
+    seeder.add_argument("--chunk-rows", type=int, default=100_000, help="rows per COPY")
+    seeder.add_argument("--password", default="password123")
+    seeder.add_argument("--allow-existing", action="store_true", help="seed into a non-empty database")
+    seeder.add_argument("--rollups", action="store_true", help="rebuild the analytics tables afterwards")
+    seeder.set_defaults(func=seed)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,7 @@
 import os
 from datetime import timedelta
 
-from dotenv import load_dotenv
-
-load_dotenv()  # loads variables from .env
+# .env is loaded by app/__init__.py
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -1,19 +1,35 @@
 # app/db.py
 import os
-from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Load .env file from the backend directory
-load_dotenv()
+from app.metrics import TimedAsyncQueuePool, instrument_engine
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not SQLALCHEMY_DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is not set")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0"))
+
+# Optional read replica for GET handlers (see app.replica), with its own pool
+SQLALCHEMY_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+DB_REPLICA_POOL_SIZE = int(os.getenv("DB_REPLICA_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_REPLICA_MAX_OVERFLOW = int(os.getenv("DB_REPLICA_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+# Seconds to wait when opening a replica connection, so a replica that is
+# down is noticed quickly and reads fall back to the primary
+DB_REPLICA_CONNECT_TIMEOUT = float(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+# Streaming exports hold a connection for the whole download, so they get
+# pools of their own (per database); this is also how many can run at
+# once per process (see app.streaming)
+DB_EXPORT_POOL_SIZE = int(os.getenv("DB_EXPORT_POOL_SIZE", "2"))
+
 # Supabase session pooler friendly settings
+# Sync engine: used by scripts and migrations, not by the request path.
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     pool_pre_ping=True,  # check connections before using
@@ -23,4 +39,84 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_url(url: str) -> tuple:
+    """
+    Turn a postgresql:// URL into its asyncpg equivalent.
+
+    asyncpg doesn't understand libpq's `sslmode`, so it is moved into
+    connect_args instead.
+    """
+    parsed = make_url(url)
+    query = dict(parsed.query)
+    connect_args = {}
+
+    sslmode = query.pop("sslmode", None)
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+
+    parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    return parsed.render_as_string(hide_password=False), connect_args
+
+
+_ASYNC_DATABASE_URL, _ASYNC_CONNECT_ARGS = _async_url(SQLALCHEMY_DATABASE_URL)
+
+# Async engine: used by every request handler via app.deps.get_db
+async_engine = create_async_engine(
+    _ASYNC_DATABASE_URL,
+    connect_args=_ASYNC_CONNECT_ARGS,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    poolclass=TimedAsyncQueuePool,
+)
+instrument_engine(async_engine)
+
+replica_engine = None
+if SQLALCHEMY_REPLICA_URL:
+    _REPLICA_URL, _REPLICA_CONNECT_ARGS = _async_url(SQLALCHEMY_REPLICA_URL)
+    replica_engine = create_async_engine(
+        _REPLICA_URL,
+        connect_args={**_REPLICA_CONNECT_ARGS, "timeout": DB_REPLICA_CONNECT_TIMEOUT},
+        pool_pre_ping=True,
+        pool_size=DB_REPLICA_POOL_SIZE,
+        max_overflow=DB_REPLICA_MAX_OVERFLOW,
+        poolclass=TimedAsyncQueuePool,
+    )
+    replica_engine.pool.label = "replica"
+    instrument_engine(replica_engine)
+
+
+def _export_engine(url: str, connect_args: dict, label: str):
+    export = create_async_engine(
+        url,
+        connect_args=connect_args,
+        pool_pre_ping=True,
+        pool_size=DB_EXPORT_POOL_SIZE,
+        max_overflow=0,
+        poolclass=TimedAsyncQueuePool,
+    )
+    export.pool.label = label
+    instrument_engine(export)
+    return export
+
+
+# Export pools, keyed by the engine whose database they read
+export_engines = {async_engine: _export_engine(_ASYNC_DATABASE_URL, _ASYNC_CONNECT_ARGS, "export")}
+if replica_engine is not None:
+    export_engines[replica_engine] = _export_engine(
+        _REPLICA_URL,
+        {**_REPLICA_CONNECT_ARGS, "timeout": DB_REPLICA_CONNECT_TIMEOUT},
+        "replica_export",
+    )
+
+# expire_on_commit=False: handlers return ORM objects after commit and
+# async sessions can't lazy-load expired attributes during serialisation.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
@@ -2,15 +2,18 @@
 # Update your existing deps.py with this
 
 import os
-from typing import Generator
+from typing import AsyncGenerator
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db import SessionLocal
-from app import models
-import bcrypt
+from app.db import AsyncSessionLocal
+from app import models, replica
+from app.cache import TTLCache
+from app.hashing import HasherBusy, password_hasher
 
 # =======================
 # CONFIG
@@ -23,33 +26,61 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 admin_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/admin/login")
 
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "2048"))
+# How long a change made outside this process can go unnoticed (see
+# PRINCIPAL CACHE below); 0 disables the cache
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "15"))
+# Admins: is_active and institution_id gate every admin endpoint
+ADMIN_CACHE_TTL_SECONDS = float(os.getenv("ADMIN_CACHE_TTL_SECONDS", "5"))
+
 # =======================
 # DB DEPENDENCY
 # =======================
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only (GET) handlers: the read replica when one is
+    configured and the caller hasn't just written, else the primary
+    (see app.replica). Never write through it.
+    """
+    if replica.replica_engine is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    await replica.monitor.refresh()
+    async with replica.ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # =======================
 # PASSWORD UTILS
 # =======================
 
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(
-        password.encode("utf-8"),
-        bcrypt.gensalt(),
-    ).decode("utf-8")
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"),
-        hashed_password.encode("utf-8"),
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry",
+        headers={"Retry-After": "1"},
     )
 
+async def get_password_hash(password: str) -> str:
+    try:
+        return await password_hasher.ahash(password)
+    except HasherBusy:
+        raise _hasher_busy()
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.averify(plain_password, hashed_password)
+    except HasherBusy:
+        raise _hasher_busy()
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return password_hasher.needs_rehash(hashed_password)
+
 # =======================
 # TOKEN UTILS
 # =======================
@@ -61,13 +92,82 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# =======================
+# PRINCIPAL CACHE
+# =======================
+
+# Detached User / Admin rows keyed by ("user" | "admin", id). A hit is
+# re-attached to the request session with merge(load=False), which
+# does not emit any SQL.
+#
+# Staleness: ORM writes through this process evict the entry at once
+# (listeners below). Changes made by other workers, raw SQL or scripts
+# are only seen when the entry expires, so a deleted user or a
+# deactivated / moved admin keeps their old access for up to
+# PRINCIPAL_CACHE_TTL_SECONDS (users) or ADMIN_CACHE_TTL_SECONDS
+# (admins). Access tokens are not revoked either way.
+principal_cache = TTLCache(
+    maxsize=PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+_PRINCIPAL_TTL = {"user": PRINCIPAL_CACHE_TTL_SECONDS, "admin": ADMIN_CACHE_TTL_SECONDS}
+
+
+def _principal_key(obj) -> tuple[str, str] | None:
+    if isinstance(obj, models.User):
+        return ("user", str(obj.id))
+    if isinstance(obj, models.Admin):
+        return ("admin", str(obj.id))
+    return None
+
+
+async def _load_principal(db: AsyncSession, kind: str, model, principal_id: str):
+    key = (kind, principal_id)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    result = await db.execute(select(model).where(model.id == principal_id))
+    principal = result.scalar_one_or_none()
+    if principal is None:
+        return None
+
+    db.expunge(principal)
+    principal_cache.set(key, principal, ttl_seconds=_PRINCIPAL_TTL[kind])
+    return await db.merge(principal, load=False)
+
+
+@event.listens_for(Session, "after_flush")
+def _evict_flushed_principals(session, flush_context):
+    # Any UPDATE/DELETE of a user or admin (account_type, is_active, ...)
+    # drops the cached copy straight away, and again once the transaction
+    # commits so a concurrent request can't re-cache the old row.
+    keys = session.info.setdefault("principal_evictions", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        key = _principal_key(obj)
+        if key is not None:
+            keys.add(key)
+            principal_cache.evict(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_principals(session):
+    for key in session.info.pop("principal_evictions", ()):
+        principal_cache.evict(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_evictions(session):
+    session.info.pop("principal_evictions", None)
+
 # =======================
 # USER AUTH
 # =======================
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> models.User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,19 +183,20 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await _load_principal(db, "user", models.User, user_id)
     if user is None:
         raise credentials_exception
     
+    replica.note_principal(("user", user_id))
     return user
 
 # =======================
 # ADMIN AUTH
 # =======================
 
-def get_current_admin(
+async def get_current_admin(
     token: str = Depends(admin_oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> models.Admin:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -111,8 +212,9 @@ def get_current_admin(
     except JWTError:
         raise credentials_exception
     
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
+    admin = await _load_principal(db, "admin", models.Admin, admin_id)
     if admin is None or not admin.is_active:
         raise credentials_exception
     
+    replica.note_principal(("admin", admin_id))
     return admin
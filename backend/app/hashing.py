@@ -0,0 +1,130 @@
+# app/hashing.py
+# bcrypt hashing service backed by a small process pool, so password work
+# never occupies FastAPI's request threads for the full hashing time.
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 hashes inline in the calling thread (useful for tests / serverless)
+HASHING_WORKERS = int(os.getenv("HASHING_WORKERS", str(min(os.cpu_count() or 1, 4))))
+HASHING_MAX_PENDING = int(os.getenv("HASHING_MAX_PENDING", str(max(HASHING_WORKERS, 1) * 8)))
+
+
+class HasherBusy(RuntimeError):
+    """Raised when the hashing queue is full and new work is rejected."""
+
+
+# Module-level so they can be pickled into the worker processes.
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(
+        password.encode("utf-8"),
+        bcrypt.gensalt(rounds=rounds),
+    ).decode("utf-8")
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(
+        password.encode("utf-8"),
+        hashed.encode("utf-8"),
+    )
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool.
+
+    At most `max_pending` hash/verify jobs may be queued or running at
+    once; anything beyond that raises HasherBusy instead of piling up.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app stays cheap.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HasherBusy("Password hashing queue is full")
+
+        try:
+            if self.workers <= 0:
+                future: Future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+            else:
+                future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    # ----- sync API (for def handlers) -----
+
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password, self.rounds).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._submit(_verify, password, hashed).result()
+
+    # ----- async API (for async def handlers) -----
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password, self.rounds))
+
+    async def averify(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(_verify, password, hashed))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if `hashed` was produced with a different work factor."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    rounds=BCRYPT_ROUNDS,
+    workers=HASHING_WORKERS,
+    max_pending=HASHING_MAX_PENDING,
+)
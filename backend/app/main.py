@@ -1,12 +1,21 @@
 # app/main.py
 # Updated to include admin router
 
+import asyncio
+import time
+
 from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import engine, Base
-from app.routers import auth, courses, institutions, tasks, admin
+from app import metrics, migrations, replica
+from app.db import async_engine, engine, export_engines, replica_engine
+from app.admin_analytics import ANALYTICS_REFRESH_SECONDS, refresh_periodically
+from app.deps import principal_cache
+from app.hashing import password_hasher
+from app.routers import auth, courses, institutions, tasks, sessions, analytics, exports, teachers, admin
 
-Base.metadata.create_all(bind=engine)
+# No database work at import: the schema is managed out of band by
+# `python -m app.cli migrate` (see app/migrations.py).
 
 app = FastAPI(title="Edulytics Backend")
 
@@ -20,6 +29,36 @@ ALLOWED_ORIGINS = {
 
 }
 
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    stats, token = metrics.start_request()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Route template, not the raw path, to keep the label set small
+        route = request.scope.get("route")
+        metrics.finish_request(
+            token, stats, request.method, getattr(route, "path", "unmatched"),
+            status_code, time.perf_counter() - started,
+        )
+
+@app.middleware("http")
+async def route_reads(request: Request, call_next):
+    # Read-your-writes for get_read_db (see app/replica.py)
+    if replica_engine is None:
+        return await call_next(request)
+    routing, token = replica.start_request(request.cookies)
+    try:
+        response = await call_next(request)
+    finally:
+        replica.finish_request(token)
+    replica.record_write(routing, request.method, response)
+    return response
+
 @app.middleware("http")
 async def add_cors_headers(request: Request, call_next):
     origin = request.headers.get("origin")
@@ -34,14 +73,45 @@ async def add_cors_headers(request: Request, call_next):
         response.headers["Access-Control-Allow-Credentials"] = "true"
         response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
         response.headers["Access-Control-Allow-Headers"] = "*"
+        response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor, Content-Disposition, ETag, Retry-After"
     
     return response
 
+@app.on_event("startup")
+async def apply_migrations():
+    # Opt-in for local development; registered first so the schema is
+    # current before anything else starts
+    if migrations.AUTO_MIGRATE:
+        await run_in_threadpool(migrations.apply_pending, engine)
+
+@app.on_event("startup")
+async def start_analytics_refresh():
+    if ANALYTICS_REFRESH_SECONDS > 0:
+        app.state.analytics_refresh = asyncio.create_task(refresh_periodically())
+
+@app.on_event("shutdown")
+async def stop_analytics_refresh():
+    task = getattr(app.state, "analytics_refresh", None)
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+@app.on_event("shutdown")
+def shutdown_hashing_pool():
+    password_hasher.shutdown()
+
 # Routers
 app.include_router(auth.router)
 app.include_router(courses.router)
 app.include_router(institutions.router)
 app.include_router(tasks.router)
+app.include_router(sessions.router)
+app.include_router(analytics.router)
+app.include_router(exports.router)
+app.include_router(teachers.router)
 app.include_router(admin.router)  # NEW
 
 @app.get("/")
@@ -50,4 +120,15 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "replica": replica.monitor.stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    pools = [async_engine.pool] + ([replica_engine.pool] if replica_engine is not None else [])
+    pools += [export.pool for export in export_engines.values()]
+    return Response(metrics.render(*pools), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,213 @@
+# app/metrics.py
+# In-process request and database metrics, served in the Prometheus text
+# format at GET /metrics:
+#   - latency histogram per route
+#   - SQL statements and database time per request, counted by engine
+#     cursor events into a per-request context variable
+#   - connection-pool checkout wait, plus pool usage read at scrape time,
+#     labelled by pool (primary, export, and replica / replica_export
+#     when one is configured)
+#
+# A request that runs more than QUERY_COUNT_WARNING statements is logged,
+# so N+1 query loops show up as soon as they ship.
+#
+# Values are per process: with several workers, each one is scraped.
+# Streamed bodies are timed up to their first byte.
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "30"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Prometheus histogram with a fixed set of label names."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        for label_values, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route.",
+    LATENCY_BUCKETS, ("method", "route", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements run per request.",
+    QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time per request spent executing SQL.",
+    LATENCY_BUCKETS, ("method", "route"),
+)
+QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Execution time of single SQL statements.",
+    LATENCY_BUCKETS,
+)
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled connection.",
+    CHECKOUT_BUCKETS, ("pool",),
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# SQLAlchemy's async greenlets inherit the caller's context, so the cursor
+# events below see the stats of the request that issued the statement.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request():
+    """Begin counting statements for the current request; returns (stats, token)."""
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def finish_request(token, stats: RequestStats, method: str, route: str, status: int, seconds: float) -> None:
+    _request_stats.reset(token)
+    REQUEST_SECONDS.observe(seconds, method, route, str(status))
+    REQUEST_QUERIES.observe(stats.queries, method, route)
+    REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+    if stats.queries > QUERY_COUNT_WARNING:
+        logger.warning(
+            "%s %s ran %d SQL statements (%.1f ms in the database)",
+            method, route, stats.queries, stats.db_seconds * 1000,
+        )
+
+
+def instrument_engine(engine) -> None:
+    """Count and time every statement `engine` (sync or async) executes."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        QUERY_SECONDS.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    The async engines' pool, timing how long each checkout waits (including
+    opening a new connection) and counting the callers currently waiting.
+    `label` tells the primary and replica pools apart.
+    """
+
+    waiting = 0
+    label = "primary"
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.capacity = pool_size + max(max_overflow, 0)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the label
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+    def _do_get(self):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started, self.label)
+
+
+def _gauge(name: str, help_text: str, pools: list, value) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for pool in pools:
+        lines.append(f"{name}{_labels(('pool',), (pool.label,))} {value(pool)}")
+    return lines
+
+
+def _saturation(pool: TimedAsyncQueuePool) -> float:
+    return round(pool.checkedout() / pool.capacity, 4) if pool.capacity else 0
+
+
+def render(*pools) -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for histogram in (REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, QUERY_SECONDS, POOL_CHECKOUT_SECONDS):
+        lines.extend(histogram.render())
+    pools = [pool for pool in pools if isinstance(pool, TimedAsyncQueuePool)]
+    if pools:
+        lines.extend(_gauge("db_pool_capacity", "Pool size plus max overflow.", pools, lambda pool: pool.capacity))
+        lines.extend(_gauge("db_pool_checked_out", "Connections currently checked out.", pools, lambda pool: pool.checkedout()))
+        lines.extend(_gauge("db_pool_waiting", "Callers waiting for a connection.", pools, lambda pool: pool.waiting))
+        lines.extend(_gauge("db_pool_saturation", "Checked-out share of the pool's capacity.", pools, _saturation))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,187 @@
+# app/migrations.py
+# Versioned schema migrations: the numbered SQL files in backend/migrations
+# (NNNN_description.sql), applied in order and recorded in
+# schema_migrations. Run out of band, before deploying code that needs
+# them:
+#
+#   python -m app.cli migrate [--list]
+#
+# The app never creates or alters tables on import. AUTO_MIGRATE=1 makes
+# it apply pending migrations at startup instead (local development).
+#
+# Each file runs in its own transaction together with its
+# schema_migrations row, so a failed file leaves nothing behind. A
+# session advisory lock keeps concurrent runners (several workers with
+# AUTO_MIGRATE) from applying the same file twice. Applied files must not
+# be edited: their checksum is stored and checked on every run.
+#
+# Older history: before this module the app ran Base.metadata.create_all
+# on import, and several schema changes landed with no migration. They
+# are carried by:
+#   0002  list indexes (users, institution_users, tasks, task_sessions)
+#   0003  student_teacher pair constraint and roster index
+#   0004  tasks.completed_at and the analytics rollup tables
+#   0005  resource_versions
+# create_all adds missing tables but never alters existing ones, so on
+# checkouts from before this module a database created by an earlier
+# commit is missing columns and constraints. When bisecting those
+# commits, either give each step a fresh database (create_all then builds that commit's schema),
+# or run `python -m app.cli migrate` from a current checkout first: the
+# migrations add tables, defaulted columns, indexes and constraints but
+# drop nothing older code uses, so it runs against the result.
+
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "").lower() in ("1", "true", "yes")
+
+# pg_advisory_lock key shared by every runner
+_LOCK_KEY = 0x4564754D6967  # "EduMig"
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        checksum VARCHAR NOT NULL,
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        duration_ms INTEGER NOT NULL
+    )
+"""
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    @property
+    def checksum(self) -> str:
+        # Line endings normalised, so a checkout with autocrlf matches
+        return hashlib.sha256(self.sql.replace("\r\n", "\n").encode("utf-8")).hexdigest()
+
+
+@dataclass
+class MigrationStatus:
+    migration: Migration
+    applied_at: Optional[datetime]
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """The migration files in `directory`, in version order."""
+    migrations = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if match is None:
+            raise MigrationError(f"{path.name}: expected NNNN_description.sql")
+        version, name = match.groups()
+        if version in migrations:
+            raise MigrationError(f"{path.name}: version {version} is used twice")
+        migrations[version] = Migration(version, name, path)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def _applied(cursor) -> dict[str, tuple]:
+    cursor.execute("SELECT version, checksum, applied_at FROM schema_migrations")
+    return {version: (checksum, applied_at) for version, checksum, applied_at in cursor.fetchall()}
+
+
+def _check_unchanged(migrations: list[Migration], applied: dict[str, tuple]) -> None:
+    for migration in migrations:
+        recorded = applied.get(migration.version)
+        if recorded is not None and recorded[0] != migration.checksum:
+            raise MigrationError(
+                f"{migration.path.name} was edited after it was applied; "
+                "add a new migration instead"
+            )
+
+
+def status(raw_connection, directory: Path = MIGRATIONS_DIR) -> list[MigrationStatus]:
+    """Every migration file with the time it was applied (None if pending)."""
+    migrations = discover(directory)
+    cursor = raw_connection.cursor()
+    try:
+        cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        applied = _applied(cursor) if cursor.fetchone()[0] else {}
+    finally:
+        cursor.close()
+        raw_connection.rollback()
+    _check_unchanged(migrations, applied)
+    return [
+        MigrationStatus(migration, applied.get(migration.version, (None, None))[1])
+        for migration in migrations
+    ]
+
+
+def migrate(raw_connection, directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """
+    Apply the pending migrations in order, each in its own transaction,
+    on a DB-API (psycopg2) connection. Returns the ones applied.
+    """
+    migrations = discover(directory)
+    cursor = raw_connection.cursor()
+    done = []
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (_LOCK_KEY,))
+        cursor.execute(_CREATE_TABLE_SQL)
+        raw_connection.commit()
+
+        # Read under the lock: another runner may just have finished
+        applied = _applied(cursor)
+        raw_connection.commit()
+        _check_unchanged(migrations, applied)
+
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            started = time.perf_counter()
+            try:
+                cursor.execute(migration.sql)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum, duration_ms) "
+                    "VALUES (%s, %s, %s, %s)",
+                    (
+                        migration.version, migration.name, migration.checksum,
+                        round((time.perf_counter() - started) * 1000),
+                    ),
+                )
+                raw_connection.commit()
+            except Exception as exc:
+                raw_connection.rollback()
+                raise MigrationError(f"{migration.path.name} failed: {str(exc).strip()}") from exc
+            done.append(migration)
+    finally:
+        try:
+            raw_connection.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_KEY,))
+            raw_connection.commit()
+        finally:
+            cursor.close()
+    return done
+
+
+def apply_pending(engine) -> list[Migration]:
+    """migrate() on a connection from a sync SQLAlchemy engine."""
+    raw = engine.raw_connection()
+    try:
+        return migrate(raw)
+    finally:
+        raw.close()
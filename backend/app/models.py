@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, String, DateTime, ForeignKey, text, Integer, Boolean
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, text, Integer, BigInteger, Boolean, UniqueConstraint, Index, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -9,6 +9,11 @@ from app.db import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of the admin user listings
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_account_type_created_at_id", "account_type", "created_at", "id"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -70,6 +75,9 @@ class Institution(Base):
 
 class InstitutionUser(Base):
     __tablename__ = "institution_users"
+    __table_args__ = (
+        Index("ix_institution_users_institution_id_user_id", "institution_id", "user_id"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -81,6 +89,7 @@ class InstitutionUser(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     institution_id = Column(
         UUID(as_uuid=True),
@@ -100,6 +109,19 @@ class Task(Base):
     and optionally to a course.
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Match the list_tasks filters; (user_id, ...) prefixes also cover
+        # plain lookups by user_id.
+        Index("ix_tasks_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_id_status_due_at", "user_id", "status", "due_at"),
+        Index("ix_tasks_user_id_course_id", "user_id", "course_id"),
+        # Open tasks not yet counted as overdue (app.rollups.record_overdue)
+        Index(
+            "ix_tasks_overdue_pending",
+            "due_at",
+            postgresql_where=text("NOT overdue_counted AND status NOT IN ('completed', 'cancelled')"),
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -111,7 +133,6 @@ class Task(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     course_id = Column(
         UUID(as_uuid=True),
@@ -126,6 +147,10 @@ class Task(Base):
     priority = Column(Integer, nullable=False, server_default=text("0"))
     due_at = Column(DateTime(timezone=True), nullable=True)
     estimated_minutes = Column(Integer, nullable=True)
+    # set when status becomes 'completed', cleared if it is reopened
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    # counted in user_daily_stats.tasks_overdue (see app.rollups)
+    overdue_counted = Column(Boolean, nullable=False, server_default=text("false"))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -145,6 +170,15 @@ class TaskSession(Base):
     Will be created either manually or by the AI agent.
     """
     __tablename__ = "task_sessions"
+    __table_args__ = (
+        # Calendar range reads (GET /sessions?from=&to=)
+        Index("ix_task_sessions_user_id_start_at", "user_id", "start_at"),
+        # MAX_SESSION_DURATION in app.routers.sessions (migration 0006)
+        CheckConstraint(
+            "end_at > start_at AND end_at - start_at <= interval '24 hours'",
+            name="ck_task_sessions_length",
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -156,7 +190,6 @@ class TaskSession(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     task_id = Column(
         UUID(as_uuid=True),
@@ -213,6 +246,13 @@ class Admin(Base):
 class StudentTeacher(Base):
     """Junction table for student-teacher relationships"""
     __tablename__ = "student_teacher"
+    __table_args__ = (
+        # Also serves lookups by student_id (leading column)
+        UniqueConstraint("student_id", "teacher_id", name="uq_student_teacher_pair"),
+        # Roster pages in assignment order (GET /teachers/{id}/students);
+        # also serves lookups by teacher_id
+        Index("ix_student_teacher_teacher_id_created_at", "teacher_id", "created_at", "student_id"),
+    )
     
     id = Column(
         UUID(as_uuid=True),
@@ -233,4 +273,131 @@ class StudentTeacher(Base):
         nullable=False,
     )
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class UserDailyStats(Base):
+    """
+    Per-user, per-day (UTC) analytics rollup.
+
+    Maintained incrementally by app.rollups on every task / session write;
+    rebuilt from scratch with `python -m app.cli backfill-rollups`.
+    """
+    __tablename__ = "user_daily_stats"
+    __table_args__ = (
+        # institution refresh: changed rows, and all rows of a changed day
+        Index("ix_user_daily_stats_updated_at", "updated_at"),
+        Index("ix_user_daily_stats_day", "day"),
+    )
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = Column(Date, primary_key=True)
+    # minutes of sessions starting this day, whatever their status
+    planned_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    completed_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    skipped_sessions = Column(Integer, nullable=False, server_default=text("0"))
+    # tasks whose completed_at falls on this day
+    tasks_completed = Column(Integer, nullable=False, server_default=text("0"))
+    # tasks due this day that weren't completed by their due time
+    tasks_overdue = Column(Integer, nullable=False, server_default=text("0"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class InstitutionDailyStats(Base):
+    """
+    Institution x day x role aggregate of user_daily_stats, refreshed by
+    app.admin_analytics (never written by request handlers).
+    """
+    __tablename__ = "institution_daily_stats"
+
+    institution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("institutions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = Column(Date, primary_key=True)
+    role = Column(String, primary_key=True)
+    # members with a session or a completed task that day
+    active_users = Column(Integer, nullable=False, server_default=text("0"))
+    planned_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    completed_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    skipped_sessions = Column(Integer, nullable=False, server_default=text("0"))
+    tasks_completed = Column(Integer, nullable=False, server_default=text("0"))
+    tasks_overdue = Column(Integer, nullable=False, server_default=text("0"))
+
+
+class TeacherRosterDailyStats(Base):
+    """Per-day totals over the students assigned to a teacher (student_teacher)."""
+    __tablename__ = "teacher_roster_daily_stats"
+
+    institution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("institutions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    teacher_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = Column(Date, primary_key=True)
+    active_students = Column(Integer, nullable=False, server_default=text("0"))
+    planned_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    completed_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    skipped_sessions = Column(Integer, nullable=False, server_default=text("0"))
+    tasks_completed = Column(Integer, nullable=False, server_default=text("0"))
+    tasks_overdue = Column(Integer, nullable=False, server_default=text("0"))
+
+
+class CourseDailyStats(Base):
+    """
+    Institution x day x course totals over the student members' tasks and
+    sessions, refreshed by app.admin_analytics. Courses belong to single
+    users, so they are grouped by title (lower-cased, trimmed).
+    """
+    __tablename__ = "course_daily_stats"
+
+    institution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("institutions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = Column(Date, primary_key=True)
+    course = Column(String, primary_key=True)
+    # students with a session or a completed task in the course that day
+    active_students = Column(Integer, nullable=False, server_default=text("0"))
+    planned_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    completed_minutes = Column(Integer, nullable=False, server_default=text("0"))
+    skipped_sessions = Column(Integer, nullable=False, server_default=text("0"))
+    tasks_completed = Column(Integer, nullable=False, server_default=text("0"))
+    tasks_overdue = Column(Integer, nullable=False, server_default=text("0"))
+
+
+class AnalyticsRefreshState(Base):
+    """Bookkeeping for the materialised admin analytics (one row per job)."""
+    __tablename__ = "analytics_refresh_state"
+
+    name = Column(String, primary_key=True)
+    # user_daily_stats.updated_at already folded in
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
+    full_refreshed_at = Column(DateTime(timezone=True), nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+
+
+class ResourceVersion(Base):
+    """
+    Change counters behind the list endpoints' ETags (see app.versions).
+
+    scope is 'user:<id>', 'institution:<id>', 'institutions' or 'all';
+    bumped in the same transaction as the write.
+    """
+    __tablename__ = "resource_versions"
+
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,68 @@
+# app/pagination.py
+# Keyset (cursor) pagination on (timestamp column, id).
+
+import base64
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(value: datetime, row_id: UUID) -> str:
+    raw = f"{value.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        value, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(value), UUID(row_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def page_size(cursor: Optional[str], limit: Optional[int]) -> Optional[int]:
+    """
+    For endpoints where paging is opt-in: the page size, or None (every
+    row) when the client sent neither a cursor nor a limit.
+    """
+    if limit is None and cursor:
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+
+def paginate(query, sort_col, id_col, cursor: Optional[str], limit: Optional[int], descending: bool = True):
+    """
+    Order `query` by (sort_col, id_col) and apply the cursor. Fetches one
+    extra row so the caller can tell whether another page exists; with
+    limit=None, fetches every row.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        key, after = tuple_(sort_col, id_col), tuple_(value, row_id)
+        query = query.where(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col.asc(), id_col.asc())
+    return query if limit is None else query.limit(limit + 1)
+
+
+def split_page(rows: list, limit: Optional[int], sort_attr: str = "created_at") -> tuple[list, Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
@@ -0,0 +1,215 @@
+# app/replica.py
+# Read-replica routing for GET handlers, enabled by DATABASE_REPLICA_URL.
+#
+# app.deps.get_read_db yields a ReadSession, which binds to the replica on
+# its first query unless one of these sends it to the primary:
+#   - the caller wrote something in the last READ_YOUR_WRITES_SECONDS, so
+#     they see their own changes (read-your-writes)
+#   - the replica is down, or lags by more than DB_REPLICA_MAX_LAG_SECONDS
+#     (measured at most every DB_REPLICA_CHECK_SECONDS)
+# Without a replica it behaves exactly like get_db.
+#
+# Writes are remembered per principal in this process, and in a cookie
+# that expires with the window, for when the next request lands on another
+# worker. Either one is enough to pin reads to the primary.
+
+import asyncio
+import logging
+import math
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.db import async_engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "2"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+
+RECENT_WRITE_COOKIE = "edulytics_recent_write"
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Replay lag in seconds; 0 when everything received has been replayed (an
+# idle primary would otherwise look like growing lag), or when the server
+# isn't a standby at all.
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Principals who wrote recently: ("user" | "admin", id) -> True
+recent_writers = TTLCache(maxsize=4096, ttl_seconds=READ_YOUR_WRITES_SECONDS)
+
+
+# =======================
+# PER-REQUEST STATE
+# =======================
+
+@dataclass
+class ReadRouting:
+    principal: Optional[tuple] = None
+    # this request reads from the primary
+    primary: bool = False
+
+
+# Set by the middleware, filled in by the auth dependencies; a mutable
+# object so the middleware sees what the endpoint's task recorded.
+_routing: ContextVar[Optional[ReadRouting]] = ContextVar("read_routing", default=None)
+
+
+def start_request(cookies) -> tuple:
+    """Begin routing the current request's reads; returns (routing, token)."""
+    routing = ReadRouting(primary=RECENT_WRITE_COOKIE in cookies)
+    return routing, _routing.set(routing)
+
+
+def note_principal(key: tuple) -> None:
+    """Called once the caller is authenticated: pin reads if they just wrote."""
+    routing = _routing.get()
+    if routing is None:
+        return
+    routing.principal = key
+    if recent_writers.get(key):
+        routing.primary = True
+
+
+def finish_request(token) -> None:
+    _routing.reset(token)
+
+
+def record_write(routing: ReadRouting, method: str, response) -> None:
+    """After a successful write, pin the caller's reads to the primary for the window."""
+    if method in _SAFE_METHODS or response.status_code >= 400:
+        return
+    if routing.principal is not None:
+        recent_writers.set(routing.principal, True)
+    response.set_cookie(
+        RECENT_WRITE_COOKIE, "1",
+        max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+# =======================
+# REPLICA HEALTH
+# =======================
+
+class ReplicaMonitor:
+    """
+    Cached availability of the replica. refresh() measures the lag at most
+    every DB_REPLICA_CHECK_SECONDS; callers arriving while a check runs
+    use the previous answer instead of waiting for it.
+    """
+
+    def __init__(self, engine: Optional[AsyncEngine]):
+        self.engine = engine
+        # None until the first check
+        self.available: Optional[bool] = None
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        if self.engine is None or self._lock.locked():
+            return
+        if time.monotonic() - self.checked_at < DB_REPLICA_CHECK_SECONDS:
+            return
+        async with self._lock:
+            self.checked_at = time.monotonic()
+            try:
+                async with self.engine.connect() as conn:
+                    lag = float((await conn.execute(_LAG_SQL)).scalar_one())
+            except Exception as exc:
+                self.mark_down(exc)
+                return
+            self.lag_seconds = lag
+            self.error = None
+            available = lag <= DB_REPLICA_MAX_LAG_SECONDS
+            if available != self.available:
+                if available:
+                    logger.info("Read replica in use (lag %.1fs)", lag)
+                else:
+                    logger.warning("Read replica %.1fs behind, reading from the primary", lag)
+            self.available = available
+
+    def mark_down(self, exc: BaseException) -> None:
+        if self.available is not False:
+            logger.warning("Read replica unavailable, reading from the primary: %s", exc)
+        self.available = False
+        self.error = str(exc) or type(exc).__name__
+        # Check again at the next interval, not on every request
+        self.checked_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "configured": self.engine is not None,
+            "available": self.available,
+            "lag_seconds": self.lag_seconds,
+            "error": self.error,
+        }
+
+
+monitor = ReplicaMonitor(replica_engine)
+
+if replica_engine is not None:
+    @event.listens_for(replica_engine.sync_engine, "handle_error")
+    def _replica_failed(context):
+        # Connecting failed (no connection yet) or the connection dropped:
+        # stop sending reads there until the next successful check
+        if context.connection is None or context.is_disconnect:
+            monitor.mark_down(context.original_exception)
+
+
+# =======================
+# SESSIONS
+# =======================
+
+def choose_engine() -> AsyncEngine:
+    """Where the current request's reads go."""
+    routing = _routing.get()
+    if replica_engine is None or not monitor.available or (routing is not None and routing.primary):
+        return async_engine
+    return replica_engine
+
+
+class ReadSession(Session):
+    """Binds to choose_engine() on first use, then sticks to it."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        return read_engine_of(self).sync_engine
+
+
+def read_engine_of(session) -> AsyncEngine:
+    """The async engine `session` reads from (for queries run outside it, e.g. exports)."""
+    sync_session = getattr(session, "sync_session", session)
+    if not isinstance(sync_session, ReadSession):
+        return async_engine
+    engine = sync_session.info.get("read_engine")
+    if engine is None:
+        engine = sync_session.info["read_engine"] = choose_engine()
+    return engine
+
+
+# expire_on_commit=False, as for AsyncSessionLocal
+ReadSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=ReadSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
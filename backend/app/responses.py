@@ -0,0 +1,76 @@
+# app/responses.py
+# Fast path for large list responses: rows go straight to orjson instead
+# of through response_model validation and the stdlib JSON encoder.
+#
+# Opt-in per endpoint, and only for data the endpoint already trusts
+# (columns it selected itself, objects loaded from the database). The
+# route keeps its response_model, so the OpenAPI schema doesn't change;
+# returning a Response is what skips the validation step.
+
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterable, Optional
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Headers of the injected Response that belong to its (empty) body
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def _default(value):
+    # orjson only knows uuid.UUID itself; asyncpg returns a subclass
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        # OPT_UTC_Z: UTC datetimes end in "Z", like pydantic's output
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+@lru_cache(maxsize=None)
+def fields_of(schema: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+def columns_for(model, schema: type[BaseModel]) -> tuple:
+    """The model's columns for each field of `schema`, to select rows for rows_as()."""
+    return tuple(getattr(model, name) for name in fields_of(schema))
+
+
+def rows_as(schema: type[BaseModel], rows: Iterable) -> list[dict]:
+    """
+    Plain dicts with `schema`'s fields, read by attribute from Row tuples
+    or ORM objects. No validation: the values must already have the
+    schema's types (they do when they come from the matching columns).
+    """
+    fields = fields_of(schema)
+    if len(fields) == 1:
+        (name,) = fields
+        return [{name: getattr(row, name)} for row in rows]
+    get = attrgetter(*fields)
+    return [dict(zip(fields, get(row))) for row in rows]
+
+
+def fast_json(content, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Serialise `content` with orjson. `response` is the endpoint's injected
+    Response: headers set on it (X-Next-Cursor, ETag) are carried over,
+    since FastAPI drops them when a handler returns its own Response.
+    """
+    fast = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        for name, value in response.headers.items():
+            if name not in _BODY_HEADERS:
+                fast.headers[name] = value
+    return fast
@@ -0,0 +1,227 @@
+# app/rollups.py
+# Incremental maintenance of the per-user daily analytics rollup
+# (models.UserDailyStats). Writers call these helpers inside their own
+# transaction, so the rollup commits or rolls back with the change.
+#
+# A task is overdue (counted on its due day) once its due date has passed
+# without it being completed: completed late, or still open. tasks.
+# overdue_counted records whether the rollup counts it. Open tasks turn
+# overdue with no write at all, so record_overdue() picks them up; it
+# runs with every analytics refresh (app.admin_analytics).
+
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+
+ROLLUP_FIELDS = (
+    "planned_minutes",
+    "completed_minutes",
+    "skipped_sessions",
+    "tasks_completed",
+    "tasks_overdue",
+)
+
+
+class TaskState(NamedTuple):
+    """The task fields the rollup depends on."""
+    status: str
+    due_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    overdue: bool  # counted in tasks_overdue
+
+    @classmethod
+    def of(cls, task: models.Task) -> "TaskState":
+        return cls(task.status or "pending", task.due_at, task.completed_at, bool(task.overdue_counted))
+
+
+def utc_day(value: datetime) -> date:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def is_overdue(status: str, due_at: Optional[datetime], completed_at: Optional[datetime], now: datetime) -> bool:
+    """Due before `now` and not completed by then."""
+    if due_at is None or status == "cancelled":
+        return False
+    if status == "completed":
+        return completed_at is not None and _as_utc(completed_at) > _as_utc(due_at)
+    return _as_utc(due_at) < now
+
+
+def _task_contributions(state: Optional[TaskState]) -> Counter:
+    counts: Counter = Counter()
+    if state is None:
+        return counts
+
+    if state.status == "completed" and state.completed_at:
+        counts[(utc_day(state.completed_at), "tasks_completed")] += 1
+
+    if state.overdue and state.due_at:
+        counts[(utc_day(state.due_at), "tasks_overdue")] += 1
+
+    return counts
+
+
+def _session_contributions(session: models.TaskSession) -> Counter:
+    counts: Counter = Counter()
+    day = utc_day(session.start_at)
+    minutes = int((session.end_at - session.start_at).total_seconds() // 60)
+
+    counts[(day, "planned_minutes")] += minutes
+    if session.status == "completed":
+        counts[(day, "completed_minutes")] += minutes
+    elif session.status == "skipped":
+        counts[(day, "skipped_sessions")] += 1
+    return counts
+
+
+async def _apply(db: AsyncSession | AsyncConnection, deltas: dict[tuple[UUID, date], Counter]) -> None:
+    rows = []
+    for (user_id, day), counts in deltas.items():
+        if any(counts.values()):
+            rows.append({"user_id": user_id, "day": day, **{f: counts.get(f, 0) for f in ROLLUP_FIELDS}})
+    if not rows:
+        return
+
+    table = models.UserDailyStats.__table__
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            **{f: table.c[f] + stmt.excluded[f] for f in ROLLUP_FIELDS},
+            "updated_at": text("now()"),
+        },
+    )
+    await db.execute(stmt)
+
+
+def _group(user_id: UUID, counts: Counter, into: dict) -> None:
+    for (day, field), value in counts.items():
+        if value:
+            into.setdefault((user_id, day), Counter())[field] += value
+
+
+def mark_completion(task: models.Task, previous_status: str) -> None:
+    """Keep task.completed_at in step with a status change."""
+    if task.status == "completed" and previous_status != "completed":
+        task.completed_at = datetime.now(timezone.utc)
+    elif task.status != "completed":
+        task.completed_at = None
+
+
+def mark_overdue(task: models.Task) -> None:
+    """
+    Set task.overdue_counted for the task as it is now; call before
+    taking its TaskState for record_task_changes. Updates must hold the
+    row lock (SELECT ... FOR UPDATE) so record_overdue() can't change the
+    flag between reading the old state and writing the new one.
+    """
+    task.overdue_counted = is_overdue(
+        task.status or "pending", task.due_at, task.completed_at, datetime.now(timezone.utc)
+    )
+
+
+async def record_task_changes(
+    db: AsyncSession,
+    user_id: UUID,
+    changes: Iterable[tuple[Optional[TaskState], TaskState]],
+) -> None:
+    """Apply (before, after) task transitions; before=None for new tasks."""
+    deltas: dict = {}
+    for before, after in changes:
+        counts = _task_contributions(after)
+        counts.subtract(_task_contributions(before))
+        _group(user_id, counts, deltas)
+    await _apply(db, deltas)
+
+
+async def record_sessions(db: AsyncSession, sessions: Iterable[models.TaskSession]) -> None:
+    """Add newly created sessions to their users' rollups."""
+    deltas: dict = {}
+    for session in sessions:
+        _group(session.user_id, _session_contributions(session), deltas)
+    await _apply(db, deltas)
+
+
+# Open tasks whose due date passed since the last run (partial index
+# ix_tasks_overdue_pending)
+_RECORD_OVERDUE_SQL = text("""
+    UPDATE tasks SET overdue_counted = true
+    WHERE NOT overdue_counted
+      AND status NOT IN ('completed', 'cancelled')
+      AND due_at < :now
+    RETURNING user_id, due_at
+""")
+
+
+async def record_overdue(db: AsyncSession | AsyncConnection, now: Optional[datetime] = None) -> int:
+    """Count the open tasks that became overdue since the last call; returns how many."""
+    rows = (await db.execute(_RECORD_OVERDUE_SQL, {"now": now or datetime.now(timezone.utc)})).all()
+    deltas: dict = {}
+    for user_id, due_at in rows:
+        _group(user_id, Counter({(utc_day(due_at), "tasks_overdue"): 1}), deltas)
+    await _apply(db, deltas)
+    return len(rows)
+
+
+# Rebuild from the source tables (used by `python -m app.cli backfill-rollups`)
+BACKFILL_SQL = (
+    # Tasks completed before completed_at existed: best guess is updated_at
+    """
+    UPDATE tasks SET completed_at = updated_at
+    WHERE status = 'completed' AND completed_at IS NULL
+    """,
+    # Same rule as is_overdue()
+    """
+    UPDATE tasks SET overdue_counted = NOT overdue_counted
+    WHERE overdue_counted <> COALESCE(
+        CASE
+            WHEN status = 'cancelled' THEN false
+            WHEN status = 'completed' THEN completed_at > due_at
+            ELSE due_at < now()
+        END,
+        false
+    )
+    """,
+    "DELETE FROM user_daily_stats",
+    """
+    INSERT INTO user_daily_stats (
+        user_id, day, planned_minutes, completed_minutes, skipped_sessions,
+        tasks_completed, tasks_overdue, updated_at
+    )
+    SELECT user_id, day, sum(planned), sum(completed), sum(skipped), sum(done), sum(overdue), now()
+    FROM (
+        SELECT user_id,
+               (start_at AT TIME ZONE 'UTC')::date AS day,
+               floor(extract(epoch FROM end_at - start_at) / 60)::int AS planned,
+               CASE WHEN status = 'completed'
+                    THEN floor(extract(epoch FROM end_at - start_at) / 60)::int ELSE 0 END AS completed,
+               CASE WHEN status = 'skipped' THEN 1 ELSE 0 END AS skipped,
+               0 AS done,
+               0 AS overdue
+        FROM task_sessions
+        UNION ALL
+        SELECT user_id, (completed_at AT TIME ZONE 'UTC')::date, 0, 0, 0, 1, 0
+        FROM tasks
+        WHERE status = 'completed'
+        UNION ALL
+        SELECT user_id, (due_at AT TIME ZONE 'UTC')::date, 0, 0, 0, 0, 1
+        FROM tasks
+        WHERE overdue_counted
+    ) contributions
+    GROUP BY user_id, day
+    """,
+)
@@ -1,27 +1,62 @@
 # app/routers/admin.py
 # Complete admin endpoints
 
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app import models, schemas
-from app.deps import get_db, get_current_admin, get_password_hash, verify_password, create_access_token
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app import models, schemas, versions
+from app.bulk_import import ImportFormatError, import_users_csv
+from app.admin_analytics import REFRESH_JOB
+from app.cache import TTLCache
+from app.replica import read_engine_of
+from app.responses import columns_for, fast_json, rows_as
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    paginate,
+    split_page,
+)
+from app.routers.analytics import RANGE_DAYS
+from app.routers.exports import ExportFormat, session_export_query, task_export_query
+from app.streaming import EXPORT_MEDIA_TYPES, streaming_export
+from app.deps import (
+    get_db,
+    get_read_db,
+    get_current_admin,
+    get_password_hash,
+    verify_password,
+    password_needs_rehash,
+    create_access_token,
+)
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+DEFAULT_USER_PASSWORD = "DefaultPassword123!"
+
 # =======================
 # LOGIN
 # =======================
 
 @router.post("/login", response_model=schemas.AdminLoginResponse)
-def admin_login(
+async def admin_login(
     request: schemas.AdminLoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Admin login endpoint"""
-    admin = db.query(models.Admin).filter(models.Admin.email == request.email).first()
+    admin = await db.scalar(
+        select(models.Admin)
+        .where(models.Admin.email == request.email)
+        .options(selectinload(models.Admin.institution))
+    )
     
-    if not admin or not verify_password(request.password, admin.password_hash):
+    if not admin or not await verify_password(request.password, admin.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -33,6 +68,12 @@ def admin_login(
             detail="Admin account is inactive",
         )
     
+    # Upgrade hashes made with an older BCRYPT_ROUNDS setting
+    if password_needs_rehash(admin.password_hash):
+        admin.password_hash = await get_password_hash(request.password)
+        db.add(admin)
+        await db.commit()
+    
     # Determine role based on institution_id
     role = "developer_admin" if admin.institution_id is None else "institution_admin"
     
@@ -57,10 +98,10 @@ def admin_login(
 # =======================
 
 @router.post("/add-user")
-def add_user(
+async def add_user(
     request: schemas.AddUserRequest,
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Add new user (student/teacher)"""
     
@@ -73,7 +114,7 @@ def add_user(
         )
     
     # Check if email already exists
-    existing_user = db.query(models.User).filter(models.User.email == request.email).first()
+    existing_user = await db.scalar(select(models.User.id).where(models.User.email == request.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -84,13 +125,13 @@ def add_user(
     new_user = models.User(
         email=request.email,
         mobile_number=request.mobile_number,
-        password_hash=get_password_hash("DefaultPassword123!"),  # Default password
+        password_hash=await get_password_hash(DEFAULT_USER_PASSWORD),
         account_type=request.role,
         name=request.user_id,
     )
     
     db.add(new_user)
-    db.flush()
+    await db.flush()
     
     # Add to institution
     institution_user = models.InstitutionUser(
@@ -100,7 +141,7 @@ def add_user(
     )
     
     db.add(institution_user)
-    db.commit()
+    await db.commit()
     
     return {
         "message": f"{request.role.title()} added successfully",
@@ -108,18 +149,66 @@ def add_user(
     }
 
 # =======================
-# ASSIGN STUDENTS TO TEACHER
+# BULK IMPORT USERS
 # =======================
 
-@router.post("/assign-students")
-def assign_students(
-    request: schemas.AssignStudentsRequest,
+@router.post("/import-users", response_model=schemas.ImportUsersResponse)
+async def import_users(
+    institution_id: UUID = Form(...),
+    file: UploadFile = File(...),
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Assign students to a teacher"""
+    """
+    Bulk add students/teachers from a CSV upload.
+
+    Expects the columns email, mobile_number, user_id, role (same fields
+    as /add-user). Valid rows are created with the default password and
+    added to the institution; invalid or duplicate rows are reported (the
+    first 100, plus how many more there were).
+    """
+    
+    # Check permissions
+    is_developer = current_admin.institution_id is None
+    if not is_developer and current_admin.institution_id != institution_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot add users to other institutions",
+        )
+    
+    if not await db.get(models.Institution, institution_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Institution not found",
+        )
+    
+    # One hash shared by every imported row
+    password_hash = await get_password_hash(DEFAULT_USER_PASSWORD)
+    
+    try:
+        report = await import_users_csv(db, file, institution_id, password_hash)
+    except ImportFormatError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
     
-    teacher = db.query(models.User).filter(models.User.id == request.teacher_id).first()
+    # Rows were written with plain SQL, outside the unit of work
+    versions.touch(db, versions.institution_scope(institution_id), versions.ALL)
+    await db.commit()
+    return report
+
+# =======================
+# ASSIGN STUDENTS TO TEACHER
+# =======================
+
+async def _get_teacher_for_admin(
+    db: AsyncSession,
+    current_admin: models.Admin,
+    teacher_id: UUID,
+) -> models.User:
+    teacher = await db.get(models.User, teacher_id)
     if not teacher:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -130,168 +219,339 @@ def assign_students(
     is_developer = current_admin.institution_id is None
     if not is_developer:
         # Institution admin - verify teacher belongs to same institution
-        teacher_inst = db.query(models.InstitutionUser).filter(
-            models.InstitutionUser.user_id == request.teacher_id,
+        teacher_inst = await db.scalar(select(models.InstitutionUser.id).where(
+            models.InstitutionUser.user_id == teacher_id,
             models.InstitutionUser.institution_id == current_admin.institution_id,
-        ).first()
+        ))
         if not teacher_inst:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Teacher not in your institution",
             )
     
-    # Assign students
-    for student_id in request.student_ids:
-        existing = db.query(models.StudentTeacher).filter(
-            models.StudentTeacher.student_id == student_id,
+    return teacher
+
+@router.post("/assign-students", response_model=schemas.AssignStudentsResponse)
+async def assign_students(
+    request: schemas.AssignStudentsRequest,
+    current_admin: models.Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Assign students to a teacher"""
+    
+    await _get_teacher_for_admin(db, current_admin, request.teacher_id)
+    
+    requested = set(request.student_ids)
+    
+    # Only existing users (in the admin's institution) can be assigned
+    students = select(models.User.id, literal(request.teacher_id)).where(
+        models.User.id.in_(requested)
+    )
+    if current_admin.institution_id is not None:
+        students = students.join(
+            models.InstitutionUser,
+            models.InstitutionUser.user_id == models.User.id,
+        ).where(
+            models.InstitutionUser.institution_id == current_admin.institution_id,
+        ).distinct()
+    
+    # One INSERT ... SELECT for the whole list; pairs that already exist
+    # are skipped by the (student_id, teacher_id) unique constraint.
+    result = await db.execute(
+        pg_insert(models.StudentTeacher)
+        .from_select(["student_id", "teacher_id"], students)
+        .on_conflict_do_nothing(constraint="uq_student_teacher_pair")
+        .returning(models.StudentTeacher.student_id)
+    )
+    inserted = len(result.all())
+    await db.commit()
+    
+    return {
+        "message": f"Assigned {inserted} students to teacher",
+        "inserted": inserted,
+        "skipped": len(requested) - inserted,
+    }
+
+# =======================
+# UNASSIGN STUDENTS FROM TEACHER
+# =======================
+
+@router.post("/unassign-students", response_model=schemas.AssignStudentsResponse)
+async def unassign_students(
+    request: schemas.AssignStudentsRequest,
+    current_admin: models.Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove students from a teacher"""
+    
+    await _get_teacher_for_admin(db, current_admin, request.teacher_id)
+    
+    requested = set(request.student_ids)
+    result = await db.execute(
+        delete(models.StudentTeacher)
+        .where(
             models.StudentTeacher.teacher_id == request.teacher_id,
-        ).first()
-        
-        if not existing:
-            assignment = models.StudentTeacher(
-                student_id=student_id,
-                teacher_id=request.teacher_id,
-            )
-            db.add(assignment)
+            models.StudentTeacher.student_id.in_(requested),
+        )
+        .returning(models.StudentTeacher.student_id)
+    )
+    removed = len(result.all())
+    await db.commit()
+    
+    return {
+        "message": f"Unassigned {removed} students from teacher",
+        "inserted": 0,
+        "deleted": removed,
+        "skipped": len(requested) - removed,
+    }
+
+# =======================
+# REASSIGN STUDENTS BETWEEN TEACHERS
+# =======================
+
+@router.post("/reassign-students", response_model=schemas.AssignStudentsResponse)
+async def reassign_students(
+    request: schemas.ReassignStudentsRequest,
+    current_admin: models.Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Move students (all of them if student_ids is omitted) to another teacher"""
+    
+    if request.from_teacher_id == request.to_teacher_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Source and target teacher must differ",
+        )
     
-    db.commit()
+    await _get_teacher_for_admin(db, current_admin, request.from_teacher_id)
+    await _get_teacher_for_admin(db, current_admin, request.to_teacher_id)
+    
+    removal = delete(models.StudentTeacher).where(
+        models.StudentTeacher.teacher_id == request.from_teacher_id,
+    )
+    if request.student_ids is not None:
+        removal = removal.where(
+            models.StudentTeacher.student_id.in_(set(request.student_ids)),
+        )
+    moved = [
+        row.student_id
+        for row in await db.execute(removal.returning(models.StudentTeacher.student_id))
+    ]
+    
+    inserted = 0
+    if moved:
+        result = await db.execute(
+            pg_insert(models.StudentTeacher)
+            .values([
+                {"student_id": student_id, "teacher_id": request.to_teacher_id}
+                for student_id in moved
+            ])
+            .on_conflict_do_nothing(constraint="uq_student_teacher_pair")
+            .returning(models.StudentTeacher.student_id)
+        )
+        inserted = len(result.all())
+    await db.commit()
     
     return {
-        "message": f"Assigned {len(request.student_ids)} students to teacher",
+        "message": f"Moved {len(moved)} students to teacher",
+        "inserted": inserted,
+        "deleted": len(moved),
+        # already assigned to the target teacher
+        "skipped": len(moved) - inserted,
     }
 
+# =======================
+# USER LISTINGS
+# =======================
+
+# Only the columns the list schemas need (never password_hash)
+USER_LIST_COLUMNS = (
+    models.User.id,
+    models.User.name,
+    models.User.email,
+    models.User.mobile_number,
+    models.User.account_type,
+    models.User.created_at,
+)
+
+PERSON_LIST_COLUMNS = (
+    models.User.id,
+    models.User.name,
+    models.User.email,
+    models.User.created_at,
+)
+
+def _listed_institution(current_admin: models.Admin, institution_id: UUID | None) -> UUID | None:
+    """The institution a user list is limited to (None: every user)."""
+    if current_admin.institution_id is None:
+        # Developer can filter by institution
+        return institution_id
+    # Institution admin - only their institution
+    return current_admin.institution_id
+
+def _scope_to_institution(query, current_admin: models.Admin, institution_id: UUID | None):
+    scope = _listed_institution(current_admin, institution_id)
+    if scope is None:
+        return query
+    
+    return query.join(
+        models.InstitutionUser,
+        models.InstitutionUser.user_id == models.User.id,
+    ).where(
+        models.InstitutionUser.institution_id == scope,
+    )
+
+def _user_list_versions(current_admin: models.Admin, institution_id: UUID | None) -> list[str]:
+    scope = _listed_institution(current_admin, institution_id)
+    return [versions.ALL if scope is None else versions.institution_scope(scope)]
+
+async def _fetch_user_page(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    query,
+    current_admin: models.Admin,
+    institution_id: UUID | None,
+    cursor: str | None,
+    limit: int,
+    schema,
+) -> Response:
+    """
+    One page of `query`'s users, or every one of them (in id order) as
+    NDJSON when the client sends Accept: application/x-ndjson. The NDJSON
+    stream counts as an export: 503 + Retry-After when the export slots
+    are taken (see app.streaming).
+    """
+    if EXPORT_MEDIA_TYPES["ndjson"] in request.headers.get("accept", ""):
+        # Streamed from a server-side cursor: memory stays at one batch and
+        # the next batch is only fetched once the client has taken the
+        # previous one. Ordered by id, which the users pkey (or the
+        # institution_users (institution_id, user_id) index) returns
+        # without sorting, so the first rows go out straight away.
+        query = query.with_only_columns(*columns_for(models.User, schema)).order_by(models.User.id)
+        # The stream reads through the export pool of the same database;
+        # give this request's connection back before it starts
+        engine = read_engine_of(db)
+        await db.close()
+        return streaming_export(query, "ndjson", engine=engine)
+    
+    etag = await versions.etag_for(db, request, _user_list_versions(current_admin, institution_id))
+    if versions.not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    query = paginate(query, models.User.created_at, models.User.id, cursor, limit)
+    rows, next_cursor = split_page((await db.execute(query)).all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    # Rows are our own selected columns: skip response_model validation
+    return fast_json(rows_as(schema, rows), response)
+
 # =======================
 # GET TEACHERS
 # =======================
 
 @router.get("/teachers", response_model=list[schemas.TeacherResponse])
-def get_teachers(
+async def get_teachers(
+    request: Request,
+    response: Response,
     institution_id: UUID = None,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get teachers (filtered by institution if not developer)"""
     
-    query = db.query(models.User).filter(
+    query = select(*PERSON_LIST_COLUMNS).where(
         models.User.account_type.in_(["teacher", "admin"])
     )
-    
-    is_developer = current_admin.institution_id is None
-    
-    if is_developer and institution_id:
-        # Developer can filter by institution
-        query = query.join(
-            models.InstitutionUser,
-            models.InstitutionUser.user_id == models.User.id,
-        ).filter(
-            models.InstitutionUser.institution_id == institution_id,
-        )
-    elif not is_developer:
-        # Institution admin - only their institution
-        query = query.join(
-            models.InstitutionUser,
-            models.InstitutionUser.user_id == models.User.id,
-        ).filter(
-            models.InstitutionUser.institution_id == current_admin.institution_id,
-        )
-    
-    return query.all()
+    query = _scope_to_institution(query, current_admin, institution_id)
+    return await _fetch_user_page(
+        request, response, db, query, current_admin, institution_id, cursor, limit, schemas.TeacherResponse
+    )
 
 # =======================
 # GET STUDENTS
 # =======================
 
 @router.get("/students", response_model=list[schemas.StudentResponse])
-def get_students(
+async def get_students(
+    request: Request,
+    response: Response,
     institution_id: UUID = None,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get students (filtered by institution if not developer)"""
     
-    query = db.query(models.User).filter(
+    query = select(*PERSON_LIST_COLUMNS).where(
         models.User.account_type.in_(["student"])
     )
-    
-    is_developer = current_admin.institution_id is None
-    
-    if is_developer and institution_id:
-        query = query.join(
-            models.InstitutionUser,
-            models.InstitutionUser.user_id == models.User.id,
-        ).filter(
-            models.InstitutionUser.institution_id == institution_id,
-        )
-    elif not is_developer:
-        query = query.join(
-            models.InstitutionUser,
-            models.InstitutionUser.user_id == models.User.id,
-        ).filter(
-            models.InstitutionUser.institution_id == current_admin.institution_id,
-        )
-    
-    return query.all()
+    query = _scope_to_institution(query, current_admin, institution_id)
+    return await _fetch_user_page(
+        request, response, db, query, current_admin, institution_id, cursor, limit, schemas.StudentResponse
+    )
 
 # =======================
 # GET ALL USERS
 # =======================
 
 @router.get("/users", response_model=list[schemas.UserRead])
-def get_all_users(
+async def get_all_users(
+    request: Request,
+    response: Response,
     institution_id: UUID = None,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get all users"""
+    """Get all users, newest first. The next page's cursor is in X-Next-Cursor."""
     
-    query = db.query(models.User)
-    
-    is_developer = current_admin.institution_id is None
-    
-    if is_developer and institution_id:
-        query = query.join(
-            models.InstitutionUser,
-            models.InstitutionUser.user_id == models.User.id,
-        ).filter(
-            models.InstitutionUser.institution_id == institution_id,
-        )
-    elif not is_developer:
-        query = query.join(
-            models.InstitutionUser,
-            models.InstitutionUser.user_id == models.User.id,
-        ).filter(
-            models.InstitutionUser.institution_id == current_admin.institution_id,
-        )
-    
-    return query.all()
+    query = select(*USER_LIST_COLUMNS)
+    query = _scope_to_institution(query, current_admin, institution_id)
+    return await _fetch_user_page(
+        request, response, db, query, current_admin, institution_id, cursor, limit, schemas.UserRead
+    )
 
 # =======================
 # GET INSTITUTIONS
 # =======================
 
 @router.get("/institutions", response_model=list[schemas.InstitutionResponse])
-def get_institutions(
+async def get_institutions(
+    request: Request,
+    response: Response,
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get institutions (all for developer, only own for institution admin)"""
     
+    etag = await versions.etag_for(db, request, [versions.INSTITUTIONS])
+    if versions.not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     if current_admin.institution_id is None:
         # Developer - get all
-        return db.query(models.Institution).all()
+        result = await db.scalars(select(models.Institution))
+        return result.all()
     else:
         # Institution admin - get only own
-        return [current_admin.institution]
+        return [await db.get(models.Institution, current_admin.institution_id)]
 
 # =======================
 # CREATE INSTITUTION
 # =======================
 
 @router.post("/institutions", response_model=schemas.InstitutionResponse)
-def create_institution(
+async def create_institution(
     request: schemas.InstitutionCreate,
     current_admin: models.Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create institution (developer only)"""
     
@@ -307,7 +567,267 @@ def create_institution(
     )
     
     db.add(new_institution)
-    db.commit()
-    db.refresh(new_institution)
+    await db.commit()
+    await db.refresh(new_institution)
     
     return new_institution
+
+# =======================
+# DASHBOARD STATS
+# =======================
+
+ADMIN_STATS_TTL_SECONDS = float(os.getenv("ADMIN_STATS_TTL_SECONDS", "30"))
+RECENT_SIGNUP_DAYS = 30
+
+# Keyed by institution_id (None = whole platform for developer admins)
+stats_cache = TTLCache(maxsize=256, ttl_seconds=ADMIN_STATS_TTL_SECONDS)
+
+async def _compute_stats(db: AsyncSession, institution_id: UUID | None) -> dict:
+    iu = models.InstitutionUser
+    
+    # Users in scope: everyone, or members of one institution
+    if institution_id is None:
+        scoped_users = select(models.User.id, models.User.account_type, models.User.created_at)
+    else:
+        scoped_users = (
+            select(models.User.id, iu.role.label("account_type"), models.User.created_at)
+            .join(iu, iu.user_id == models.User.id)
+            .where(iu.institution_id == institution_id)
+        )
+    scoped_users = scoped_users.subquery()
+    
+    role = func.coalesce(scoped_users.c.account_type, "personal")
+    users_by_role = {
+        row.role: row.count
+        for row in await db.execute(
+            select(role.label("role"), func.count().label("count")).group_by(role)
+        )
+    }
+    
+    per_institution = (
+        select(
+            models.Institution.id,
+            models.Institution.name,
+            func.count(iu.id).label("users"),
+            func.count(iu.id).filter(iu.role == "teacher").label("teachers"),
+            func.count(iu.id).filter(iu.role == "student").label("students"),
+        )
+        .outerjoin(iu, iu.institution_id == models.Institution.id)
+        .group_by(models.Institution.id, models.Institution.name)
+        .order_by(models.Institution.name)
+    )
+    if institution_id is not None:
+        per_institution = per_institution.where(models.Institution.id == institution_id)
+    institutions = [
+        {
+            "institution_id": row.id,
+            "name": row.name,
+            "users": row.users,
+            "teachers": row.teachers,
+            "students": row.students,
+        }
+        for row in await db.execute(per_institution)
+    ]
+    
+    tasks_by_status_query = select(models.Task.status, func.count()).group_by(models.Task.status)
+    if institution_id is not None:
+        tasks_by_status_query = tasks_by_status_query.where(
+            models.Task.user_id.in_(select(scoped_users.c.id))
+        )
+    tasks_by_status = dict((await db.execute(tasks_by_status_query)).all())
+    
+    day = func.date_trunc("day", scoped_users.c.created_at)
+    since = datetime.now(timezone.utc) - timedelta(days=RECENT_SIGNUP_DAYS)
+    recent_signups = [
+        {"day": row.day.date(), "count": row.count}
+        for row in await db.execute(
+            select(day.label("day"), func.count().label("count"))
+            .where(scoped_users.c.created_at >= since)
+            .group_by(day)
+            .order_by(day)
+        )
+    ]
+    
+    return {
+        "total_users": sum(users_by_role.values()),
+        "total_institutions": len(institutions),
+        "users_by_role": users_by_role,
+        "institutions": institutions,
+        "tasks_by_status": tasks_by_status,
+        "recent_signups": recent_signups,
+        "generated_at": datetime.now(timezone.utc),
+    }
+
+@router.get("/stats", response_model=schemas.AdminStatsResponse)
+async def get_stats(
+    current_admin: models.Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Aggregate counts for the dashboards (platform-wide for developer admins)"""
+    
+    scope = current_admin.institution_id
+    stats = stats_cache.get(scope)
+    if stats is None:
+        stats = await _compute_stats(db, scope)
+        stats_cache.set(scope, stats)
+    return stats
+
+# =======================
+# INSTITUTION ANALYTICS
+# =======================
+
+ANALYTICS_FIELDS = (
+    "planned_minutes",
+    "completed_minutes",
+    "skipped_sessions",
+    "tasks_completed",
+    "tasks_overdue",
+)
+ANALYTICS_COURSE_LIMIT = int(os.getenv("ANALYTICS_COURSE_LIMIT", "50"))
+
+def _totals(row) -> dict:
+    totals = {field: row[field] or 0 for field in ANALYTICS_FIELDS}
+    if totals["planned_minutes"]:
+        totals["completion_rate"] = round(totals["completed_minutes"] / totals["planned_minutes"], 4)
+    return totals
+
+@router.get("/analytics", response_model=schemas.AdminAnalyticsResponse)
+async def get_analytics(
+    range_: Literal["7d", "30d", "90d", "365d"] = Query(default="30d", alias="range"),
+    institution_id: Optional[UUID] = Query(default=None),
+    current_admin: models.Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Daily activity by role, per-teacher roster totals and the busiest
+    courses, read only from the materialised tables (see
+    app.admin_analytics). Developer admins see all institutions unless
+    institution_id is given.
+    """
+    if current_admin.institution_id is not None:
+        institution_id = current_admin.institution_id
+    
+    end = datetime.now(timezone.utc).date()
+    start = end - timedelta(days=RANGE_DAYS[range_] - 1)
+    
+    ids = models.InstitutionDailyStats
+    sums = [func.sum(getattr(ids, field)).label(field) for field in ANALYTICS_FIELDS]
+    in_range = [ids.day >= start, ids.day <= end]
+    if institution_id is not None:
+        in_range.append(ids.institution_id == institution_id)
+    
+    days = (await db.execute(
+        select(ids.day, ids.role, func.sum(ids.active_users).label("active_users"), *sums)
+        .where(*in_range)
+        .group_by(ids.day, ids.role)
+        .order_by(ids.day, ids.role)
+    )).mappings().all()
+    
+    roles = [
+        {"role": row["role"], **_totals(row)}
+        for row in (await db.execute(
+            select(ids.role, *sums).where(*in_range).group_by(ids.role).order_by(ids.role)
+        )).mappings()
+    ]
+    
+    trs = models.TeacherRosterDailyStats
+    roster_sums = (
+        select(trs.teacher_id, *[func.sum(getattr(trs, field)).label(field) for field in ANALYTICS_FIELDS])
+        .where(trs.day >= start, trs.day <= end)
+        .group_by(trs.teacher_id)
+    )
+    if institution_id is not None:
+        roster_sums = roster_sums.where(trs.institution_id == institution_id)
+    roster_sums = roster_sums.subquery()
+    rosters = [
+        {"teacher_id": row["teacher_id"], "teacher_name": row["name"], **_totals(row)}
+        for row in (await db.execute(
+            select(roster_sums, models.User.name)
+            .join(models.User, models.User.id == roster_sums.c.teacher_id)
+            .order_by(models.User.name, roster_sums.c.teacher_id)
+        )).mappings()
+    ]
+    
+    cds = models.CourseDailyStats
+    course_sums = [func.sum(getattr(cds, field)).label(field) for field in ANALYTICS_FIELDS]
+    course_query = (
+        select(cds.course, func.sum(cds.active_students).label("active_student_days"), *course_sums)
+        .where(cds.day >= start, cds.day <= end)
+        .group_by(cds.course)
+        .order_by(func.sum(cds.planned_minutes).desc(), cds.course)
+        .limit(ANALYTICS_COURSE_LIMIT)
+    )
+    if institution_id is not None:
+        course_query = course_query.where(cds.institution_id == institution_id)
+    courses = [
+        {"course": row["course"], "active_student_days": row["active_student_days"] or 0, **_totals(row)}
+        for row in (await db.execute(course_query)).mappings()
+    ]
+    
+    refreshed_at = await db.scalar(
+        select(models.AnalyticsRefreshState.refreshed_at)
+        .where(models.AnalyticsRefreshState.name == REFRESH_JOB)
+    )
+    
+    return {
+        "range": range_,
+        "start": start,
+        "end": end,
+        "institution_id": institution_id,
+        "refreshed_at": refreshed_at,
+        "days": days,
+        "roles": roles,
+        "rosters": rosters,
+        "courses": courses,
+    }
+
+# =======================
+# EXPORTS
+# =======================
+
+USER_EXPORT_COLUMNS = (
+    models.User.id,
+    models.User.name,
+    models.User.email,
+    models.User.mobile_number,
+    models.User.account_type,
+    models.User.created_at,
+)
+
+@router.get("/exports/{dataset}")
+async def export_data(
+    dataset: Literal["users", "tasks", "sessions"],
+    format: ExportFormat = Query(default="csv"),
+    institution_id: Optional[UUID] = Query(default=None),
+    teacher_id: Optional[UUID] = Query(default=None),
+    current_admin: models.Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Stream users, tasks or sessions for an institution, or for one
+    teacher's roster when teacher_id is given. Developer admins without
+    institution_id export the whole platform.
+    """
+    if teacher_id is not None:
+        await _get_teacher_for_admin(db, current_admin, teacher_id)
+        user_ids = select(models.StudentTeacher.student_id).where(
+            models.StudentTeacher.teacher_id == teacher_id,
+        )
+    else:
+        scope = current_admin.institution_id or institution_id
+        user_ids = None
+        if scope is not None:
+            user_ids = select(models.InstitutionUser.user_id).where(
+                models.InstitutionUser.institution_id == scope,
+            )
+    
+    if dataset == "users":
+        query = select(*USER_EXPORT_COLUMNS).order_by(models.User.created_at, models.User.id)
+        if user_ids is not None:
+            query = query.where(models.User.id.in_(user_ids))
+    elif dataset == "tasks":
+        query = task_export_query(user_ids)
+    else:
+        query = session_export_query(user_ids)
+    
+    return streaming_export(query, format, filename=dataset, engine=read_engine_of(db))
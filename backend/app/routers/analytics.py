@@ -0,0 +1,89 @@
+# app/routers/analytics.py
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.deps import get_read_db, get_current_user
+from app.rollups import ROLLUP_FIELDS
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+RANGE_DAYS = {"7d": 7, "30d": 30, "90d": 90, "365d": 365}
+
+# pg_timezone_names, loaded on first use: the database's zone data can
+# lag the tzdata Python reads, and AT TIME ZONE fails on names it lacks
+_postgres_time_zones: frozenset[str] | None = None
+
+
+async def postgres_time_zones(db) -> frozenset[str]:
+    global _postgres_time_zones
+    if _postgres_time_zones is None:
+        _postgres_time_zones = frozenset(await db.scalars(text("SELECT name FROM pg_timezone_names")))
+    return _postgres_time_zones
+
+
+@router.get("/summary", response_model=schemas.AnalyticsSummary)
+async def analytics_summary(
+    range_: Literal["7d", "30d", "90d", "365d"] = Query(default="30d", alias="range"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Study-time and task totals for the last `range` days (UTC), read from
+    the daily rollup, so the cost depends on the range, not on history.
+    """
+    end = datetime.now(timezone.utc).date()
+    start = end - timedelta(days=RANGE_DAYS[range_] - 1)
+
+    days = (await db.scalars(
+        select(models.UserDailyStats)
+        .where(
+            models.UserDailyStats.user_id == current_user.id,
+            models.UserDailyStats.day >= start,
+            models.UserDailyStats.day <= end,
+        )
+        .order_by(models.UserDailyStats.day)
+    )).all()
+
+    totals = {field: sum(getattr(day, field) for day in days) for field in ROLLUP_FIELDS}
+    if totals["planned_minutes"]:
+        totals["completion_rate"] = round(totals["completed_minutes"] / totals["planned_minutes"], 4)
+
+    return {
+        "range": range_,
+        "start": start,
+        "end": end,
+        "totals": totals,
+        "days": days,
+    }
+
+
+@router.get("/trends", response_model=schemas.TrendsResponse)
+async def analytics_trends(
+    days: int = Query(default=90, ge=7, le=365),
+    tz: str = Query(default="UTC", description="IANA time zone for day/hour buckets"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Daily and rolling 7-day study time, streaks, per-course workload and a
+    weekday x hour heatmap for the last `days` days, in the user's time zone.
+    """
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown time zone")
+    if tz not in await postgres_time_zones(db):
+        raise HTTPException(status_code=400, detail="Unknown time zone")
+
+    # NumPy is only loaded once trend charts are requested
+    from app import trends
+
+    today = datetime.now(zone).date()
+    result = await trends.user_trends(db, current_user.id, today, days, tz)
+    return {"tz": tz, **result}
@@ -1,23 +1,31 @@
 # app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
-from app.deps import get_db, get_password_hash, verify_password, create_access_token, get_current_user
+from app.deps import (
+    get_db,
+    get_password_hash,
+    verify_password,
+    password_needs_rehash,
+    create_access_token,
+    get_current_user,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=schemas.UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if email already exists
-    existing = db.query(models.User).filter(models.User.email == user_in.email).first()
+    existing = await db.scalar(select(models.User.id).where(models.User.email == user_in.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Hash password
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash(user_in.password)
 
     user = models.User(
         name=user_in.name,
@@ -27,28 +35,34 @@ def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
         account_type=user_in.account_type or "personal",
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # OAuth2PasswordRequestForm sends "username" and "password"
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
-    if not verify_password(form_data.password, user.password_hash):
+    if not await verify_password(form_data.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
+    # Upgrade hashes made with an older BCRYPT_ROUNDS setting
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash(form_data.password)
+        db.add(user)
+        await db.commit()
+
     access_token = create_access_token(data={"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=schemas.UserRead)
-def read_current_user(current_user: models.User = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+async def read_current_user(current_user: models.User = Depends(get_current_user)):
+    return current_user
@@ -1,17 +1,18 @@
 # app/routers/courses.py
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import models, schemas
-from app.deps import get_db, get_current_user
+from app import models, schemas, versions
+from app.deps import get_db, get_read_db, get_current_user
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
 
 @router.post("/", response_model=schemas.CourseRead, status_code=status.HTTP_201_CREATED)
-def create_course(
+async def create_course(
     course_in: schemas.CourseCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     course = models.Course(
@@ -20,20 +21,25 @@ def create_course(
         description=course_in.description,
     )
     db.add(course)
-    db.commit()
-    db.refresh(course)
+    await db.commit()
+    await db.refresh(course)
     return course
 
 
 @router.get("/", response_model=schemas.CoursesList)
-def list_courses(
-    db: Session = Depends(get_db),
+async def list_courses(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    courses = (
-        db.query(models.Course)
-        .filter(models.Course.user_id == current_user.id)
+    etag = await versions.etag_for(db, request, [versions.user_scope(current_user.id)])
+    if versions.not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    result = await db.scalars(
+        select(models.Course)
+        .where(models.Course.user_id == current_user.id)
         .order_by(models.Course.created_at.desc())
-        .all()
     )
-    return {"courses": courses}
\ No newline at end of file
+    return {"courses": result.all()}
@@ -0,0 +1,74 @@
+# app/routers/exports.py
+# Streaming exports of the current user's data (admin exports live in
+# admin.py and reuse the column lists below).
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.deps import get_current_user, get_read_db
+from app.replica import read_engine_of
+from app.streaming import streaming_export
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+TASK_EXPORT_COLUMNS = (
+    models.Task.id,
+    models.Task.user_id,
+    models.Task.course_id,
+    models.Task.title,
+    models.Task.description,
+    models.Task.status,
+    models.Task.priority,
+    models.Task.due_at,
+    models.Task.estimated_minutes,
+    models.Task.completed_at,
+    models.Task.created_at,
+    models.Task.updated_at,
+)
+
+SESSION_EXPORT_COLUMNS = (
+    models.TaskSession.id,
+    models.TaskSession.user_id,
+    models.TaskSession.task_id,
+    models.TaskSession.start_at,
+    models.TaskSession.end_at,
+    models.TaskSession.source,
+    models.TaskSession.status,
+    models.TaskSession.created_at,
+)
+
+
+def task_export_query(user_ids=None):
+    """All tasks, or those of `user_ids` (a list or a subquery), in index order."""
+    query = select(*TASK_EXPORT_COLUMNS)
+    if user_ids is not None:
+        query = query.where(models.Task.user_id.in_(user_ids))
+    return query.order_by(models.Task.user_id, models.Task.created_at, models.Task.id)
+
+
+def session_export_query(user_ids=None):
+    query = select(*SESSION_EXPORT_COLUMNS)
+    if user_ids is not None:
+        query = query.where(models.TaskSession.user_id.in_(user_ids))
+    return query.order_by(models.TaskSession.user_id, models.TaskSession.start_at, models.TaskSession.id)
+
+
+@router.get("/{dataset}")
+async def export_my_data(
+    dataset: Literal["tasks", "sessions"],
+    format: ExportFormat = Query(default="csv"),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Download all of the user's tasks or sessions (streamed)."""
+    if dataset == "tasks":
+        query = task_export_query([current_user.id])
+    else:
+        query = session_export_query([current_user.id])
+    # db only picks the engine; the stream opens its own connection
+    return streaming_export(query, format, filename=dataset, engine=read_engine_of(db))
@@ -1,25 +1,26 @@
 # app/routers/institutions.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app import models, schemas
-from app.deps import get_db, get_current_user
+from app import models, schemas, versions
+from app.deps import get_db, get_read_db, get_current_user
 
 router = APIRouter(prefix="/institutions", tags=["institutions"])
 
 
 @router.post("/", response_model=schemas.InstitutionRead, status_code=status.HTTP_201_CREATED)
-def create_institution(
+async def create_institution(
     inst_in: schemas.InstitutionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     # Optionally you could enforce unique code here
     if inst_in.code:
-        existing = (
-            db.query(models.Institution)
-            .filter(models.Institution.code == inst_in.code)
-            .first()
+        existing = await db.scalar(
+            select(models.Institution.id)
+            .where(models.Institution.code == inst_in.code)
         )
         if existing:
             raise HTTPException(status_code=400, detail="Institution code already in use")
@@ -29,8 +30,8 @@ def create_institution(
         code=inst_in.code,
     )
     db.add(inst)
-    db.commit()
-    db.refresh(inst)
+    await db.commit()
+    await db.refresh(inst)
 
     membership = models.InstitutionUser(
         user_id=current_user.id,
@@ -44,19 +45,25 @@ def create_institution(
         current_user.account_type = "admin"
         db.add(current_user)
 
-    db.commit()
-    db.refresh(inst)
+    await db.commit()
+    await db.refresh(inst)
     return inst
 
 
 @router.get("/my", response_model=schemas.InstitutionMemberships)
-def list_my_institutions(
-    db: Session = Depends(get_db),
+async def list_my_institutions(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    memberships = (
-        db.query(models.InstitutionUser)
-        .filter(models.InstitutionUser.user_id == current_user.id)
-        .all()
+    etag = await versions.etag_for(db, request, [versions.user_scope(current_user.id), versions.INSTITUTIONS])
+    if versions.not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    result = await db.scalars(
+        select(models.InstitutionUser)
+        .where(models.InstitutionUser.user_id == current_user.id)
+        .options(selectinload(models.InstitutionUser.institution))
     )
-    return {"memberships": memberships}
+    return {"memberships": result.all()}
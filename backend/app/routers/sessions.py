@@ -0,0 +1,451 @@
+# app/routers/sessions.py
+# Task sessions across all of a user's tasks (the per-task endpoints live
+# in tasks.py).
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Literal
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app import models, rollups, scheduler, schemas, versions
+from app.deps import get_db, get_read_db, get_current_user
+
+router = APIRouter(prefix="/sessions", tags=["sessions"])
+
+# Sessions longer than this are rejected (400 from the API, and a CHECK
+# constraint on task_sessions for everything else). It lets range queries
+# put a lower bound on start_at and stay on the (user_id, start_at) index.
+MAX_SESSION_DURATION = timedelta(hours=24)
+MAX_RANGE = timedelta(days=366)
+
+DEFAULT_SCHEDULE_HORIZON = timedelta(days=14)
+OPEN_TASK_STATUSES = ("pending", "in_progress")
+
+# What to do when a new session overlaps one the user already has
+ConflictMode = Literal["allow", "reject", "shift"]
+MAX_SHIFT_STEPS = 100
+
+
+def as_aware(value: datetime, tz: tzinfo = timezone.utc) -> datetime:
+    """`value` with naive times read as being in `tz` (UTC by default)."""
+    return value.replace(tzinfo=tz) if value.tzinfo is None else value
+
+
+def check_range(from_: datetime, to: datetime) -> tuple[datetime, datetime]:
+    """Both bounds as aware datetimes; 400 if the range is empty or too long."""
+    from_, to = as_aware(from_), as_aware(to)
+    if to <= from_:
+        raise HTTPException(status_code=400, detail="to must be after from")
+    if to - from_ > MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Range can't exceed 366 days")
+    return from_, to
+
+
+def schedule_window(request: schemas.ScheduleRequest, tz: tzinfo, now: datetime) -> tuple[datetime, datetime]:
+    """
+    The [start, end) to plan in for `request`: never before `now`,
+    DEFAULT_SCHEDULE_HORIZON long unless end_at is given. Naive start_at
+    and end_at are read in the request's time zone.
+    """
+    start = max(as_aware(request.start_at, tz) if request.start_at else now, now)
+    end = as_aware(request.end_at, tz) if request.end_at else start + DEFAULT_SCHEDULE_HORIZON
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end_at must be in the future and after start_at")
+    if end - start > MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Range can't exceed 366 days")
+    return start, end
+
+
+def validate_session_times(start_at: datetime, end_at: datetime) -> str | None:
+    """Error message for an invalid session interval, else None."""
+    start_at, end_at = as_aware(start_at), as_aware(end_at)
+    if end_at <= start_at:
+        return "end_at must be after start_at"
+    if end_at - start_at > MAX_SESSION_DURATION:
+        return "Sessions can't be longer than 24 hours"
+    return None
+
+
+async def _insert_sessions(db: AsyncSession, user_id: UUID, rows: list[dict]) -> list[models.TaskSession]:
+    """
+    Insert already-validated session rows in one statement and add them
+    to the analytics rollup.
+
+    Returns the created sessions in the same order as `rows`; the caller
+    commits.
+    """
+    if not rows:
+        return []
+    created = await db.scalars(
+        insert(models.TaskSession).returning(models.TaskSession, sort_by_parameter_order=True),
+        [dict(row, user_id=user_id) for row in rows],
+    )
+    sessions = created.all()
+    await rollups.record_sessions(db, sessions)
+    versions.touch(db, versions.user_scope(user_id))
+    return sessions
+
+
+def _overlapping(user_id: UUID, start_at: datetime, end_at: datetime):
+    """
+    The user's sessions overlapping [start_at, end_at), skipped ones
+    excluded. MAX_SESSION_DURATION bounds start_at from below, so this is
+    a short range scan on (user_id, start_at), whatever the history size.
+    """
+    return (
+        select(models.TaskSession.start_at, models.TaskSession.end_at)
+        .where(
+            models.TaskSession.user_id == user_id,
+            models.TaskSession.start_at < end_at,
+            models.TaskSession.start_at > start_at - MAX_SESSION_DURATION,
+            models.TaskSession.end_at > start_at,
+            models.TaskSession.status != "skipped",
+        )
+    )
+
+
+async def lock_user_sessions(db: AsyncSession, user_id: UUID) -> None:
+    """Serialise overlap-checked writes for one user until the transaction ends."""
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(str(user_id)))))
+
+
+async def resolve_conflicts(
+    db: AsyncSession,
+    user_id: UUID,
+    rows: list[dict],
+    mode: ConflictMode,
+) -> list[str | None]:
+    """
+    Check new session rows against the user's sessions and the earlier
+    rows of the same request.
+
+    "reject" returns an error for each overlapping row; "shift" moves a
+    row (keeping its length) to the first free time after what it
+    overlaps, updating it in place. Returns one error (or None) per row.
+
+    Overlaps aren't a database constraint ("allow" permits them), so the
+    check holds the user's advisory lock until the caller commits:
+    concurrent reject/shift writes (and POST /sessions/schedule) for the
+    same user run one after another and see each other's sessions.
+    "allow" writes don't take the lock and can still overlap them.
+    """
+    if mode == "allow":
+        return [None] * len(rows)
+    await lock_user_sessions(db, user_id)
+
+    accepted: list[tuple[datetime, datetime]] = []
+    errors = []
+    for row in rows:
+        start_at, end_at = row["start_at"], row["end_at"]
+        error = None
+        if row.get("status") != "skipped":
+            for _ in range(MAX_SHIFT_STEPS):
+                clashes = [(s, e) for s, e in accepted if s < end_at and e > start_at]
+                clashes += (await db.execute(_overlapping(user_id, start_at, end_at))).all()
+                if not clashes:
+                    break
+                if mode == "reject":
+                    error = "Overlaps an existing session"
+                    break
+                length = end_at - start_at
+                start_at = max(e for _, e in clashes)
+                end_at = start_at + length
+            else:
+                error = "No free time found to shift the session into"
+        if error is None:
+            row["start_at"], row["end_at"] = start_at, end_at
+            accepted.append((start_at, end_at))
+        errors.append(error)
+    return errors
+
+
+@router.get("/", response_model=schemas.CalendarSessionList)
+async def list_sessions_in_range(
+    from_: datetime = Query(alias="from"),
+    to: datetime = Query(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Every session of the user overlapping [from, to), across all tasks,
+    with a short summary of its task. Used by the calendar/timetable views.
+    Times without an offset are taken as UTC.
+    """
+    from_, to = check_range(from_, to)
+
+    rows = await db.execute(
+        select(
+            models.TaskSession.id,
+            models.TaskSession.task_id,
+            models.TaskSession.start_at,
+            models.TaskSession.end_at,
+            models.TaskSession.source,
+            models.TaskSession.status,
+            models.Task.title,
+            models.Task.priority,
+            models.Task.course_id,
+            models.Course.title.label("course_title"),
+        )
+        .join(models.Task, models.Task.id == models.TaskSession.task_id)
+        .outerjoin(models.Course, models.Course.id == models.Task.course_id)
+        .where(
+            models.TaskSession.user_id == current_user.id,
+            models.TaskSession.start_at < to,
+            models.TaskSession.start_at > from_ - MAX_SESSION_DURATION,
+            models.TaskSession.end_at > from_,
+        )
+        .order_by(models.TaskSession.start_at)
+    )
+
+    sessions = [
+        {
+            "id": row.id,
+            "task_id": row.task_id,
+            "start_at": row.start_at,
+            "end_at": row.end_at,
+            "source": row.source,
+            "status": row.status,
+            "task": {
+                "title": row.title,
+                "priority": row.priority,
+                "course_id": row.course_id,
+                "course_title": row.course_title,
+            },
+        }
+        for row in rows
+    ]
+    return {"sessions": sessions}
+
+
+@router.get("/conflicts", response_model=schemas.SessionConflictList)
+async def list_session_conflicts(
+    from_: datetime = Query(alias="from"),
+    to: datetime = Query(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Pairs of the user's sessions that overlap each other, for sessions
+    starting in [from, to). Skipped sessions are ignored. Each pair is
+    listed once, ordered by the earlier session. Times without an offset
+    are taken as UTC.
+    """
+    from_, to = check_range(from_, to)
+
+    first = aliased(models.TaskSession)
+    second = aliased(models.TaskSession)
+    rows = await db.execute(
+        select(
+            first.id, first.task_id, first.start_at, first.end_at,
+            second.id.label("other_id"),
+            second.task_id.label("other_task_id"),
+            second.start_at.label("other_start_at"),
+            second.end_at.label("other_end_at"),
+        )
+        .join(
+            second,
+            # second starts inside first: one index range scan per session
+            (second.user_id == first.user_id)
+            & (tuple_(second.start_at, second.id) > tuple_(first.start_at, first.id))
+            & (second.start_at < first.end_at)
+            & (second.status != "skipped"),
+        )
+        .where(
+            first.user_id == current_user.id,
+            first.start_at >= from_,
+            first.start_at < to,
+            first.status != "skipped",
+        )
+        .order_by(first.start_at, first.id, second.start_at, second.id)
+    )
+
+    conflicts = [
+        {
+            "first": {"id": row.id, "task_id": row.task_id, "start_at": row.start_at, "end_at": row.end_at},
+            "second": {
+                "id": row.other_id,
+                "task_id": row.other_task_id,
+                "start_at": row.other_start_at,
+                "end_at": row.other_end_at,
+            },
+            "overlap_start": row.other_start_at,
+            "overlap_end": min(row.end_at, row.other_end_at),
+        }
+        for row in rows
+    ]
+    return {"conflicts": conflicts}
+
+
+@router.post("/batch", response_model=schemas.TaskSessionBatchResult)
+async def create_sessions_batch(
+    batch_in: schemas.TaskSessionBatchCreate,
+    on_conflict: ConflictMode = Query(default="allow"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Create many sessions, possibly for different tasks, in one transaction.
+
+    Task ownership is checked with a single query. Results come back in
+    input order with a per-item error for anything that was rejected,
+    including sessions that don't end after they start or last over 24
+    hours.
+    on_conflict=reject|shift checks for overlaps (see resolve_conflicts).
+    """
+    task_ids = {item.task_id for item in batch_in.sessions}
+    owned_tasks = set(await db.scalars(
+        select(models.Task.id)
+        .where(
+            models.Task.user_id == current_user.id,
+            models.Task.id.in_(task_ids),
+        )
+    ))
+
+    results = [{"index": index} for index in range(len(batch_in.sessions))]
+    rows, row_indexes = [], []
+    for index, item in enumerate(batch_in.sessions):
+        if item.task_id not in owned_tasks:
+            results[index]["error"] = "Task not found"
+            continue
+        error = validate_session_times(item.start_at, item.end_at)
+        if error:
+            results[index]["error"] = error
+            continue
+        rows.append({
+            "task_id": item.task_id,
+            "start_at": as_aware(item.start_at),
+            "end_at": as_aware(item.end_at),
+            "source": item.source or "manual",
+            "status": item.status or "planned",
+        })
+        row_indexes.append(index)
+
+    errors = await resolve_conflicts(db, current_user.id, rows, on_conflict)
+    for index, error in zip(row_indexes, errors):
+        if error:
+            results[index]["error"] = error
+    rows = [row for row, error in zip(rows, errors) if not error]
+    row_indexes = [index for index, error in zip(row_indexes, errors) if not error]
+
+    created = await _insert_sessions(db, current_user.id, rows)
+    for index, session in zip(row_indexes, created):
+        results[index]["session"] = session
+    if created:
+        await db.commit()
+
+    return {"results": results}
+
+
+@router.post("/schedule", response_model=schemas.ScheduleResult)
+async def schedule_sessions(
+    request: schemas.ScheduleRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Plan 'ai' sessions for the remaining estimated time of the user's open
+    tasks, inside the daily study window and around existing sessions
+    (see app.scheduler). All sessions are written in one batch.
+    """
+    try:
+        tz = ZoneInfo(request.tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown time zone")
+    if request.day_end <= request.day_start:
+        raise HTTPException(status_code=400, detail="day_end must be after day_start")
+    if request.min_session_minutes > request.max_session_minutes:
+        raise HTTPException(
+            status_code=400, detail="min_session_minutes can't exceed max_session_minutes",
+        )
+
+    start, end = schedule_window(request, tz, datetime.now(timezone.utc))
+
+    open_tasks = select(models.Task.id).where(
+        models.Task.user_id == current_user.id,
+        models.Task.status.in_(OPEN_TASK_STATUSES),
+    )
+    if request.task_ids is not None:
+        open_tasks = open_tasks.where(models.Task.id.in_(request.task_ids))
+
+    tasks = (await db.execute(
+        select(
+            models.Task.id,
+            models.Task.priority,
+            models.Task.due_at,
+            models.Task.estimated_minutes,
+        ).where(models.Task.id.in_(open_tasks))
+    )).all()
+
+    # Time already planned or done counts against the estimate
+    session_minutes = func.extract("epoch", models.TaskSession.end_at - models.TaskSession.start_at) / 60
+    scheduled = dict((await db.execute(
+        select(models.TaskSession.task_id, func.sum(session_minutes))
+        .where(
+            models.TaskSession.user_id == current_user.id,
+            models.TaskSession.task_id.in_(open_tasks),
+            models.TaskSession.status != "skipped",
+        )
+        .group_by(models.TaskSession.task_id)
+    )).all())
+
+    await lock_user_sessions(db, current_user.id)
+    busy = (await db.execute(
+        select(models.TaskSession.start_at, models.TaskSession.end_at)
+        .where(
+            models.TaskSession.user_id == current_user.id,
+            models.TaskSession.start_at < end,
+            models.TaskSession.start_at > start - MAX_SESSION_DURATION,
+            models.TaskSession.end_at > start,
+            models.TaskSession.status != "skipped",
+        )
+    )).all()
+
+    unscheduled = []
+    to_plan = []
+    for task in tasks:
+        if not task.estimated_minutes:
+            unscheduled.append({"task_id": task.id, "minutes": 0, "reason": scheduler.NO_ESTIMATE})
+            continue
+        to_plan.append(scheduler.SchedulingTask(
+            id=task.id,
+            priority=task.priority,
+            due=scheduler.to_minutes(task.due_at) if task.due_at else None,
+            minutes=task.estimated_minutes - int(scheduled.get(task.id) or 0),
+        ))
+
+    window_start, window_end = scheduler.to_minutes(start), scheduler.to_minutes(end)
+    free = scheduler.subtract_intervals(
+        scheduler.daily_windows(window_start, window_end, tz, request.day_start, request.day_end),
+        scheduler.merge_intervals(
+            (scheduler.to_minutes(row.start_at, round_up=False), scheduler.to_minutes(row.end_at))
+            for row in busy
+        ),
+    )
+    planned, left_over = scheduler.schedule(to_plan, free, scheduler.ScheduleOptions(
+        max_session_minutes=request.max_session_minutes,
+        min_session_minutes=request.min_session_minutes,
+        break_minutes=request.break_minutes,
+    ))
+    unscheduled.extend(
+        {"task_id": task_id, "minutes": minutes, "reason": reason}
+        for task_id, (minutes, reason) in left_over.items()
+    )
+
+    created = await _insert_sessions(db, current_user.id, [
+        {
+            "task_id": session.task_id,
+            "start_at": scheduler.from_minutes(session.start),
+            "end_at": scheduler.from_minutes(session.end),
+            "source": "ai",
+            "status": "planned",
+        }
+        for session in planned
+    ])
+    if created:
+        await db.commit()
+
+    return {"sessions": created, "unscheduled": unscheduled}
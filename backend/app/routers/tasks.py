@@ -1,35 +1,55 @@
 # app/routers/tasks.py
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import models, schemas
-from app.deps import get_db, get_current_user
+from app import models, rollups, schemas, versions
+from app.deps import get_db, get_read_db, get_current_user
+from app.pagination import MAX_PAGE_SIZE, page_size, paginate, split_page
+from app.responses import columns_for, fast_json, rows_as
+from app.routers.sessions import ConflictMode, as_aware, resolve_conflicts, validate_session_times
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+async def _get_user_task(
+    db: AsyncSession, task_id: UUID, user_id: UUID, for_update: bool = False
+) -> models.Task:
+    query = select(models.Task).where(models.Task.id == task_id, models.Task.user_id == user_id)
+    if for_update:
+        query = query.with_for_update()
+    task = await db.scalar(query)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+async def _user_owns_course(db: AsyncSession, course_id: UUID, user_id: UUID) -> bool:
+    found = await db.scalar(
+        select(models.Course.id)
+        .where(
+            models.Course.id == course_id,
+            models.Course.user_id == user_id,
+        )
+    )
+    return found is not None
+
+
 # ---------- TASKS ----------
 
 @router.post("/", response_model=schemas.TaskRead, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task_in: schemas.TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     # Optional: validate course belongs to user
     if task_in.course_id:
-        course = (
-            db.query(models.Course)
-            .filter(
-                models.Course.id == task_in.course_id,
-                models.Course.user_id == current_user.id,
-            )
-            .first()
-        )
-        if not course:
+        if not await _user_owns_course(db, task_in.course_id, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Course not found for this user",
@@ -44,85 +64,172 @@ def create_task(
         due_at=task_in.due_at,
         estimated_minutes=task_in.estimated_minutes,
     )
+    rollups.mark_overdue(task)
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await rollups.record_task_changes(db, current_user.id, [(None, rollups.TaskState.of(task))])
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
+@router.post("/batch", response_model=schemas.TaskBatchResult)
+async def create_tasks_batch(
+    batch_in: schemas.TaskBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Create many tasks in one transaction.
+
+    Results come back in input order; items referencing a course the user
+    doesn't own get an error and are not created.
+    """
+    course_ids = {item.course_id for item in batch_in.tasks if item.course_id}
+    owned_courses = set()
+    if course_ids:
+        owned_courses = set(await db.scalars(
+            select(models.Course.id)
+            .where(
+                models.Course.user_id == current_user.id,
+                models.Course.id.in_(course_ids),
+            )
+        ))
+
+    results = [{"index": index} for index in range(len(batch_in.tasks))]
+    rows, row_indexes = [], []
+    now = datetime.now(timezone.utc)
+    for index, item in enumerate(batch_in.tasks):
+        if item.course_id and item.course_id not in owned_courses:
+            results[index]["error"] = "Course not found for this user"
+            continue
+        rows.append({
+            "user_id": current_user.id,
+            "course_id": item.course_id,
+            "title": item.title,
+            "description": item.description,
+            "priority": item.priority,
+            "due_at": item.due_at,
+            "estimated_minutes": item.estimated_minutes,
+            "overdue_counted": rollups.is_overdue("pending", item.due_at, None, now),
+        })
+        row_indexes.append(index)
+
+    if rows:
+        created = await db.scalars(
+            insert(models.Task).returning(models.Task, sort_by_parameter_order=True),
+            rows,
+        )
+        tasks = created.all()
+        # Bulk INSERT skips the unit of work
+        versions.touch(db, versions.user_scope(current_user.id))
+        for index, task in zip(row_indexes, tasks):
+            results[index]["task"] = task
+        await rollups.record_task_changes(
+            db,
+            current_user.id,
+            [(None, rollups.TaskState.of(task)) for task in tasks],
+        )
+        await db.commit()
+
+    return {"results": results}
+
+
 @router.get("/", response_model=schemas.TaskList)
-def list_tasks(
-    db: Session = Depends(get_db),
+async def list_tasks(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
     course_id: Optional[UUID] = Query(default=None),
     status_filter: Optional[str] = Query(default=None),
+    priority: Optional[int] = Query(default=None),
+    due_from: Optional[datetime] = Query(default=None),
+    due_to: Optional[datetime] = Query(default=None),
+    order: Literal["created", "due"] = Query(default="created"),
+    cursor: Optional[str] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
 ):
-    query = db.query(models.Task).filter(models.Task.user_id == current_user.id)
+    """
+    The user's tasks: all of them, or one page when limit or cursor is
+    given (100 by default), with next_cursor set while more remain.
+
+    order=created (default) is newest first; order=due is soonest due
+    first and skips tasks without a due date. Naive due_from / due_to
+    are UTC.
+    """
+    limit = page_size(cursor, limit)
+    etag = await versions.etag_for(db, request, [versions.user_scope(current_user.id)])
+    if versions.not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    query = select(*columns_for(models.Task, schemas.TaskRead)).where(
+        models.Task.user_id == current_user.id
+    )
 
     if course_id:
-        query = query.filter(models.Task.course_id == course_id)
+        query = query.where(models.Task.course_id == course_id)
     if status_filter:
-        query = query.filter(models.Task.status == status_filter)
+        query = query.where(models.Task.status == status_filter)
+    if priority is not None:
+        query = query.where(models.Task.priority == priority)
+    if due_from:
+        query = query.where(models.Task.due_at >= as_aware(due_from))
+    if due_to:
+        query = query.where(models.Task.due_at < as_aware(due_to))
 
-    tasks = query.order_by(models.Task.created_at.desc()).all()
-    return {"tasks": tasks}
+    if order == "due":
+        query = query.where(models.Task.due_at.is_not(None))
+        query = paginate(query, models.Task.due_at, models.Task.id, cursor, limit, descending=False)
+        sort_attr = "due_at"
+    else:
+        query = paginate(query, models.Task.created_at, models.Task.id, cursor, limit)
+        sort_attr = "created_at"
+
+    tasks, next_cursor = split_page((await db.execute(query)).all(), limit, sort_attr)
+    # Plain column rows, serialised without response_model validation
+    return fast_json({"tasks": rows_as(schemas.TaskRead, tasks), "next_cursor": next_cursor}, response)
 
 
 @router.get("/{task_id}", response_model=schemas.TaskRead)
-def get_task(
+async def get_task(
     task_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.user_id == current_user.id)
-        .first()
-    )
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return await _get_user_task(db, task_id, current_user.id)
 
 
 @router.patch("/{task_id}", response_model=schemas.TaskRead)
-def update_task(
+async def update_task(
     task_id: UUID,
     task_in: schemas.TaskUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.user_id == current_user.id)
-        .first()
-    )
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    # Locked: rollups.record_overdue() may flag it concurrently
+    task = await _get_user_task(db, task_id, current_user.id, for_update=True)
 
     data = task_in.dict(exclude_unset=True)
 
     # If course_id is being changed, validate ownership
     if "course_id" in data and data["course_id"]:
-        course = (
-            db.query(models.Course)
-            .filter(
-                models.Course.id == data["course_id"],
-                models.Course.user_id == current_user.id,
-            )
-            .first()
-        )
-        if not course:
+        if not await _user_owns_course(db, data["course_id"], current_user.id):
             raise HTTPException(
                 status_code=404,
                 detail="Course not found for this user",
             )
 
+    before = rollups.TaskState.of(task)
     for field, value in data.items():
         setattr(task, field, value)
+    rollups.mark_completion(task, before.status)
+    rollups.mark_overdue(task)
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await rollups.record_task_changes(db, current_user.id, [(before, rollups.TaskState.of(task))])
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
@@ -133,38 +240,52 @@ def update_task(
     response_model=schemas.TaskSessionRead,
     status_code=status.HTTP_201_CREATED,
 )
-def create_task_session(
+async def create_task_session(
     task_id: UUID,
     session_in: schemas.TaskSessionCreate,
-    db: Session = Depends(get_db),
+    on_conflict: ConflictMode = Query(default="allow"),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    """
+    Sessions must end after they start and last at most 24 hours (400).
+    on_conflict=reject answers 409 if the session overlaps another one;
+    on_conflict=shift moves it to the next free time instead.
+    """
     # ensure task belongs to user
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.user_id == current_user.id)
-        .first()
-    )
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    task = await _get_user_task(db, task_id, current_user.id)
 
-    if session_in.end_at <= session_in.start_at:
+    error = validate_session_times(session_in.start_at, session_in.end_at)
+    if error:
         raise HTTPException(
             status_code=400,
-            detail="end_at must be after start_at",
+            detail=error,
+        )
+
+    row = {
+        "start_at": as_aware(session_in.start_at),
+        "end_at": as_aware(session_in.end_at),
+        "status": session_in.status or "planned",
+    }
+    [error] = await resolve_conflicts(db, current_user.id, [row], on_conflict)
+    if error:
+        raise HTTPException(
+            status_code=409,
+            detail=error,
         )
 
     session = models.TaskSession(
         user_id=current_user.id,
         task_id=task.id,
-        start_at=session_in.start_at,
-        end_at=session_in.end_at,
+        start_at=row["start_at"],
+        end_at=row["end_at"],
         source=session_in.source or "manual",
-        status=session_in.status or "planned",
+        status=row["status"],
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await rollups.record_sessions(db, [session])
+    await db.commit()
+    await db.refresh(session)
     return session
 
 
@@ -172,27 +293,20 @@ def create_task_session(
     "/{task_id}/sessions",
     response_model=schemas.TaskSessionList,
 )
-def list_task_sessions(
+async def list_task_sessions(
     task_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     # ensure task belongs to user
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.user_id == current_user.id)
-        .first()
-    )
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    await _get_user_task(db, task_id, current_user.id)
 
-    sessions = (
-        db.query(models.TaskSession)
-        .filter(
+    sessions = await db.scalars(
+        select(models.TaskSession)
+        .where(
             models.TaskSession.task_id == task_id,
             models.TaskSession.user_id == current_user.id,
         )
         .order_by(models.TaskSession.start_at.asc())
-        .all()
     )
-    return {"sessions": sessions}
+    return {"sessions": sessions.all()}
@@ -0,0 +1,104 @@
+# app/routers/teachers.py
+# Teacher-facing views over the student_teacher roster.
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.deps import get_read_db, get_current_user
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, split_page
+from app.routers.sessions import OPEN_TASK_STATUSES
+
+router = APIRouter(prefix="/teachers", tags=["teachers"])
+
+
+@router.get("/{teacher_id}/students", response_model=schemas.RosterPage)
+async def list_roster(
+    teacher_id: UUID,
+    tz: str = Query(default="UTC", description="IANA time zone that decides when the week starts"),
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    One page of the teacher's students (in assignment order) with their
+    open and overdue task counts and the minutes of completed sessions
+    since Monday.
+
+    A single statement: the per-student counts are correlated aggregates
+    that each read one student's slice of the tasks / task_sessions
+    indexes, so a full page is one round trip.
+    """
+    if teacher_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own students",
+        )
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown time zone")
+
+    now = datetime.now(timezone.utc)
+    today = now.astimezone(zone).date()
+    week_start = datetime.combine(today - timedelta(days=today.weekday()), time.min, zone)
+
+    st = models.StudentTeacher
+    task, session = models.Task, models.TaskSession
+
+    open_tasks = (
+        select(func.count())
+        .where(task.user_id == st.student_id, task.status.in_(OPEN_TASK_STATUSES))
+        .scalar_subquery()
+    )
+    overdue_tasks = (
+        select(func.count())
+        .where(
+            task.user_id == st.student_id,
+            task.status.in_(OPEN_TASK_STATUSES),
+            task.due_at < now,
+        )
+        .scalar_subquery()
+    )
+    minutes_this_week = (
+        select(func.coalesce(
+            func.sum(func.extract("epoch", session.end_at - session.start_at)) / 60, 0
+        ))
+        .where(
+            session.user_id == st.student_id,
+            session.start_at >= week_start,
+            session.status == "completed",
+        )
+        .scalar_subquery()
+    )
+
+    query = (
+        select(
+            models.User.id,
+            models.User.name,
+            models.User.email,
+            st.created_at.label("assigned_at"),
+            open_tasks.label("open_tasks"),
+            overdue_tasks.label("overdue_tasks"),
+            minutes_this_week.label("minutes_completed_this_week"),
+        )
+        .join(models.User, models.User.id == st.student_id)
+        .where(st.teacher_id == teacher_id)
+    )
+    # student_id is unique per teacher, so it breaks created_at ties
+    query = paginate(query, st.created_at, st.student_id, cursor, limit, descending=False)
+
+    students, next_cursor = split_page((await db.execute(query)).all(), limit, "assigned_at")
+    return {
+        "students": [
+            dict(row._mapping, minutes_completed_this_week=int(row.minutes_completed_this_week))
+            for row in students
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,173 @@
+# app/scheduler.py
+# Automatic study-session planning: packs the remaining work of a user's
+# open tasks into free time.
+#
+# Pure functions over integer minutes since the epoch (no DB access), so
+# the result depends only on the inputs:
+#   1. free time = daily study windows minus existing sessions (sorted
+#      interval merge / subtraction)
+#   2. free slots are filled in time order from a heap of tasks keyed by
+#      (due date, -priority, id): earliest deadline first, higher priority
+#      first on ties. Each task is split into sessions of at most
+#      max_session_minutes with a break between sessions.
+
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+NO_DEADLINE = float("inf")
+
+# Reasons a task (or part of it) wasn't scheduled
+NO_ESTIMATE = "no_estimate"
+NO_FREE_TIME = "no_free_time"
+DUE_BEFORE_FREE_TIME = "due_before_free_time"
+
+
+class PlannedSession(NamedTuple):
+    task_id: UUID
+    start: int  # epoch minutes
+    end: int
+
+
+@dataclass(frozen=True)
+class SchedulingTask:
+    id: UUID
+    priority: int
+    due: Optional[int]  # epoch minutes
+    minutes: int        # still to schedule
+
+
+@dataclass(frozen=True)
+class ScheduleOptions:
+    max_session_minutes: int = 90
+    min_session_minutes: int = 25
+    break_minutes: int = 10
+
+
+def to_minutes(value: datetime, round_up: bool = True) -> int:
+    """
+    Epoch minutes. Rounds up by default (a plan never starts in the past);
+    round busy-interval starts down so they are never shortened.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    seconds = value.timestamp()
+    return int(-(-seconds // 60)) if round_up else int(seconds // 60)
+
+
+def from_minutes(value: int) -> datetime:
+    return datetime.fromtimestamp(value * 60, tz=timezone.utc)
+
+
+def merge_intervals(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort and merge overlapping or touching intervals."""
+    merged: list[list[int]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(
+    windows: list[tuple[int, int]],
+    busy: list[tuple[int, int]],
+) -> list[tuple[int, int]]:
+    """windows minus busy; both sorted and non-overlapping."""
+    free = []
+    j = 0
+    for start, end in windows:
+        while j < len(busy) and busy[j][1] <= start:
+            j += 1
+        cursor = start
+        k = j
+        while k < len(busy) and busy[k][0] < end:
+            if busy[k][0] > cursor:
+                free.append((cursor, busy[k][0]))
+            cursor = max(cursor, busy[k][1])
+            k += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def daily_windows(
+    start: int,
+    end: int,
+    tz: ZoneInfo,
+    day_start: time,
+    day_end: time,
+) -> list[tuple[int, int]]:
+    """Study windows [day_start, day_end) local time on each day, clipped to [start, end)."""
+    windows = []
+    day: date = from_minutes(start).astimezone(tz).date()
+    last: date = from_minutes(end).astimezone(tz).date()
+    while day <= last:
+        window_start = to_minutes(datetime.combine(day, day_start, tz))
+        window_end = to_minutes(datetime.combine(day, day_end, tz))
+        window_start, window_end = max(window_start, start), min(window_end, end)
+        if window_start < window_end:
+            windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+
+def schedule(
+    tasks: Iterable[SchedulingTask],
+    free: list[tuple[int, int]],
+    options: ScheduleOptions = ScheduleOptions(),
+) -> tuple[list[PlannedSession], dict[UUID, tuple[int, str]]]:
+    """
+    Fill `free` (sorted, non-overlapping slots) with sessions.
+
+    Returns the planned sessions in time order and, for every task that
+    couldn't be fully scheduled, (minutes left, reason). Sessions are
+    never placed after a task's due date; a due date that has already
+    passed only counts as "most urgent".
+    """
+    first_free = free[0][0] if free else 0
+    remaining: dict[UUID, int] = {}
+    heap = []
+    for task in tasks:
+        if task.minutes <= 0:
+            continue
+        remaining[task.id] = task.minutes
+        due = task.due if task.due is not None else NO_DEADLINE
+        heap.append((due, -task.priority, task.id))
+    heapq.heapify(heap)
+
+    planned: list[PlannedSession] = []
+    unscheduled: dict[UUID, tuple[int, str]] = {}
+    for slot_start, slot_end in free:
+        cursor = slot_start
+        while heap and slot_end - cursor >= min(options.min_session_minutes, remaining[heap[0][2]]):
+            due, _, task_id = heap[0]
+            left = remaining[task_id]
+            # Only future deadlines limit where sessions can go
+            deadline = due if first_free < due < NO_DEADLINE else NO_DEADLINE
+
+            length = min(left, options.max_session_minutes, slot_end - cursor, deadline - cursor)
+            if length < left and length < options.min_session_minutes:
+                if deadline - cursor < options.min_session_minutes:
+                    heapq.heappop(heap)
+                    unscheduled[task_id] = (left, DUE_BEFORE_FREE_TIME)
+                    continue
+                break  # rest of this slot is too short
+
+            planned.append(PlannedSession(task_id, cursor, cursor + length))
+            cursor += length + options.break_minutes
+            if length == left:
+                heapq.heappop(heap)
+                del remaining[task_id]
+            else:
+                remaining[task_id] = left - length
+
+    for _, _, task_id in sorted(heap):
+        unscheduled[task_id] = (remaining[task_id], NO_FREE_TIME)
+    return planned, unscheduled
@@ -1,7 +1,7 @@
 # app/schemas.py
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime, time
 
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
@@ -87,14 +87,33 @@ class TaskUpdate(BaseModel):
 class TaskRead(TaskBase):
     id: UUID
     status: str
+    completed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+MAX_BATCH_SIZE = 500
+
+
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchItem(BaseModel):
+    index: int  # position in the request
+    task: Optional[TaskRead] = None
+    error: Optional[str] = None
+
+
+class TaskBatchResult(BaseModel):
+    results: List[TaskBatchItem]
+
+
 class TaskList(BaseModel):
     tasks: List[TaskRead]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
 
 
 # ---------- Task Session Schemas ----------
@@ -122,6 +141,86 @@ class TaskSessionList(BaseModel):
     sessions: List[TaskSessionRead]
 
 
+class SessionTaskSummary(BaseModel):
+    title: str
+    priority: int
+    course_id: Optional[UUID] = None
+    course_title: Optional[str] = None
+
+
+class CalendarSession(BaseModel):
+    id: UUID
+    task_id: UUID
+    start_at: datetime
+    end_at: datetime
+    source: str
+    status: str
+    task: SessionTaskSummary
+
+
+class CalendarSessionList(BaseModel):
+    sessions: List[CalendarSession]
+
+
+class TaskSessionBatchEntry(TaskSessionBase):
+    task_id: UUID
+
+
+class TaskSessionBatchCreate(BaseModel):
+    sessions: List[TaskSessionBatchEntry] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskSessionBatchItem(BaseModel):
+    index: int  # position in the request
+    session: Optional[TaskSessionRead] = None
+    error: Optional[str] = None
+
+
+class TaskSessionBatchResult(BaseModel):
+    results: List[TaskSessionBatchItem]
+
+
+class SessionInterval(BaseModel):
+    id: UUID
+    task_id: UUID
+    start_at: datetime
+    end_at: datetime
+
+
+class SessionConflict(BaseModel):
+    first: SessionInterval  # the one that starts first
+    second: SessionInterval
+    overlap_start: datetime
+    overlap_end: datetime
+
+
+class SessionConflictList(BaseModel):
+    conflicts: List[SessionConflict]
+
+
+class ScheduleRequest(BaseModel):
+    start_at: Optional[datetime] = None  # default: now; naive times are in tz
+    end_at: Optional[datetime] = None    # default: two weeks after start_at
+    tz: str = "UTC"                      # IANA zone for the daily study window
+    day_start: time = time(9, 0)
+    day_end: time = time(21, 0)
+    max_session_minutes: int = Field(default=90, ge=10, le=24 * 60)
+    min_session_minutes: int = Field(default=25, ge=5, le=24 * 60)
+    break_minutes: int = Field(default=10, ge=0, le=24 * 60)
+    task_ids: Optional[List[UUID]] = None  # default: every open task
+
+
+class UnscheduledTask(BaseModel):
+    task_id: UUID
+    minutes: int  # left unscheduled
+    reason: str   # 'no_estimate', 'no_free_time', 'due_before_free_time'
+
+
+class ScheduleResult(BaseModel):
+    sessions: List[TaskSessionRead]
+    unscheduled: List[UnscheduledTask]
+
+
 # ---------- Institution Schemas ----------
 
 class InstitutionBase(BaseModel):
@@ -190,10 +289,32 @@ class AddUserRequest(BaseModel):
     user_id: str  # unique ID within institution
     role: str  # "student" or "teacher"
 
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class ImportUsersResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]  # the first rows that failed
+    errors_omitted: int = 0       # failed rows not listed in errors
+
 class AssignStudentsRequest(BaseModel):
     teacher_id: UUID
     student_ids: List[UUID]
 
+class ReassignStudentsRequest(BaseModel):
+    from_teacher_id: UUID
+    to_teacher_id: UUID
+    student_ids: Optional[List[UUID]] = None  # None = every student of from_teacher
+
+class AssignStudentsResponse(BaseModel):
+    message: str
+    inserted: int
+    deleted: int = 0
+    skipped: int
+
 class TeacherResponse(BaseModel):
     id: UUID
     name: Optional[str]
@@ -214,4 +335,131 @@ class InstitutionResponse(BaseModel):
     code: Optional[str] = None
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class InstitutionStats(BaseModel):
+    institution_id: UUID
+    name: str
+    users: int
+    teachers: int
+    students: int
+
+class DailyCount(BaseModel):
+    day: date
+    count: int
+
+class AdminStatsResponse(BaseModel):
+    total_users: int
+    total_institutions: int
+    users_by_role: Dict[str, int]
+    institutions: List[InstitutionStats]
+    tasks_by_status: Dict[str, int]
+    recent_signups: List[DailyCount]  # last RECENT_SIGNUP_DAYS days
+    generated_at: datetime
+
+
+# ---------- Analytics Schemas ----------
+
+class DailyStats(BaseModel):
+    day: date
+    planned_minutes: int = 0
+    completed_minutes: int = 0
+    skipped_sessions: int = 0
+    tasks_completed: int = 0
+    tasks_overdue: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AnalyticsTotals(BaseModel):
+    planned_minutes: int
+    completed_minutes: int
+    skipped_sessions: int
+    tasks_completed: int
+    tasks_overdue: int
+    completion_rate: Optional[float] = None  # completed / planned minutes
+
+
+class AnalyticsSummary(BaseModel):
+    range: str
+    start: date
+    end: date
+    totals: AnalyticsTotals
+    days: List[DailyStats]
+
+
+class InstitutionDailyRow(BaseModel):
+    day: date
+    role: str
+    active_users: int
+    planned_minutes: int
+    completed_minutes: int
+    skipped_sessions: int
+    tasks_completed: int
+    tasks_overdue: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RoleTotals(AnalyticsTotals):
+    role: str
+
+
+class RosterTotals(AnalyticsTotals):
+    teacher_id: UUID
+    teacher_name: Optional[str] = None
+
+
+class CourseTotals(AnalyticsTotals):
+    course: str  # course title, lower-cased (students' courses grouped by title)
+    active_student_days: int  # daily active students, summed over the range
+
+
+class AdminAnalyticsResponse(BaseModel):
+    range: str
+    start: date
+    end: date
+    institution_id: Optional[UUID] = None  # None = all institutions
+    refreshed_at: Optional[datetime] = None  # when the materialised data was last brought up to date
+    days: List[InstitutionDailyRow]
+    roles: List[RoleTotals]
+    rosters: List[RosterTotals]
+    courses: List[CourseTotals]  # the ANALYTICS_COURSE_LIMIT with the most planned minutes
+
+
+class Streak(BaseModel):
+    current: int  # consecutive days with completed study time, up to today/yesterday
+    longest: int  # within the requested window
+
+
+class CourseWorkload(BaseModel):
+    course_id: Optional[UUID] = None  # None = tasks without a course
+    title: Optional[str] = None
+    planned_minutes: List[int]  # one value per day
+
+
+class TrendsResponse(BaseModel):
+    tz: str
+    days: List[date]
+    daily_minutes: List[int]  # completed study minutes
+    rolling_7d_minutes: List[int]
+    streak: Streak
+    courses: List[CourseWorkload]
+    heatmap: List[List[int]]  # [weekday (Monday = 0)][hour] completed minutes
+
+
+# ---------- Teacher Schemas ----------
+
+class RosterStudent(BaseModel):
+    id: UUID
+    name: Optional[str] = None
+    email: str
+    assigned_at: datetime
+    open_tasks: int
+    overdue_tasks: int
+    minutes_completed_this_week: int
+
+
+class RosterPage(BaseModel):
+    students: List[RosterStudent]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
@@ -0,0 +1,355 @@
+# app/seed.py
+# Synthetic, production-shaped data for load tests and query tuning
+# (python -m app.cli seed).
+#
+# Everything comes from one random.Random(seed) and a fixed anchor date,
+# including the UUIDs, so the same arguments give the same database.
+# Rows are generated as COPY text in foreign-key order and loaded in
+# chunks with psycopg2's copy_expert: no per-row round trips, and no
+# server-side gen_random_uuid().
+#
+# Shapes:
+#   - institution sizes are Zipf-like (a few large ones, many small ones)
+#   - users: teacher_share teachers, personal_share users in no
+#     institution, the rest students; one institution admin each, plus
+#     one developer admin
+#   - each student has 1-3 of their institution's teachers
+#   - courses, tasks per user and sessions per task are skewed (most
+#     users have a little, a few have a lot); task status follows the
+#     due date; sessions in the past are mostly completed
+#
+# Generated text never contains tabs, newlines or backslashes, so values
+# are written to COPY unescaped.
+
+import io
+import random
+from bisect import bisect
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+
+MINUTES_PER_DAY = 24 * 60
+INSTITUTION_HISTORY_DAYS = 3 * 365  # institutions predate the user history
+FUTURE_DAYS = 31                    # due dates / planned sessions after the anchor
+
+TASK_STATUS_PAST_DUE = (("completed", 70), ("pending", 20), ("in_progress", 10))
+TASK_STATUS_OPEN = (("pending", 60), ("in_progress", 25), ("completed", 15))
+SESSION_STATUS_PAST = (("completed", 80), ("skipped", 12), ("planned", 8))
+COPY_NULL = "\\N"
+ESTIMATES = (COPY_NULL, "30", "45", "60", "90", "120", "180")
+SESSION_LENGTHS = (25, 30, 45, 60, 90)
+ROSTER_SIZES = (1, 1, 1, 2, 2, 3)
+
+# Random 128 bits -> version 4 / RFC 4122 variant
+_UUID_CLEAR = ~((0xF << 76) | (0xC << 60)) & ((1 << 128) - 1)
+_UUID_SET = (0x4 << 76) | (0x8 << 60)
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    institutions: int = 100
+    users: int = 200_000
+    teacher_share: float = 0.05
+    personal_share: float = 0.05
+    courses_per_user: int = 6         # uniform 0..n for students
+    tasks_per_user: float = 20.0      # mean, exponential
+    sessions_per_task: float = 1.5    # mean, exponential
+    days: int = 365                   # history before the anchor
+    anchor: date = field(default_factory=lambda: datetime.now(timezone.utc).date())
+    seed: int = 42
+    chunk_rows: int = 100_000
+    password_hash: str = ""
+
+
+class _Weighted:
+    """Weighted choice from one random() call."""
+
+    def __init__(self, options):
+        self.values, weights = zip(*options)
+        self.cumulative = list(accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def pick(self, random_value: float):
+        return self.values[bisect(self.cumulative, random_value * self.total)]
+
+
+class _Copier:
+    """Buffers COPY text for one table (see Generator._maybe_flush)."""
+
+    def __init__(self, cursor, table: str, columns: str):
+        self.cursor = cursor
+        self.table = table
+        self.sql = f"COPY {table} ({columns}) FROM STDIN"
+        self.lines: list[str] = []
+        self.add = self.lines.append
+        self.count = 0
+
+    def flush(self) -> None:
+        if not self.lines:
+            return
+        self.cursor.copy_expert(self.sql, io.StringIO("\n".join(self.lines) + "\n"))
+        self.count += len(self.lines)
+        self.lines.clear()
+
+
+class Generator:
+    """
+    Hot loops use random() arithmetic and lookup tables rather than
+    randint / choices / uuid.UUID: generation has to keep up with COPY.
+    """
+
+    def __init__(self, config: SeedConfig, cursor):
+        self.config = config
+        self.cursor = cursor
+        self.rng = random.Random(config.seed)
+        anchor = datetime.combine(config.anchor, datetime.min.time(), timezone.utc)
+        self.now = int(anchor.timestamp()) // 60 + 12 * 60  # noon on the anchor day
+        self.start = self.now - config.days * MINUTES_PER_DAY
+        self.counts: dict[str, int] = {}
+
+        first_day = self.start // MINUTES_PER_DAY - INSTITUTION_HISTORY_DAYS
+        last_day = self.now // MINUTES_PER_DAY + FUTURE_DAYS
+        self._first_day = first_day
+        self._days = [(date(1970, 1, 1) + timedelta(days=day)).isoformat() for day in range(first_day, last_day + 1)]
+        self._times = [f"{minute // 60:02d}:{minute % 60:02d}:00+00" for minute in range(MINUTES_PER_DAY)]
+
+    # --- helpers ---------------------------------------------------------
+
+    def _uuid(self) -> str:
+        # 32 hex digits, a form Postgres' uuid input accepts
+        return f"{self.rng.getrandbits(128) & _UUID_CLEAR | _UUID_SET:032x}"
+
+    def _ts(self, minutes: int) -> str:
+        day, minute = divmod(minutes, MINUTES_PER_DAY)
+        return f"{self._days[day - self._first_day]} {self._times[minute]}"
+
+    def _copier(self, table: str, columns: str) -> _Copier:
+        return _Copier(self.cursor, table, columns)
+
+    def _maybe_flush(self, *copiers: _Copier) -> None:
+        """
+        Send a chunk once the buffers hold chunk_rows rows. Related tables
+        are flushed together, parents first, so foreign keys always point
+        at rows already loaded.
+        """
+        if sum(len(copier.lines) for copier in copiers) >= self.config.chunk_rows:
+            for copier in copiers:
+                copier.flush()
+
+    def _done(self, *copiers: _Copier) -> None:
+        for copier in copiers:
+            copier.flush()
+            self.counts[copier.table] = copier.count
+
+    # --- tables ----------------------------------------------------------
+
+    def run(self) -> dict[str, int]:
+        institutions = self.institutions()
+        members, teachers = self.users(institutions)
+        self.rosters(members, teachers)
+        self.coursework(members)
+        return self.counts
+
+    def institutions(self) -> list[str]:
+        config, rng = self.config, self.rng
+        copier = self._copier("institutions", "id, name, code, created_at")
+        admins = self._copier("admins", "id, email, password_hash, name, institution_id, is_active")
+        ids = []
+        for n in range(config.institutions):
+            institution_id = self._uuid()
+            ids.append(institution_id)
+            created = self.start - rng.randint(0, INSTITUTION_HISTORY_DAYS) * MINUTES_PER_DAY
+            copier.add(f"{institution_id}\tSeed Institution {n}\tSEED{config.seed}-{n:05d}\t{self._ts(created)}")
+            admins.add(
+                f"{self._uuid()}\tadmin{n}@seed{config.seed}.example.com\t{config.password_hash}"
+                f"\tAdmin {n}\t{institution_id}\tt"
+            )
+            self._maybe_flush(copier, admins)
+        admins.add(
+            f"{self._uuid()}\tdeveloper@seed{config.seed}.example.com\t{config.password_hash}"
+            f"\tDeveloper\t{COPY_NULL}\tt"
+        )
+        self._done(copier, admins)
+        return ids
+
+    def users(self, institutions: list[str]):
+        """Returns [(user_id, role, institution index or None, created)] and teachers per institution."""
+        config, rng = self.config, self.rng
+        random_, ts, new_id = rng.random, self._ts, self._uuid
+        users = self._copier("users", "id, name, email, mobile_number, password_hash, account_type, created_at")
+        memberships = self._copier("institution_users", "id, user_id, institution_id, role, created_at")
+
+        weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(institutions))))
+        homes = rng.choices(range(len(institutions)), cum_weights=weights, k=config.users) if institutions else []
+        teacher_cut = config.personal_share + config.teacher_share
+        span = self.now - MINUTES_PER_DAY - self.start
+
+        members = []
+        teachers: dict[int, list[str]] = {}
+        for n in range(config.users):
+            user_id = new_id()
+            roll = random_()
+            if roll < config.personal_share or not institutions:
+                role, home = "personal", None
+            else:
+                role = "teacher" if roll < teacher_cut else "student"
+                home = homes[n]
+            created = self.start + int(random_() * span)
+            created_text = ts(created)
+            users.add(
+                f"{user_id}\tSeed User {n}\tuser{n}@seed{config.seed}.example.com\t+1555{n:07d}"
+                f"\t{config.password_hash}\t{role}\t{created_text}"
+            )
+            if home is not None:
+                memberships.add(f"{new_id()}\t{user_id}\t{institutions[home]}\t{role}\t{created_text}")
+                if role == "teacher":
+                    teachers.setdefault(home, []).append(user_id)
+            members.append((user_id, role, home, created))
+            self._maybe_flush(users, memberships)
+        self._done(users, memberships)
+        return members, teachers
+
+    def rosters(self, members, teachers: dict[int, list[str]]) -> None:
+        rng, now = self.rng, self.now
+        random_, ts, new_id = rng.random, self._ts, self._uuid
+        copier = self._copier("student_teacher", "id, student_id, teacher_id, created_at")
+        add = copier.add
+        for user_id, role, home, created in members:
+            candidates = teachers.get(home)
+            if role != "student" or not candidates:
+                continue
+            count = min(len(candidates), ROSTER_SIZES[int(random_() * len(ROSTER_SIZES))])
+            for teacher_id in rng.sample(candidates, count):
+                add(f"{new_id()}\t{user_id}\t{teacher_id}\t{ts(created + int(random_() * (now - created)))}")
+            self._maybe_flush(copier)
+        self._done(copier)
+
+    def coursework(self, members) -> None:
+        """Courses, tasks and sessions, user by user."""
+        config, rng, now = self.config, self.rng, self.now
+        random_, expovariate, ts, new_id = rng.random, rng.expovariate, self._ts, self._uuid
+        courses = self._copier("courses", "id, user_id, title, created_at")
+        tasks = self._copier(
+            "tasks",
+            "id, user_id, course_id, title, status, priority, due_at, estimated_minutes,"
+            " completed_at, created_at, updated_at",
+        )
+        sessions = self._copier("task_sessions", "id, user_id, task_id, start_at, end_at, source, status, created_at")
+        add_course, add_task, add_session = courses.add, tasks.add, sessions.add
+
+        past_due = _Weighted(TASK_STATUS_PAST_DUE)
+        open_status = _Weighted(TASK_STATUS_OPEN)
+        past_session = _Weighted(SESSION_STATUS_PAST)
+        task_rate = 1 / config.tasks_per_user
+        max_tasks = int(config.tasks_per_user * 20)
+        session_rate = 1 / config.sessions_per_task if config.sessions_per_task > 0 else None
+        undated = 14 * MINUTES_PER_DAY  # planning horizon of tasks without a due date
+
+        for user_id, role, home, joined in members:
+            self._maybe_flush(courses, tasks, sessions)
+            if role == "teacher":
+                continue  # teachers don't plan their own work here
+
+            user_courses = []
+            joined_text = ts(joined)
+            for n in range(int(random_() * (config.courses_per_user + 1))):
+                course_id = new_id()
+                user_courses.append(course_id)
+                add_course(f"{course_id}\t{user_id}\tCourse {n}\t{joined_text}")
+
+            for n in range(min(int(expovariate(task_rate)), max_tasks)):
+                task_id = new_id()
+                created = joined + int(random_() * (now - joined))
+                created_text = ts(created)
+                if random_() < 0.9:
+                    due = created + (1 + int(random_() * 30)) * MINUTES_PER_DAY
+                    due_text = ts(due)
+                    status = (past_due if due < now else open_status).pick(random_())
+                    horizon = due
+                else:
+                    due_text = COPY_NULL
+                    status = open_status.pick(random_())
+                    horizon = created + undated
+                if status == "completed":
+                    completed_text = ts(created + int(random_() * (min(horizon, now) - created)))
+                else:
+                    completed_text = COPY_NULL
+                if user_courses and random_() < 0.8:
+                    course_id = user_courses[int(random_() * len(user_courses))]
+                else:
+                    course_id = COPY_NULL
+                add_task(
+                    f"{task_id}\t{user_id}\t{course_id}\tTask {n}\t{status}\t{int(random_() * 6)}"
+                    f"\t{due_text}\t{ESTIMATES[int(random_() * len(ESTIMATES))]}\t{completed_text}"
+                    f"\t{created_text}\t{created_text if completed_text == COPY_NULL else completed_text}"
+                )
+
+                if session_rate is None:
+                    continue
+                first_day = created // MINUTES_PER_DAY
+                day_span = horizon // MINUTES_PER_DAY - first_day + 1
+                for _ in range(int(expovariate(session_rate) + 0.5)):
+                    start = (first_day + int(random_() * day_span)) * MINUTES_PER_DAY + 8 * 60 + int(random_() * 13 * 60)
+                    end = start + SESSION_LENGTHS[int(random_() * len(SESSION_LENGTHS))]
+                    session_status = past_session.pick(random_()) if start < now else "planned"
+                    add_session(
+                        f"{new_id()}\t{user_id}\t{task_id}\t{ts(start)}\t{ts(end)}"
+                        f"\t{'ai' if random_() < 0.3 else 'manual'}\t{session_status}\t{created_text}"
+                    )
+
+        self._done(courses, tasks, sessions)
+
+
+SEEDED_TABLES = (
+    "institutions", "admins", "users", "institution_users", "student_teacher",
+    "courses", "tasks", "task_sessions",
+)
+
+_SECONDARY_INDEXES_SQL = """
+    SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+    FROM pg_index
+    WHERE indrelid = ANY(CAST(%s AS regclass[])) AND NOT indisprimary AND NOT indisunique
+"""
+
+_FOREIGN_KEYS_SQL = """
+    SELECT conrelid::regclass::text, quote_ident(conname), pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = ANY(CAST(%s AS regclass[])) AND contype = 'f'
+"""
+
+
+def seed(config: SeedConfig, raw_connection, defer_indexes: bool = True) -> dict[str, int]:
+    """
+    Generate and load everything in one transaction on a psycopg2
+    connection. Returns rows per table.
+
+    defer_indexes drops the seeded tables' non-unique indexes and foreign
+    keys first and recreates them after the load, as pg_restore does:
+    building an index once and validating a foreign key in one join is
+    several times faster than maintaining them row by row. Meant for an
+    empty database; it is all one transaction, so a failure leaves the
+    schema as it was.
+    """
+    with raw_connection.cursor() as cursor:
+        cursor.execute("SET LOCAL synchronous_commit = off")
+        cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")  # index rebuilds
+        indexes, foreign_keys = [], []
+        if defer_indexes:
+            tables = list(SEEDED_TABLES)
+            cursor.execute(_SECONDARY_INDEXES_SQL, (tables,))
+            indexes = cursor.fetchall()
+            cursor.execute(_FOREIGN_KEYS_SQL, (tables,))
+            foreign_keys = cursor.fetchall()
+            for table, name, _ in foreign_keys:
+                cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+            for name, _ in indexes:
+                cursor.execute(f"DROP INDEX {name}")
+
+        counts = Generator(config, cursor).run()
+
+        for _, definition in indexes:
+            cursor.execute(definition)
+        for table, name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    raw_connection.commit()
+    return counts
@@ -0,0 +1,249 @@
+# app/streaming.py
+# Streaming exports: rows are read through a server-side cursor in
+# batches and encoded as they arrive, so memory stays bounded by the batch
+# size and the first bytes go out before the query has finished.
+#
+# Formats: csv, ndjson, and parquet when pyarrow is installed (optional,
+# `pip install pyarrow`).
+#
+# A download can take minutes and holds its connection throughout, so
+# exports read through their own small pools (app.db.export_engines)
+# rather than the request pool, and at most DB_EXPORT_POOL_SIZE run at
+# once per process. Past that the request gets a 503 with Retry-After
+# instead of queueing for a connection.
+
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import Boolean, Date, DateTime, Integer
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db import DB_EXPORT_POOL_SIZE, async_engine, export_engines
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+EXPORT_RETRY_AFTER_SECONDS = int(os.getenv("EXPORT_RETRY_AFTER_SECONDS", "10"))
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+async def stream_batches(
+    statement,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    engine: Optional[AsyncEngine] = None,
+) -> AsyncIterator[list]:
+    """
+    Yield lists of rows from a server-side cursor.
+
+    Uses its own connection (from `engine`, default the primary): the
+    request's session is closed by the time a StreamingResponse body is
+    consumed.
+    """
+    async with (engine or async_engine).connect() as conn:
+        result = await conn.stream(statement.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+
+class ExportSlots:
+    """Counts the exports streaming in this process, up to `limit`."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def acquire(self):
+        """Take a slot (503 if none is free); returns an idempotent release()."""
+        if self.active >= self.limit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many exports are running, try again shortly",
+                headers={"Retry-After": str(EXPORT_RETRY_AFTER_SECONDS)},
+            )
+        self.active += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.active -= 1
+
+        return release
+
+
+export_slots = ExportSlots(DB_EXPORT_POOL_SIZE)
+
+
+async def _releasing(body: AsyncIterator[bytes], release) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        release()
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Can't export {type(value).__name__}")
+
+
+async def encode_csv(names: list[str], batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue().encode("utf-8")
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_ndjson(names: list[str], batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+class _DrainableSink:
+    """Write-only file for pyarrow whose contents can be taken out as it grows."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(pa, column_type):
+    if isinstance(column_type, PG_UUID):
+        return pa.string()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC") if column_type.timezone else pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+async def encode_parquet(names: list[str], types: list, batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """One row group per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, _arrow_type(pa, column_type)) for name, column_type in zip(names, types)])
+    stringify = [pa.types.is_string(field.type) for field in schema]
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        async for rows in batches:
+            columns = [
+                [None if value is None else str(value) for value in values] if as_text else list(values)
+                for values, as_text in zip(zip(*rows), stringify)
+            ]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def streaming_export(
+    statement,
+    fmt: str,
+    filename: Optional[str] = None,
+    engine: Optional[AsyncEngine] = None,
+) -> StreamingResponse:
+    """
+    StreamingResponse for `statement` encoded as csv / ndjson / parquet,
+    read from the database of `engine` (default the primary) through its
+    export pool. Raises 503 when the export slots are all taken.
+    """
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available on this server (pyarrow missing)",
+        )
+
+    release = export_slots.acquire()
+    columns = list(statement.selected_columns)
+    names = [column.key for column in columns]
+    source = engine or async_engine
+    batches = stream_batches(statement, engine=export_engines.get(source, source))
+    if fmt == "csv":
+        body = encode_csv(names, batches)
+    elif fmt == "ndjson":
+        body = encode_ndjson(names, batches)
+    else:
+        body = encode_parquet(names, [column.type for column in columns], batches)
+
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    # The background task covers a client that goes away before the body starts
+    return StreamingResponse(
+        _releasing(body, release),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers=headers,
+        background=BackgroundTask(release),
+    )
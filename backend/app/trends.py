@@ -0,0 +1,170 @@
+# app/trends.py
+# Trend charts (rolling study time, streaks, per-course workload, weekday
+# heatmap) computed with NumPy over columnar session data.
+#
+# Postgres returns one row of arrays (array_agg), so a user's sessions
+# arrive as a handful of Python lists instead of one Row / ORM object per
+# session, and every metric is a bincount or convolution over them.
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SECONDS_PER_DAY = 86400
+ROLLING_WINDOW = 7
+
+# Local wall-clock times (AT TIME ZONE handles DST); courses are numbered
+# 1..n in id order, 0 = task without a course.
+SESSION_COLUMNS_SQL = """
+    WITH user_courses AS (
+        SELECT id, title, row_number() OVER (ORDER BY id) AS idx
+        FROM courses
+        WHERE user_id = :user_id
+    )
+    SELECT
+        array_agg(extract(epoch FROM s.start_at AT TIME ZONE :tz)::float8) AS local_start,
+        array_agg(floor(extract(epoch FROM s.end_at - s.start_at) / 60)::int) AS minutes,
+        array_agg(s.status = 'completed') AS completed,
+        array_agg(coalesce(c.idx, 0)::int) AS course_idx,
+        (SELECT array_agg(id ORDER BY idx) FROM user_courses) AS course_ids,
+        (SELECT array_agg(title ORDER BY idx) FROM user_courses) AS course_titles
+    FROM task_sessions s
+    JOIN tasks t ON t.id = s.task_id
+    LEFT JOIN user_courses c ON c.id = t.course_id
+    WHERE s.user_id = :user_id
+      AND s.start_at >= (CAST(:first_day AS date)::timestamp AT TIME ZONE :tz)
+      AND s.start_at < (CAST(:end_day AS date)::timestamp AT TIME ZONE :tz)
+"""
+
+
+@dataclass
+class SessionColumns:
+    local_start: np.ndarray  # float64, seconds since epoch in local wall-clock time
+    minutes: np.ndarray      # int64
+    completed: np.ndarray    # bool
+    course_idx: np.ndarray   # int64, index into course_ids (0 = no course)
+    course_ids: list         # [None, course 1, course 2, ...]
+    course_titles: list
+
+
+async def fetch_session_columns(
+    db: AsyncSession,
+    user_id: UUID,
+    first_day: date,
+    end_day: date,
+    tz: str,
+) -> SessionColumns:
+    """Sessions starting in [first_day, end_day) local time, as arrays."""
+    row = (await db.execute(text(SESSION_COLUMNS_SQL), {
+        "user_id": user_id,
+        "tz": tz,
+        "first_day": first_day,
+        "end_day": end_day,
+    })).one()
+    return SessionColumns(
+        local_start=np.asarray(row.local_start or [], dtype=np.float64),
+        minutes=np.asarray(row.minutes or [], dtype=np.int64),
+        completed=np.asarray(row.completed or [], dtype=bool),
+        course_idx=np.asarray(row.course_idx or [], dtype=np.int64),
+        course_ids=[None] + list(row.course_ids or []),
+        course_titles=[None] + list(row.course_titles or []),
+    )
+
+
+def _epoch_day(day: date) -> int:
+    return (day - date(1970, 1, 1)).days
+
+
+def streaks(active: np.ndarray) -> tuple[int, int]:
+    """
+    (current, longest) run of active days. The current streak ends today,
+    or yesterday if nothing has been done yet today.
+    """
+    if not active.any():
+        return 0, 0
+    padded = np.concatenate(([0], active.astype(np.int8), [0]))
+    edges = np.diff(padded)
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    lengths = run_ends - run_starts
+    longest = int(lengths.max())
+
+    last_end = run_ends[-1]  # exclusive index of the last run
+    current = int(lengths[-1]) if last_end >= len(active) - 1 else 0
+    return current, longest
+
+
+def compute_trends(columns: SessionColumns, start: date, days: int) -> dict:
+    """
+    Metrics for the `days` days starting at `start`. `columns` must also
+    cover the ROLLING_WINDOW - 1 days before `start` for the rolling sum.
+    """
+    lead = ROLLING_WINDOW - 1
+    span = days + lead
+    origin = _epoch_day(start) - lead
+
+    local_day = np.floor_divide(columns.local_start, SECONDS_PER_DAY).astype(np.int64)
+    day_idx = local_day - origin
+    done_minutes = np.where(columns.completed, columns.minutes, 0)
+
+    daily = np.bincount(day_idx, weights=done_minutes, minlength=span)[:span]
+    rolling = np.convolve(daily, np.ones(ROLLING_WINDOW))[lead:span]
+    daily = daily[lead:]
+
+    in_range = day_idx >= lead
+    n_courses = len(columns.course_ids)
+    workload = np.bincount(
+        columns.course_idx[in_range] * days + (day_idx[in_range] - lead),
+        weights=columns.minutes[in_range],
+        minlength=n_courses * days,
+    ).reshape(n_courses, days)
+
+    # 1970-01-01 was a Thursday; Monday = 0
+    weekday = (local_day[in_range] + 3) % 7
+    hour = np.floor_divide(columns.local_start[in_range] % SECONDS_PER_DAY, 3600).astype(np.int64)
+    heatmap = np.bincount(
+        weekday * 24 + hour,
+        weights=done_minutes[in_range],
+        minlength=7 * 24,
+    ).reshape(7, 24)
+
+    current, longest = streaks(daily > 0)
+
+    return {
+        "days": [start + timedelta(days=i) for i in range(days)],
+        "daily_minutes": daily.astype(np.int64).tolist(),
+        "rolling_7d_minutes": rolling.astype(np.int64).tolist(),
+        "streak": {"current": current, "longest": longest},
+        "courses": [
+            {
+                "course_id": columns.course_ids[i],
+                "title": columns.course_titles[i],
+                "planned_minutes": row.astype(np.int64).tolist(),
+            }
+            for i, row in enumerate(workload)
+            if row.any()
+        ],
+        "heatmap": heatmap.astype(np.int64).tolist(),
+    }
+
+
+async def user_trends(
+    db: AsyncSession,
+    user_id: UUID,
+    today: date,
+    days: int,
+    tz: str,
+) -> dict:
+    start = today - timedelta(days=days - 1)
+    columns = await fetch_session_columns(
+        db,
+        user_id,
+        first_day=start - timedelta(days=ROLLING_WINDOW - 1),
+        end_day=today + timedelta(days=1),
+        tz=tz,
+    )
+    return compute_trends(columns, start, days)
@@ -0,0 +1,131 @@
+# app/versions.py
+# Per-user / per-institution change counters and the weak ETags built
+# from them, so list endpoints can answer If-None-Match with a 304
+# after reading a couple of resource_versions rows.
+#
+# Scopes:
+#   user:<id>         the user's courses, tasks, sessions and memberships
+#   institution:<id>  the institution's members (admin user lists)
+#   all               every user (developer-admin lists)
+#   institutions      the institutions table
+#
+# ORM writes are picked up by the flush listener below. Writes that skip
+# the unit of work (Core / bulk DML, raw SQL) must call touch().
+
+import hashlib
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from app import models
+
+ALL = "all"
+INSTITUTIONS = "institutions"
+
+_PENDING = "version_scopes"
+_PENDING_USERS = "version_users"
+
+_BUMP_SQL = text("""
+    INSERT INTO resource_versions (scope, version, updated_at)
+    SELECT scope, 1, now()
+    FROM (
+        SELECT unnest(CAST(:scopes AS text[])) AS scope
+        UNION
+        SELECT 'institution:' || institution_id
+        FROM institution_users
+        WHERE user_id = ANY(CAST(:users AS uuid[]))
+    ) changed
+    ORDER BY scope
+    ON CONFLICT (scope) DO UPDATE
+    SET version = resource_versions.version + 1, updated_at = now()
+""")
+
+
+def user_scope(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def institution_scope(institution_id) -> str:
+    return f"institution:{institution_id}"
+
+
+def touch(session, *scopes: str, users: Iterable[UUID] = ()) -> None:
+    """
+    Bump `scopes` when `session` commits. `users` also bumps each user's
+    scope, their institutions' scopes and 'all' (a user row changed).
+
+    Accepts a Session or an AsyncSession.
+    """
+    session.info.setdefault(_PENDING, set()).update(scopes)
+    users = set(users)
+    if users:
+        session.info.setdefault(_PENDING_USERS, set()).update(users)
+        session.info[_PENDING].update(user_scope(user_id) for user_id in users)
+        session.info[_PENDING].add(ALL)
+
+
+def _scopes_for(session: Session, obj) -> None:
+    if isinstance(obj, (models.Course, models.Task, models.TaskSession)):
+        touch(session, user_scope(obj.user_id))
+    elif isinstance(obj, models.InstitutionUser):
+        touch(session, user_scope(obj.user_id), institution_scope(obj.institution_id), ALL)
+    elif isinstance(obj, models.User):
+        touch(session, users=[obj.id])
+    elif isinstance(obj, models.Institution):
+        touch(session, INSTITUTIONS)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_version_scopes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        _scopes_for(session, obj)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    # Flush first so the listener above has seen every pending change
+    session.flush()
+    scopes = session.info.pop(_PENDING, None)
+    users = session.info.pop(_PENDING_USERS, set())
+    if scopes:
+        session.execute(_BUMP_SQL, {"scopes": sorted(scopes), "users": list(users)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_version_scopes(session):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_PENDING_USERS, None)
+
+
+async def etag_for(db, request: Request, scopes: list[str]) -> str:
+    """
+    Weak ETag for this request from the scopes' versions.
+
+    Call before reading the data: a write committing in between then makes
+    the tag older than the body, which only costs a refetch later.
+    """
+    versions = dict((await db.execute(
+        select(models.ResourceVersion.scope, models.ResourceVersion.version)
+        .where(models.ResourceVersion.scope.in_(scopes))
+    )).all())
+    key = "|".join(
+        [request.url.path, str(request.url.query)]
+        + [f"{scope}={versions.get(scope, 0)}" for scope in scopes]
+    )
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
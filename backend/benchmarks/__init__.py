@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Makes "benchmarks" a package so scripts run with `python -m benchmarks.<name>`.
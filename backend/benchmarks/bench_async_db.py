@@ -0,0 +1,115 @@
+# benchmarks/bench_async_db.py
+# Side-by-side throughput of the old sync data layer vs the async one.
+#
+# Both modes run the same query as GET /tasks/ for one seeded user, driven
+# by N concurrent clients:
+#   sync  - SessionLocal in a worker thread, like a `def` FastAPI handler
+#           (anyio's default thread limiter of 40 threads applies)
+#   async - AsyncSessionLocal awaited directly on the event loop
+#
+# Usage (from backend/, against a local Postgres):
+#   DATABASE_URL=postgresql://postgres@localhost/edulytics \
+#       python -m benchmarks.bench_async_db --clients 500 --requests 4
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import anyio
+from sqlalchemy import delete, insert, select
+
+from app import models
+from app import migrations
+from app.db import AsyncSessionLocal, SessionLocal, async_engine, engine
+
+
+def seed(task_count: int) -> uuid.UUID:
+    migrations.apply_pending(engine)
+    user_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.execute(insert(models.User).values(
+            id=user_id,
+            email=f"bench-{user_id}@example.com",
+            password_hash="x",
+        ))
+        db.execute(insert(models.Task), [
+            {"user_id": user_id, "title": f"task {i}", "priority": i % 5}
+            for i in range(task_count)
+        ])
+        db.commit()
+    return user_id
+
+
+def cleanup(user_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        db.execute(delete(models.User).where(models.User.id == user_id))
+        db.commit()
+
+
+def _query(user_id):
+    return (
+        select(models.Task)
+        .where(models.Task.user_id == user_id)
+        .order_by(models.Task.created_at.desc())
+    )
+
+
+def sync_request(user_id) -> None:
+    with SessionLocal() as db:
+        db.scalars(_query(user_id)).all()
+
+
+async def async_request(user_id) -> None:
+    async with AsyncSessionLocal() as db:
+        (await db.scalars(_query(user_id))).all()
+
+
+async def run(mode: str, user_id, clients: int, requests: int) -> dict:
+    latencies = []
+
+    async def client():
+        for _ in range(requests):
+            started = time.perf_counter()
+            if mode == "sync":
+                await anyio.to_thread.run_sync(sync_request, user_id)
+            else:
+                await async_request(user_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync vs async data layer throughput")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=4, help="requests per client")
+    parser.add_argument("--tasks", type=int, default=50, help="tasks seeded for the user")
+    args = parser.parse_args()
+
+    user_id = seed(args.tasks)
+    try:
+        for mode in ("sync", "async"):
+            # warm both pools before measuring
+            await run(mode, user_id, clients=5, requests=1)
+            print(await run(mode, user_id, args.clients, args.requests))
+    finally:
+        cleanup(user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
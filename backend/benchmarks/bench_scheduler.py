@@ -0,0 +1,82 @@
+# benchmarks/bench_scheduler.py
+# Timing for app.scheduler (no database needed).
+#
+# Builds a semester of study windows, a few hundred existing sessions and
+# N open tasks from a fixed seed, then times free-time computation +
+# scheduling. The correctness checks (no overlaps, inside free time,
+# before due dates, every minute accounted for, independent of input
+# order) are in tests/test_scheduler.py.
+#
+# Usage (from backend/):
+#   python -m benchmarks.bench_scheduler --tasks 10000 --days 120
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, time as clock, timezone
+from zoneinfo import ZoneInfo
+
+from app import scheduler
+
+SEMESTER_START = scheduler.to_minutes(datetime(2025, 9, 1, tzinfo=timezone.utc))
+
+
+def make_inputs(task_count: int, days: int, busy_count: int, seed: int):
+    """Tasks and busy intervals from `seed`; also used by tests/test_scheduler.py."""
+    rng = random.Random(seed)
+    start = SEMESTER_START
+    end = start + days * 24 * 60
+
+    tasks = [
+        scheduler.SchedulingTask(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            priority=rng.randint(0, 5),
+            due=rng.randint(start + 24 * 60, end) if rng.random() < 0.8 else None,
+            minutes=rng.choice((15, 30, 45, 60, 90, 120, 180)),
+        )
+        for _ in range(task_count)
+    ]
+    busy = []
+    for _ in range(busy_count):
+        busy_start = rng.randint(start, end)
+        busy.append((busy_start, busy_start + rng.randint(30, 180)))
+    return start, end, tasks, busy
+
+
+def plan(start, end, tasks, busy, tz, options):
+    free = scheduler.subtract_intervals(
+        scheduler.daily_windows(start, end, tz, clock(8, 0), clock(22, 0)),
+        scheduler.merge_intervals(busy),
+    )
+    return free, *scheduler.schedule(tasks, free, options)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--busy", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tz = ZoneInfo("Europe/London")
+    options = scheduler.ScheduleOptions()
+    start, end, tasks, busy = make_inputs(args.tasks, args.days, args.busy, args.seed)
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        free, planned, unscheduled = plan(start, end, tasks, busy, tz, options)
+        timings.append(time.perf_counter() - started)
+
+    print(f"{args.tasks} tasks, {args.days} days, {args.busy} existing sessions")
+    print(f"  sessions planned : {len(planned)}")
+    print(f"  tasks left over  : {len(unscheduled)}")
+    print(f"  time (median)    : {statistics.median(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
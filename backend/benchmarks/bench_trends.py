@@ -0,0 +1,193 @@
+# benchmarks/bench_trends.py
+# GET /analytics/trends computation: columnar + NumPy (app.trends) vs
+# hydrating TaskSession ORM objects and looping over them in Python.
+#
+# Seeds one user with N sessions spread over the last year, checks that
+# both implementations agree, then times each.
+#
+# Usage (from backend/, against a local Postgres):
+#   DATABASE_URL=postgresql://postgres@localhost/edulytics \
+#       python -m benchmarks.bench_trends --sessions 1000000
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, insert, select, text
+
+from app import models, trends
+from app import migrations
+from app.db import AsyncSessionLocal, SessionLocal, async_engine, engine
+
+SEED_SQL = """
+    WITH c AS (
+        INSERT INTO courses (user_id, title)
+        SELECT :user_id, 'Course ' || n FROM generate_series(1, :courses) n
+        RETURNING id
+    ), course_list AS (
+        SELECT id, row_number() OVER () AS n FROM c
+    ), t AS (
+        INSERT INTO tasks (user_id, course_id, title)
+        SELECT :user_id,
+               (SELECT id FROM course_list WHERE n = 1 + (g % (:courses + 1))),
+               'Task ' || g
+        FROM generate_series(1, :tasks) g
+        RETURNING id
+    ), task_list AS (
+        SELECT id, row_number() OVER () - 1 AS n FROM t
+    )
+    INSERT INTO task_sessions (user_id, task_id, start_at, end_at, status)
+    SELECT :user_id, task_list.id, s.start_at,
+           s.start_at + (15 + (g * 7919) % 106) * interval '1 minute',
+           (ARRAY['planned', 'completed', 'completed', 'skipped'])[1 + (g * 31) % 4]
+    FROM generate_series(0::bigint, :sessions - 1) g
+    CROSS JOIN LATERAL (
+        SELECT now() - ((g * 104729) % (365 * 24 * 60)) * interval '1 minute' AS start_at
+    ) s
+    JOIN task_list ON task_list.n = g % :tasks
+"""
+
+
+def seed(sessions: int) -> uuid.UUID:
+    migrations.apply_pending(engine)
+    user_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.execute(insert(models.User).values(
+            id=user_id,
+            email=f"bench-{user_id}@example.com",
+            password_hash="x",
+        ))
+        db.execute(text(SEED_SQL), {
+            "user_id": user_id,
+            "courses": 6,
+            "tasks": 2000,
+            "sessions": sessions,
+        })
+        db.commit()
+    return user_id
+
+
+def cleanup(user_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        db.execute(delete(models.User).where(models.User.id == user_id))
+        db.commit()
+
+
+async def naive_trends(user_id: uuid.UUID, today: date, days: int, tz: str) -> dict:
+    """The straightforward version: ORM objects and Python loops."""
+    zone = ZoneInfo(tz)
+    start = today - timedelta(days=days - 1)
+    first = start - timedelta(days=trends.ROLLING_WINDOW - 1)
+    lower = datetime.combine(first, datetime.min.time(), zone)
+    upper = datetime.combine(today + timedelta(days=1), datetime.min.time(), zone)
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(models.TaskSession, models.Task.course_id, models.Course.title)
+            .join(models.Task, models.Task.id == models.TaskSession.task_id)
+            .outerjoin(models.Course, models.Course.id == models.Task.course_id)
+            .where(
+                models.TaskSession.user_id == user_id,
+                models.TaskSession.start_at >= lower,
+                models.TaskSession.start_at < upper,
+            )
+        )).all()
+
+    done_by_day = defaultdict(int)
+    workload = defaultdict(lambda: [0] * days)
+    titles = {}
+    heatmap = [[0] * 24 for _ in range(7)]
+    for session, course_id, title in rows:
+        local = session.start_at.astimezone(zone)
+        minutes = int((session.end_at - session.start_at).total_seconds() // 60)
+        done = minutes if session.status == "completed" else 0
+        done_by_day[local.date()] += done
+        if local.date() >= start:
+            workload[course_id][(local.date() - start).days] += minutes
+            titles[course_id] = title
+            heatmap[local.weekday()][local.hour] += done
+
+    day_list = [start + timedelta(days=i) for i in range(days)]
+    daily = [done_by_day[day] for day in day_list]
+    rolling = [
+        sum(done_by_day[day - timedelta(days=k)] for k in range(trends.ROLLING_WINDOW))
+        for day in day_list
+    ]
+
+    longest = run = 0
+    for minutes in daily:
+        run = run + 1 if minutes else 0
+        longest = max(longest, run)
+    current = 0
+    for minutes in reversed(daily if daily[-1] else daily[:-1]):
+        if not minutes:
+            break
+        current += 1
+
+    courses = sorted(
+        (course_id for course_id, curve in workload.items() if any(curve)),
+        key=lambda course_id: (course_id is not None, str(course_id)),
+    )
+    return {
+        "days": day_list,
+        "daily_minutes": daily,
+        "rolling_7d_minutes": rolling,
+        "streak": {"current": current, "longest": longest},
+        "courses": [
+            {"course_id": course_id, "title": titles[course_id], "planned_minutes": workload[course_id]}
+            for course_id in courses
+        ],
+        "heatmap": heatmap,
+    }
+
+
+async def vectorised_trends(user_id: uuid.UUID, today: date, days: int, tz: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await trends.user_trends(db, user_id, today, days, tz)
+
+
+async def timed(fn, *args, repeat: int) -> tuple[float, dict]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def run(args) -> None:
+    today = datetime.now(ZoneInfo(args.tz)).date()
+    user_id = seed(args.sessions)
+    try:
+        naive_s, expected = await timed(naive_trends, user_id, today, args.days, args.tz, repeat=args.repeat)
+        fast_s, actual = await timed(vectorised_trends, user_id, today, args.days, args.tz, repeat=args.repeat)
+    finally:
+        cleanup(user_id)
+        await async_engine.dispose()
+
+    if actual != expected:
+        for key in expected:
+            if actual[key] != expected[key]:
+                print(f"MISMATCH in {key}")
+        raise SystemExit(1)
+
+    print(f"{args.sessions} sessions, {args.days}-day window, tz={args.tz}: results match")
+    print(f"  ORM + Python loop : {naive_s * 1000:10.1f} ms")
+    print(f"  columnar + NumPy  : {fast_s * 1000:10.1f} ms  ({naive_s / fast_s:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--tz", default="Europe/London")
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+# benchmarks/loadtest.py
+# HTTP load test for the auth, courses, tasks, institutions and admin
+# routers against a real uvicorn process and a local Postgres.
+#
+#   1. seeds an institution with teachers, students, courses, tasks,
+#      sessions and rosters (all tagged, removed again at the end)
+#   2. starts uvicorn (or uses --url) and drives every scenario below
+#      with --concurrency clients for --requests requests each
+#   3. reports p50 / p95 / p99 latency, throughput, errors and SQL
+#      statements per request (from GET /metrics) and writes them to
+#      --output as JSON; --baseline prints the change against an earlier
+#      results file
+#
+# Usage (from backend/, against a local Postgres):
+#   pip install -r benchmarks/requirements.txt
+#   DATABASE_URL=postgresql://postgres@localhost/edulytics \
+#       python -m benchmarks.loadtest --concurrency 20 --requests 200 \
+#       --output loadtest.json --baseline previous.json
+#
+# --scenarios takes a comma-separated list of name prefixes (e.g.
+# "tasks.,admin.users"). auth.register and auth.login hash passwords at
+# the server's BCRYPT_ROUNDS, like production. Queries per request come
+# from the server's own counters, so they exclude statements a streamed
+# body runs after the headers (admin.export_users) and drop to 0 for
+# cached responses (admin.stats).
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+import bcrypt
+import httpx
+from sqlalchemy import text
+
+from app import migrations
+from app.db import engine
+from app.deps import create_access_token
+from app.hashing import BCRYPT_ROUNDS
+
+PASSWORD = "loadtest-password"
+
+SEED_SQL = [
+    """
+    INSERT INTO institutions (name, code) VALUES (:name, :tag)
+    """,
+    """
+    WITH u AS (
+        INSERT INTO users (email, password_hash, name, mobile_number, account_type)
+        SELECT CASE WHEN n <= :teachers THEN 'teacher' ELSE 'student' END || n || '@' || :domain,
+               :password_hash,
+               'Load User ' || n,
+               '+1 555 ' || lpad(n::text, 7, '0'),
+               CASE WHEN n <= :teachers THEN 'teacher' ELSE 'student' END
+        FROM generate_series(1, :teachers + :students) n
+        RETURNING id, account_type
+    )
+    INSERT INTO institution_users (user_id, institution_id, role)
+    SELECT u.id, i.id, u.account_type
+    FROM u, institutions i
+    WHERE i.code = :tag
+    """,
+    """
+    INSERT INTO student_teacher (student_id, teacher_id)
+    SELECT s.id, t.id
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY email) AS n
+        FROM users WHERE email LIKE '%@' || :domain AND account_type = 'student'
+    ) s
+    JOIN (
+        SELECT id, row_number() OVER (ORDER BY email) - 1 AS n
+        FROM users WHERE email LIKE '%@' || :domain AND account_type = 'teacher'
+    ) t ON t.n = s.n % :teachers
+    """,
+    """
+    INSERT INTO courses (user_id, title)
+    SELECT u.id, 'Course ' || c
+    FROM users u, generate_series(1, :courses) c
+    WHERE u.email LIKE '%@' || :domain AND u.account_type = 'student'
+    """,
+    """
+    INSERT INTO tasks (user_id, course_id, title, status, priority, due_at, estimated_minutes)
+    SELECT u.id,
+           (SELECT id FROM courses WHERE user_id = u.id ORDER BY id OFFSET t % :courses LIMIT 1),
+           'Task ' || t,
+           (ARRAY['pending', 'in_progress', 'completed'])[1 + t % 3],
+           t % 5,
+           now() + (t - :tasks / 2) * interval '1 day',
+           30 + (t % 4) * 30
+    FROM users u, generate_series(1, :tasks) t
+    WHERE u.email LIKE '%@' || :domain AND u.account_type = 'student'
+    """,
+    """
+    INSERT INTO task_sessions (user_id, task_id, start_at, end_at, source, status)
+    SELECT t.user_id, t.id, s.start_at, s.start_at + interval '45 minutes', 'manual',
+           CASE WHEN s.start_at < now() THEN 'completed' ELSE 'planned' END
+    FROM tasks t
+    JOIN users u ON u.id = t.user_id
+    CROSS JOIN LATERAL (
+        SELECT date_trunc('hour', t.created_at) - (t.priority + k * 7) * interval '1 day' AS start_at
+        FROM generate_series(0, :sessions - 1) k
+    ) s
+    WHERE u.email LIKE '%@' || :domain
+    """,
+]
+
+
+@dataclass
+class Context:
+    tag: str
+    domain: str
+    institution_id: str
+    teachers: list[str]
+    students: list[str]
+    # actor: (user token headers, one of the user's task ids)
+    actors: list[tuple[dict, str]]
+    admin: dict = field(default_factory=dict)
+    developer: dict = field(default_factory=dict)
+    unique: Callable[[], int] = field(default_factory=lambda: itertools.count().__next__)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str  # route template, as labelled in /metrics
+    build: Callable[[Context, int], dict]
+
+
+def _actor(ctx: Context, i: int):
+    return ctx.actors[i % len(ctx.actors)]
+
+
+def _email(ctx: Context, kind: str) -> str:
+    return f"{kind}-{ctx.unique()}@{ctx.domain}"
+
+
+def _roster_change(ctx: Context, i: int) -> dict:
+    teacher = ctx.teachers[i % len(ctx.teachers)]
+    return {"teacher_id": teacher, "student_ids": random.Random(i).sample(ctx.students, 10)}
+
+
+def _import_csv(ctx: Context, i: int) -> bytes:
+    lines = ["email,mobile_number,user_id,role"]
+    lines += [f"{_email(ctx, 'import')},555,{i}-{n},student" for n in range(20)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _session(ctx: Context, i: int) -> dict:
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+    return {"start_at": start.isoformat(), "end_at": (start + timedelta(minutes=30)).isoformat()}
+
+
+SCENARIOS = [
+    # auth
+    Scenario("auth.register", "POST", "/auth/register", lambda ctx, i: {
+        "url": "/auth/register",
+        "json": {"email": _email(ctx, "register"), "password": PASSWORD, "name": "Registered"},
+    }),
+    Scenario("auth.login", "POST", "/auth/login", lambda ctx, i: {
+        "url": "/auth/login",
+        "data": {"username": f"student{len(ctx.teachers) + 1 + i % len(ctx.students)}@{ctx.domain}", "password": PASSWORD},
+    }),
+    Scenario("auth.me", "GET", "/auth/me", lambda ctx, i: {
+        "url": "/auth/me", "headers": _actor(ctx, i)[0],
+    }),
+    # courses
+    Scenario("courses.list", "GET", "/courses/", lambda ctx, i: {
+        "url": "/courses/", "headers": _actor(ctx, i)[0],
+    }),
+    Scenario("courses.create", "POST", "/courses/", lambda ctx, i: {
+        "url": "/courses/", "headers": _actor(ctx, i)[0], "json": {"title": f"Load course {i}"},
+    }),
+    # tasks
+    Scenario("tasks.list", "GET", "/tasks/", lambda ctx, i: {
+        "url": "/tasks/", "headers": _actor(ctx, i)[0],
+    }),
+    Scenario("tasks.list_due", "GET", "/tasks/", lambda ctx, i: {
+        "url": "/tasks/", "params": {"order": "due", "limit": 20}, "headers": _actor(ctx, i)[0],
+    }),
+    Scenario("tasks.get", "GET", "/tasks/{task_id}", lambda ctx, i: {
+        "url": f"/tasks/{_actor(ctx, i)[1]}", "headers": _actor(ctx, i)[0],
+    }),
+    Scenario("tasks.create", "POST", "/tasks/", lambda ctx, i: {
+        "url": "/tasks/", "headers": _actor(ctx, i)[0],
+        "json": {"title": f"Load task {i}", "priority": i % 5, "estimated_minutes": 60},
+    }),
+    Scenario("tasks.batch", "POST", "/tasks/batch", lambda ctx, i: {
+        "url": "/tasks/batch", "headers": _actor(ctx, i)[0],
+        "json": {"tasks": [{"title": f"Batch task {i}.{n}"} for n in range(20)]},
+    }),
+    Scenario("tasks.update", "PATCH", "/tasks/{task_id}", lambda ctx, i: {
+        "url": f"/tasks/{_actor(ctx, i)[1]}", "headers": _actor(ctx, i)[0],
+        "json": {"priority": i % 5},
+    }),
+    Scenario("tasks.create_session", "POST", "/tasks/{task_id}/sessions", lambda ctx, i: {
+        "url": f"/tasks/{_actor(ctx, i)[1]}/sessions", "headers": _actor(ctx, i)[0], "json": _session(ctx, i),
+    }),
+    Scenario("tasks.list_sessions", "GET", "/tasks/{task_id}/sessions", lambda ctx, i: {
+        "url": f"/tasks/{_actor(ctx, i)[1]}/sessions", "headers": _actor(ctx, i)[0],
+    }),
+    # institutions
+    Scenario("institutions.my", "GET", "/institutions/my", lambda ctx, i: {
+        "url": "/institutions/my", "headers": _actor(ctx, i)[0],
+    }),
+    Scenario("institutions.create", "POST", "/institutions/", lambda ctx, i: {
+        "url": "/institutions/", "headers": _actor(ctx, i)[0],
+        "json": {"name": f"Load {ctx.tag} {ctx.unique()}"},
+    }),
+    # admin
+    Scenario("admin.login", "POST", "/api/admin/login", lambda ctx, i: {
+        "url": "/api/admin/login", "json": {"email": f"admin@{ctx.domain}", "password": PASSWORD},
+    }),
+    Scenario("admin.teachers", "GET", "/api/admin/teachers", lambda ctx, i: {
+        "url": "/api/admin/teachers", "headers": ctx.admin,
+    }),
+    Scenario("admin.students", "GET", "/api/admin/students", lambda ctx, i: {
+        "url": "/api/admin/students", "headers": ctx.admin,
+    }),
+    Scenario("admin.users", "GET", "/api/admin/users", lambda ctx, i: {
+        "url": "/api/admin/users", "headers": ctx.admin,
+    }),
+    Scenario("admin.institutions", "GET", "/api/admin/institutions", lambda ctx, i: {
+        "url": "/api/admin/institutions", "headers": ctx.admin,
+    }),
+    Scenario("admin.stats", "GET", "/api/admin/stats", lambda ctx, i: {
+        "url": "/api/admin/stats", "headers": ctx.admin,
+    }),
+    Scenario("admin.analytics", "GET", "/api/admin/analytics", lambda ctx, i: {
+        "url": "/api/admin/analytics", "headers": ctx.admin,
+    }),
+    Scenario("admin.add_user", "POST", "/api/admin/add-user", lambda ctx, i: {
+        "url": "/api/admin/add-user", "headers": ctx.admin,
+        "json": {"email": _email(ctx, "added"), "mobile_number": "555", "institution_id": ctx.institution_id,
+                 "user_id": f"added-{i}", "role": "student"},
+    }),
+    Scenario("admin.import_users", "POST", "/api/admin/import-users", lambda ctx, i: {
+        "url": "/api/admin/import-users", "headers": ctx.admin,
+        "data": {"institution_id": ctx.institution_id},
+        "files": {"file": ("users.csv", _import_csv(ctx, i), "text/csv")},
+    }),
+    Scenario("admin.assign_students", "POST", "/api/admin/assign-students", lambda ctx, i: {
+        "url": "/api/admin/assign-students", "headers": ctx.admin, "json": _roster_change(ctx, i),
+    }),
+    Scenario("admin.unassign_students", "POST", "/api/admin/unassign-students", lambda ctx, i: {
+        "url": "/api/admin/unassign-students", "headers": ctx.admin, "json": _roster_change(ctx, i),
+    }),
+    Scenario("admin.reassign_students", "POST", "/api/admin/reassign-students", lambda ctx, i: {
+        "url": "/api/admin/reassign-students", "headers": ctx.admin,
+        "json": {
+            "from_teacher_id": ctx.teachers[i % len(ctx.teachers)],
+            "to_teacher_id": ctx.teachers[(i + 1) % len(ctx.teachers)],
+            "student_ids": random.Random(i).sample(ctx.students, 5),
+        },
+    }),
+    Scenario("admin.create_institution", "POST", "/api/admin/institutions", lambda ctx, i: {
+        "url": "/api/admin/institutions", "headers": ctx.developer,
+        "json": {"name": f"Load {ctx.tag} {ctx.unique()}"},
+    }),
+    Scenario("admin.export_users", "GET", "/api/admin/exports/{dataset}", lambda ctx, i: {
+        "url": "/api/admin/exports/users", "params": {"format": "ndjson"}, "headers": ctx.admin,
+    }),
+]
+
+
+def seed(args, tag: str) -> Context:
+    migrations.apply_pending(engine)
+    domain = f"{tag}.loadtest.example.com"
+    password_hash = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(BCRYPT_ROUNDS)).decode("utf-8")
+    params = {
+        "tag": tag, "name": f"Load {tag}", "domain": domain, "password_hash": password_hash,
+        "teachers": args.teachers, "students": args.students, "courses": args.courses,
+        "tasks": args.tasks, "sessions": args.sessions,
+    }
+    with engine.begin() as conn:
+        for statement in SEED_SQL:
+            conn.execute(text(statement), params)
+        institution_id = conn.scalar(text("SELECT id FROM institutions WHERE code = :tag"), params)
+        conn.execute(text("""
+            INSERT INTO admins (email, password_hash, name, institution_id, is_active)
+            VALUES ('admin@' || :domain, :password_hash, 'Load admin', :institution_id, true),
+                   ('developer@' || :domain, :password_hash, 'Load developer', NULL, true)
+        """), dict(params, institution_id=institution_id))
+        people = conn.execute(text("""
+            SELECT id, account_type FROM users WHERE email LIKE '%@' || :domain ORDER BY email
+        """), params).all()
+        students = [str(row.id) for row in people if row.account_type == "student"]
+        tasks = dict(conn.execute(text("""
+            SELECT DISTINCT ON (user_id) user_id, id FROM tasks
+            WHERE user_id = ANY(CAST(:ids AS uuid[]))
+            ORDER BY user_id, id
+        """), {"ids": students[:args.actors]}).all())
+
+    actors = [
+        ({"Authorization": f"Bearer {create_access_token({'sub': student})}"}, str(tasks[uuid.UUID(student)]))
+        for student in students[:args.actors]
+    ]
+    return Context(
+        tag=tag,
+        domain=domain,
+        institution_id=str(institution_id),
+        teachers=[str(row.id) for row in people if row.account_type == "teacher"],
+        students=students,
+        actors=actors,
+    )
+
+
+def cleanup(ctx: Context) -> None:
+    with engine.begin() as conn:
+        params = {"domain": ctx.domain, "pattern": f"Load {ctx.tag}%"}
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), params)
+        conn.execute(text("DELETE FROM admins WHERE email LIKE '%@' || :domain"), params)
+        conn.execute(text("DELETE FROM institutions WHERE name LIKE :pattern"), params)
+
+
+_METRIC_LINE = re.compile(r'^http_request_db_queries_(sum|count)\{method="([^"]*)",route="([^"]*)"\} (\S+)$')
+
+
+async def query_counts(client: httpx.AsyncClient) -> dict:
+    """(method, route) -> [statements, requests] from /metrics."""
+    counts = {}
+    for line in (await client.get("/metrics")).text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            kind, method, route, value = match.groups()
+            counts.setdefault((method, route), [0.0, 0.0])[kind == "count"] = float(value)
+    return counts
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Context, args) -> dict:
+    async def send(i: int) -> tuple[float, int]:
+        started = time.perf_counter()
+        response = await client.request(scenario.method, **scenario.build(ctx, i))
+        return time.perf_counter() - started, response.status_code
+
+    for i in range(args.warmup):
+        await send(-1 - i)
+
+    before = await query_counts(client)
+    latencies, errors = [], 0
+    requests = iter(range(args.requests))
+
+    async def worker():
+        nonlocal errors
+        for i in requests:
+            elapsed, status_code = await send(i)
+            latencies.append(elapsed)
+            if status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - started
+    after = await query_counts(client)
+
+    key = (scenario.method, scenario.route)
+    statements, requests_seen = (a - b for a, b in zip(after.get(key, [0, 0]), before.get(key, [0, 0])))
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "method": scenario.method,
+        "route": scenario.route,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "latency_ms": {
+            "p50": round(cuts[49] * 1000, 2),
+            "p95": round(cuts[94] * 1000, 2),
+            "p99": round(cuts[98] * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        },
+        "queries_per_request": round(statements / requests_seen, 2) if requests_seen else None,
+    }
+
+
+async def admin_headers(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post("/api/admin/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def drive(base_url: str, ctx: Context, scenarios: list[Scenario], args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        ctx.admin = await admin_headers(client, f"admin@{ctx.domain}")
+        ctx.developer = await admin_headers(client, f"developer@{ctx.domain}")
+        results = {}
+        for scenario in scenarios:
+            results[scenario.name] = result = await run_scenario(client, scenario, ctx, args)
+            latency = result["latency_ms"]
+            print(
+                f"{scenario.name:28} {result['throughput_rps']:8.1f} req/s"
+                f"  p50 {latency['p50']:8.2f}  p95 {latency['p95']:8.2f}  p99 {latency['p99']:8.2f} ms"
+                f"  queries {result['queries_per_request']!s:>5}  errors {result['errors']}"
+            )
+        return results
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = dict(os.environ, ANALYTICS_REFRESH_SECONDS="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn didn't come up within 60s")
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    with open(baseline_path) as file:
+        baseline = json.load(file)["scenarios"]
+    print(f"\nChange against {baseline_path} (negative p95 / positive req/s is better):")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        p95 = (result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1) * 100
+        rps = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100
+        print(f"  {name:28} p95 {p95:+7.1f}%   req/s {rps:+7.1f}%")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="use an already running server instead of starting uvicorn")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per scenario")
+    parser.add_argument("--scenarios", help="comma-separated name prefixes to run")
+    parser.add_argument("--teachers", type=int, default=20)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=4, help="per student")
+    parser.add_argument("--tasks", type=int, default=40, help="per student")
+    parser.add_argument("--sessions", type=int, default=2, help="per task")
+    parser.add_argument("--actors", type=int, default=100, help="students the requests rotate through")
+    parser.add_argument("--output", default="loadtest-results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--keep-data", action="store_true")
+    args = parser.parse_args()
+
+    scenarios = SCENARIOS
+    if args.scenarios:
+        prefixes = tuple(args.scenarios.split(","))
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name.startswith(prefixes)]
+
+    tag = f"lt{uuid.uuid4().hex[:8]}"
+    started = time.perf_counter()
+    ctx = seed(args, tag)
+    print(f"seeded {len(ctx.students)} students / {len(ctx.teachers)} teachers in {time.perf_counter() - started:.1f}s")
+
+    server = None if args.url else start_server(args.port)
+    try:
+        results = asyncio.run(drive(args.url or f"http://127.0.0.1:{args.port}", ctx, scenarios, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if not args.keep_data:
+            cleanup(ctx)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline", "keep_data")
+        },
+        "scenarios": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nwrote {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+-- 0001_initial_schema.sql
+-- The schema the app used to create on import with create_all. IF NOT
+-- EXISTS throughout, so databases created that way adopt it as is.
+
+CREATE TABLE IF NOT EXISTS institutions (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    name VARCHAR NOT NULL,
+    code VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_institutions_id ON institutions (id);
+
+CREATE TABLE IF NOT EXISTS users (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    name VARCHAR,
+    email VARCHAR NOT NULL,
+    mobile_number VARCHAR,
+    password_hash VARCHAR NOT NULL,
+    account_type VARCHAR DEFAULT 'personal',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email);
+CREATE INDEX IF NOT EXISTS ix_users_id ON users (id);
+
+CREATE TABLE IF NOT EXISTS admins (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    email VARCHAR NOT NULL,
+    password_hash VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    institution_id UUID,
+    is_active BOOLEAN NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (institution_id) REFERENCES institutions (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS ix_admins_id ON admins (id);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_admins_email ON admins (email);
+
+CREATE TABLE IF NOT EXISTS courses (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    user_id UUID NOT NULL,
+    title VARCHAR NOT NULL,
+    description VARCHAR,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS ix_courses_id ON courses (id);
+
+CREATE TABLE IF NOT EXISTS institution_users (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    user_id UUID NOT NULL,
+    institution_id UUID NOT NULL,
+    role VARCHAR NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+    FOREIGN KEY (institution_id) REFERENCES institutions (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS ix_institution_users_id ON institution_users (id);
+
+CREATE TABLE IF NOT EXISTS student_teacher (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    student_id UUID NOT NULL,
+    teacher_id UUID NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (student_id) REFERENCES users (id) ON DELETE CASCADE,
+    FOREIGN KEY (teacher_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS ix_student_teacher_id ON student_teacher (id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    user_id UUID NOT NULL,
+    course_id UUID,
+    title VARCHAR NOT NULL,
+    description VARCHAR,
+    status VARCHAR DEFAULT 'pending' NOT NULL,
+    priority INTEGER DEFAULT 0 NOT NULL,
+    due_at TIMESTAMP WITH TIME ZONE,
+    estimated_minutes INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_course_id ON tasks (course_id);
+CREATE INDEX IF NOT EXISTS ix_tasks_id ON tasks (id);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id ON tasks (user_id);
+
+CREATE TABLE IF NOT EXISTS task_sessions (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    user_id UUID NOT NULL,
+    task_id UUID NOT NULL,
+    start_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    end_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    source VARCHAR DEFAULT 'manual' NOT NULL,
+    status VARCHAR DEFAULT 'planned' NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+    FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS ix_task_sessions_id ON task_sessions (id);
+CREATE INDEX IF NOT EXISTS ix_task_sessions_user_id ON task_sessions (user_id);
+CREATE INDEX IF NOT EXISTS ix_task_sessions_task_id ON task_sessions (task_id);
@@ -0,0 +1,21 @@
+-- 0002_list_indexes.sql
+-- Composite indexes matching the list endpoints' filters and keyset
+-- ordering. The (user_id, ...) indexes replace the single-column ones.
+
+-- Admin user listings (keyset on created_at, id)
+CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_users_account_type_created_at_id ON users (account_type, created_at, id);
+
+-- Institution membership lookups, both directions
+CREATE INDEX IF NOT EXISTS ix_institution_users_institution_id_user_id ON institution_users (institution_id, user_id);
+CREATE INDEX IF NOT EXISTS ix_institution_users_user_id ON institution_users (user_id);
+
+-- GET /tasks/ filters
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id_created_at ON tasks (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id_status_due_at ON tasks (user_id, status, due_at);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id_course_id ON tasks (user_id, course_id);
+DROP INDEX IF EXISTS ix_tasks_user_id;
+
+-- Calendar range reads (GET /sessions?from=&to=)
+CREATE INDEX IF NOT EXISTS ix_task_sessions_user_id_start_at ON task_sessions (user_id, start_at);
+DROP INDEX IF EXISTS ix_task_sessions_user_id;
@@ -0,0 +1,23 @@
+-- 0003_student_teacher_pairs.sql
+-- One row per (student, teacher) pair, so assignments can use
+-- INSERT ... ON CONFLICT DO NOTHING. Duplicates left by the old
+-- check-then-insert code are removed first, keeping the earliest row.
+
+DELETE FROM student_teacher AS later
+USING student_teacher AS earlier
+WHERE later.student_id = earlier.student_id
+  AND later.teacher_id = earlier.teacher_id
+  AND (later.created_at, later.id) > (earlier.created_at, earlier.id);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_student_teacher_pair') THEN
+        ALTER TABLE student_teacher
+            ADD CONSTRAINT uq_student_teacher_pair UNIQUE (student_id, teacher_id);
+    END IF;
+END
+$$;
+
+-- Roster pages in assignment order (GET /teachers/{id}/students)
+CREATE INDEX IF NOT EXISTS ix_student_teacher_teacher_id_created_at
+    ON student_teacher (teacher_id, created_at, student_id);
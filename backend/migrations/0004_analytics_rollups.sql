@@ -0,0 +1,64 @@
+-- 0004_analytics_rollups.sql
+-- tasks.completed_at and the analytics rollup tables (app.rollups,
+-- app.admin_analytics). Fill them afterwards with
+--   python -m app.cli backfill-rollups
+--   python -m app.cli refresh-analytics --full
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITH TIME ZONE;
+
+-- Tasks completed before the column existed: best guess is updated_at
+UPDATE tasks SET completed_at = updated_at
+WHERE status = 'completed' AND completed_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS user_daily_stats (
+    user_id UUID NOT NULL,
+    day DATE NOT NULL,
+    planned_minutes INTEGER DEFAULT 0 NOT NULL,
+    completed_minutes INTEGER DEFAULT 0 NOT NULL,
+    skipped_sessions INTEGER DEFAULT 0 NOT NULL,
+    tasks_completed INTEGER DEFAULT 0 NOT NULL,
+    tasks_overdue INTEGER DEFAULT 0 NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS ix_user_daily_stats_updated_at ON user_daily_stats (updated_at);
+CREATE INDEX IF NOT EXISTS ix_user_daily_stats_day ON user_daily_stats (day);
+
+CREATE TABLE IF NOT EXISTS institution_daily_stats (
+    institution_id UUID NOT NULL,
+    day DATE NOT NULL,
+    role VARCHAR NOT NULL,
+    active_users INTEGER DEFAULT 0 NOT NULL,
+    planned_minutes INTEGER DEFAULT 0 NOT NULL,
+    completed_minutes INTEGER DEFAULT 0 NOT NULL,
+    skipped_sessions INTEGER DEFAULT 0 NOT NULL,
+    tasks_completed INTEGER DEFAULT 0 NOT NULL,
+    tasks_overdue INTEGER DEFAULT 0 NOT NULL,
+    PRIMARY KEY (institution_id, day, role),
+    FOREIGN KEY (institution_id) REFERENCES institutions (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS teacher_roster_daily_stats (
+    institution_id UUID NOT NULL,
+    teacher_id UUID NOT NULL,
+    day DATE NOT NULL,
+    active_students INTEGER DEFAULT 0 NOT NULL,
+    planned_minutes INTEGER DEFAULT 0 NOT NULL,
+    completed_minutes INTEGER DEFAULT 0 NOT NULL,
+    skipped_sessions INTEGER DEFAULT 0 NOT NULL,
+    tasks_completed INTEGER DEFAULT 0 NOT NULL,
+    tasks_overdue INTEGER DEFAULT 0 NOT NULL,
+    PRIMARY KEY (institution_id, teacher_id, day),
+    FOREIGN KEY (institution_id) REFERENCES institutions (id) ON DELETE CASCADE,
+    FOREIGN KEY (teacher_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS analytics_refresh_state (
+    name VARCHAR NOT NULL,
+    watermark TIMESTAMP WITH TIME ZONE,
+    refreshed_at TIMESTAMP WITH TIME ZONE,
+    full_refreshed_at TIMESTAMP WITH TIME ZONE,
+    duration_ms INTEGER,
+    PRIMARY KEY (name)
+);
@@ -0,0 +1,9 @@
+-- 0005_resource_versions.sql
+-- Change counters behind the list endpoints' ETags (app.versions).
+
+CREATE TABLE IF NOT EXISTS resource_versions (
+    scope VARCHAR NOT NULL,
+    version BIGINT DEFAULT 0 NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (scope)
+);
@@ -0,0 +1,27 @@
+-- 0006_session_length_check.sql
+-- Sessions must end after they start and last at most 24 hours
+-- (app.routers.sessions.MAX_SESSION_DURATION). The range and overlap
+-- queries rely on the cap to bound start_at on (user_id, start_at), so
+-- it is enforced here too, for rows written outside the API.
+--
+-- Added NOT VALID so existing rows don't block the migration; it is
+-- validated straight away when they all pass. Otherwise find them with
+--   SELECT id FROM task_sessions
+--   WHERE NOT (end_at > start_at AND end_at - start_at <= interval '24 hours');
+-- fix them, and run
+--   ALTER TABLE task_sessions VALIDATE CONSTRAINT ck_task_sessions_length;
+
+ALTER TABLE task_sessions DROP CONSTRAINT IF EXISTS ck_task_sessions_length;
+ALTER TABLE task_sessions ADD CONSTRAINT ck_task_sessions_length
+    CHECK (end_at > start_at AND end_at - start_at <= interval '24 hours') NOT VALID;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM task_sessions
+        WHERE NOT (end_at > start_at AND end_at - start_at <= interval '24 hours')
+    ) THEN
+        ALTER TABLE task_sessions VALIDATE CONSTRAINT ck_task_sessions_length;
+    END IF;
+END
+$$;
@@ -0,0 +1,27 @@
+-- 0007_task_overdue_counted.sql
+-- tasks.overdue_counted: whether user_daily_stats.tasks_overdue counts the
+-- task (app.rollups). Until now every task with a due date that wasn't
+-- completed on time was counted, including open tasks not yet due; the
+-- flags and the tasks_overdue column are recomputed here with the rule
+-- in rollups.is_overdue().
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS overdue_counted BOOLEAN DEFAULT false NOT NULL;
+
+UPDATE tasks SET overdue_counted = true
+WHERE (status = 'completed' AND completed_at > due_at)
+   OR (status NOT IN ('completed', 'cancelled') AND due_at < now());
+
+-- Open tasks still to be counted when their due date passes
+CREATE INDEX IF NOT EXISTS ix_tasks_overdue_pending ON tasks (due_at)
+WHERE NOT overdue_counted AND status NOT IN ('completed', 'cancelled');
+
+UPDATE user_daily_stats SET tasks_overdue = 0, updated_at = now()
+WHERE tasks_overdue <> 0;
+
+INSERT INTO user_daily_stats (user_id, day, tasks_overdue, updated_at)
+SELECT user_id, (due_at AT TIME ZONE 'UTC')::date, count(*), now()
+FROM tasks
+WHERE overdue_counted
+GROUP BY 1, 2
+ON CONFLICT (user_id, day) DO UPDATE
+SET tasks_overdue = EXCLUDED.tasks_overdue, updated_at = now();
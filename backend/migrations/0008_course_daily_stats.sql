@@ -0,0 +1,18 @@
+-- 0008_course_daily_stats.sql
+-- Per-course workload for /api/admin/analytics (app.admin_analytics).
+-- Fill it afterwards with
+--   python -m app.cli refresh-analytics --full
+
+CREATE TABLE IF NOT EXISTS course_daily_stats (
+    institution_id UUID NOT NULL,
+    day DATE NOT NULL,
+    course VARCHAR NOT NULL,
+    active_students INTEGER DEFAULT 0 NOT NULL,
+    planned_minutes INTEGER DEFAULT 0 NOT NULL,
+    completed_minutes INTEGER DEFAULT 0 NOT NULL,
+    skipped_sessions INTEGER DEFAULT 0 NOT NULL,
+    tasks_completed INTEGER DEFAULT 0 NOT NULL,
+    tasks_overdue INTEGER DEFAULT 0 NOT NULL,
+    PRIMARY KEY (institution_id, day, course),
+    FOREIGN KEY (institution_id) REFERENCES institutions (id) ON DELETE CASCADE
+);
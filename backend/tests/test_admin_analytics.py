@@ -0,0 +1,96 @@
+# tests/test_admin_analytics.py
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app import admin_analytics
+
+UTC = timezone.utc
+DAY = datetime(2026, 3, 10, tzinfo=UTC)
+
+
+async def _insert(conn, table: str, **values):
+    columns = ", ".join(values)
+    params = ", ".join(f":{name}" for name in values)
+    return (await conn.execute(
+        text(f"INSERT INTO {table} ({columns}) VALUES ({params}) RETURNING id"), values
+    )).scalar_one()
+
+
+async def _member(conn, institution_id, role: str, course_title: str):
+    user_id = uuid4()
+    await _insert(conn, "users", id=user_id, email=f"{user_id}@analytics.test", password_hash="x")
+    await _insert(conn, "institution_users", institution_id=institution_id, user_id=user_id, role=role)
+    course_id = await _insert(conn, "courses", user_id=user_id, title=course_title)
+    return user_id, course_id
+
+
+async def _session(conn, user_id, task_id, start: datetime, minutes: int, status: str):
+    await _insert(
+        conn, "task_sessions", user_id=user_id, task_id=task_id,
+        start_at=start, end_at=start + timedelta(minutes=minutes), status=status,
+    )
+
+
+async def _course_days(conn, institution_id):
+    rows = await conn.execute(
+        text(
+            "SELECT day, course, active_students, planned_minutes, completed_minutes,"
+            " skipped_sessions, tasks_completed FROM course_daily_stats"
+            " WHERE institution_id = :id ORDER BY day, course"
+        ),
+        {"id": institution_id},
+    )
+    return [tuple(row) for row in rows]
+
+
+def test_course_workload_groups_students_courses_by_title(database):
+    async def test(conn):
+        institution_id = await _insert(conn, "institutions", name="Analytics test")
+        alice, alice_math = await _member(conn, institution_id, "student", "Math ")
+        bob, bob_math = await _member(conn, institution_id, "student", "math")
+        teacher, teacher_math = await _member(conn, institution_id, "teacher", "Math")
+
+        alice_task = await _insert(conn, "tasks", user_id=alice, title="Algebra", course_id=alice_math)
+        bob_task = await _insert(
+            conn, "tasks", user_id=bob, title="Geometry", course_id=bob_math,
+            status="completed", completed_at=DAY + timedelta(hours=12),
+        )
+        no_course = await _insert(conn, "tasks", user_id=bob, title="Chores")
+        teacher_task = await _insert(conn, "tasks", user_id=teacher, title="Marking", course_id=teacher_math)
+
+        await _session(conn, alice, alice_task, DAY + timedelta(hours=10), 60, "completed")
+        await _session(conn, bob, bob_task, DAY + timedelta(hours=10), 30, "planned")
+        await _session(conn, bob, no_course, DAY + timedelta(hours=14), 45, "completed")
+        await _session(conn, teacher, teacher_task, DAY + timedelta(hours=9), 90, "completed")
+
+        result = await admin_analytics.refresh(conn, full=True)
+        assert result["mode"] == "full"
+        assert await _course_days(conn, institution_id) == [(DAY.date(), "math", 2, 90, 60, 0, 1)]
+
+        # A new session shows up in the next incremental refresh through
+        # the rollup row it touches
+        await _session(conn, alice, alice_task, DAY + timedelta(hours=16), 30, "skipped")
+        await conn.execute(
+            text(
+                "INSERT INTO user_daily_stats (user_id, day, planned_minutes, skipped_sessions, updated_at)"
+                " VALUES (:u, :day, 30, 1, clock_timestamp() + interval '1 second')"
+                " ON CONFLICT (user_id, day) DO UPDATE SET updated_at = excluded.updated_at"
+            ),
+            {"u": alice, "day": DAY.date()},
+        )
+        result = await admin_analytics.refresh(conn)
+        assert result["mode"] == "incremental"
+        assert await _course_days(conn, institution_id) == [(DAY.date(), "math", 2, 120, 60, 1, 1)]
+
+    database(test)
+
+
+def test_refresh_skips_when_refreshed_recently(database):
+    async def test(conn):
+        assert await admin_analytics.refresh(conn) is not None
+        assert await admin_analytics.refresh(conn, min_interval=timedelta(minutes=5)) is None
+        assert await admin_analytics.refresh(conn, min_interval=timedelta(0)) is not None
+
+    database(test)
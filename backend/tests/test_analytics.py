@@ -0,0 +1,37 @@
+# tests/test_analytics.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import analytics
+
+
+def _trends(tz: str):
+    return asyncio.run(analytics.analytics_trends(days=30, tz=tz, db=None, current_user=None))
+
+
+@pytest.mark.parametrize("tz", ["Not/AZone", "../etc/passwd"])
+def test_trends_rejects_unknown_zones(tz):
+    with pytest.raises(HTTPException) as error:
+        _trends(tz)
+    assert error.value.status_code == 400
+
+
+def test_trends_rejects_zones_the_database_lacks(monkeypatch):
+    # Valid for zoneinfo, missing from pg_timezone_names
+    monkeypatch.setattr(analytics, "_postgres_time_zones", frozenset({"UTC"}))
+    with pytest.raises(HTTPException) as error:
+        _trends("Europe/Berlin")
+    assert error.value.status_code == 400
+
+
+def test_postgres_time_zones(database, monkeypatch):
+    monkeypatch.setattr(analytics, "_postgres_time_zones", None)
+
+    async def test(conn):
+        zones = await analytics.postgres_time_zones(conn)
+        assert {"UTC", "Europe/Berlin"} <= zones
+        assert "Not/AZone" not in zones
+
+    database(test)
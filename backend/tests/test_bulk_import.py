@@ -0,0 +1,85 @@
+# tests/test_bulk_import.py
+import asyncio
+import csv
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app import bulk_import
+from app.bulk_import import ImportFormatError
+
+
+class _StagingRecorder:
+    """Stands in for the session: keeps the rows sent to the staging table."""
+
+    def __init__(self):
+        self.rows = []
+
+    async def execute(self, statement, rows=None):
+        self.rows.extend(rows)
+
+
+def _stage(data: bytes, batch_size: int = 1000) -> list[dict]:
+    db = _StagingRecorder()
+    upload = UploadFile(io.BytesIO(data), filename="users.csv")
+
+    async def run():
+        bulk_import.IMPORT_BATCH_SIZE, previous = batch_size, bulk_import.IMPORT_BATCH_SIZE
+        try:
+            await bulk_import._stage_rows(db, upload)
+        finally:
+            bulk_import.IMPORT_BATCH_SIZE = previous
+
+    asyncio.run(run())
+    return db.rows
+
+
+def test_quoted_fields_may_contain_newlines():
+    data = (
+        "\ufeffemail,mobile_number,user_id,role\r\n"
+        'ana@example.com,1,"Ana\r\nMaria",student\r\n'
+        "\r\n"
+        'bo@example.com,2,"Bo ""B"" Li",teacher\r\n'
+    ).encode("utf-8")
+    rows = _stage(data)
+    assert [(row["row_no"], row["name"], row["error"]) for row in rows] == [
+        (2, "Ana\r\nMaria", None),
+        (5, 'Bo "B" Li', None),
+    ]
+
+
+def test_rows_are_staged_in_batches():
+    lines = ["email,mobile_number,user_id,role"]
+    lines += [f"user{n}@example.com,,User {n},student" for n in range(7)]
+    rows = _stage("\n".join(lines).encode("utf-8"), batch_size=3)
+    assert [row["row_no"] for row in rows] == list(range(2, 9))
+
+
+def test_row_errors():
+    data = b"email,mobile_number,user_id,role\nnot-an-email,,A,student\nc@example.com,,C,parent\n,,D,teacher\n"
+    assert [row["error"] for row in _stage(data)] == [
+        "Invalid email",
+        "Role must be one of: student, teacher",
+        "Missing email",
+    ]
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"", "CSV file is empty"),
+    (b"email,role\n", "CSV header is missing columns: mobile_number, user_id"),
+])
+def test_bad_header(data, message):
+    with pytest.raises(ImportFormatError, match=message):
+        _stage(data)
+
+
+def test_oversized_field_is_a_format_error():
+    # An unbalanced quote swallows the rest of the file into one field
+    previous = csv.field_size_limit(64)
+    data = b'email,mobile_number,user_id,role\na@example.com,,"' + b"x" * 100 + b"\n"
+    try:
+        with pytest.raises(ImportFormatError, match="near line"):
+            _stage(data)
+    finally:
+        csv.field_size_limit(previous)
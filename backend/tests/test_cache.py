@@ -0,0 +1,34 @@
+# tests/test_cache.py
+from app.cache import TTLCache
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl_seconds=15)
+    cache.set("user", 1)
+    cache.set("admin", 2, ttl_seconds=5)
+
+    now[0] += 6
+    assert cache.get("user") == 1
+    assert cache.get("admin") is None
+    now[0] += 10
+    assert cache.get("user") is None
+
+
+def test_zero_ttl_disables_caching():
+    cache = TTLCache(maxsize=10, ttl_seconds=0)
+    cache.set("key", 1)
+    assert cache.get("key") is None
+    cache.set("key", 1, ttl_seconds=30)
+    assert cache.get("key") == 1
+
+
+def test_least_recently_used_entry_goes_first():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
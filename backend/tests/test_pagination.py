@@ -0,0 +1,64 @@
+# tests/test_pagination.py
+from collections import namedtuple
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app import models
+from app.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, page_size, paginate, split_page
+
+Row = namedtuple("Row", "id created_at")
+
+
+def _rows(count: int) -> list[Row]:
+    return [Row(UUID(int=n), datetime(2026, 1, 1, n, tzinfo=timezone.utc)) for n in range(count)]
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trip():
+    value, row_id = datetime(2026, 1, 1, 9, 30, tzinfo=timezone.utc), UUID(int=7)
+    assert decode_cursor(encode_cursor(value, row_id)) == (value, row_id)
+
+
+def test_bad_cursor_is_a_400():
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor("not a cursor")
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor, limit, expected", [
+    (None, None, None),
+    (None, 20, 20),
+    ("abc", None, DEFAULT_PAGE_SIZE),
+    ("abc", 20, 20),
+])
+def test_page_size_is_opt_in(cursor, limit, expected):
+    assert page_size(cursor, limit) == expected
+
+
+def test_paginate_fetches_one_extra_row():
+    query = paginate(select(models.Task.id), models.Task.created_at, models.Task.id, None, 20)
+    assert "LIMIT" in _sql(query)
+    assert "ORDER BY tasks.created_at DESC, tasks.id DESC" in _sql(query)
+
+
+def test_paginate_without_limit_fetches_everything():
+    query = paginate(select(models.Task.id), models.Task.created_at, models.Task.id, None, None)
+    assert "LIMIT" not in _sql(query)
+
+
+def test_split_page():
+    rows = _rows(5)
+    page, cursor = split_page(rows, 4)
+    assert page == rows[:4]
+    assert decode_cursor(cursor) == (rows[3].created_at, rows[3].id)
+
+    assert split_page(rows, 5) == (rows, None)
+    assert split_page(rows, None) == (rows, None)
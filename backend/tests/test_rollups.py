@@ -0,0 +1,92 @@
+# tests/test_rollups.py
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app import rollups
+from app.rollups import TaskState, is_overdue
+
+UTC = timezone.utc
+DUE = datetime(2026, 3, 10, 17, 0, tzinfo=UTC)
+
+
+def test_open_task_is_overdue_only_after_its_due_date():
+    assert not is_overdue("pending", DUE, None, DUE - timedelta(minutes=1))
+    assert not is_overdue("in_progress", DUE, None, DUE)
+    assert is_overdue("pending", DUE, None, DUE + timedelta(minutes=1))
+
+
+def test_completed_task_is_overdue_only_if_late():
+    later = DUE + timedelta(days=5)
+    assert not is_overdue("completed", DUE, DUE - timedelta(hours=1), later)
+    assert is_overdue("completed", DUE, DUE + timedelta(hours=1), later)
+
+
+def test_cancelled_and_undated_tasks_are_never_overdue():
+    later = DUE + timedelta(days=5)
+    assert not is_overdue("cancelled", DUE, None, later)
+    assert not is_overdue("pending", None, None, later)
+
+
+def test_naive_due_dates_are_utc():
+    assert is_overdue("pending", DUE.replace(tzinfo=None), None, DUE + timedelta(seconds=1))
+
+
+def test_only_counted_tasks_contribute_to_tasks_overdue():
+    not_due_yet = TaskState("pending", DUE, None, overdue=False)
+    assert rollups._task_contributions(not_due_yet) == {}
+
+    overdue = TaskState("pending", DUE, None, overdue=True)
+    assert rollups._task_contributions(overdue) == {(date(2026, 3, 10), "tasks_overdue"): 1}
+
+    completed_late = TaskState("completed", DUE, DUE + timedelta(days=1), overdue=True)
+    assert rollups._task_contributions(completed_late) == {
+        (date(2026, 3, 10), "tasks_overdue"): 1,
+        (date(2026, 3, 11), "tasks_completed"): 1,
+    }
+
+
+async def _stats(conn, user_id) -> dict:
+    rows = await conn.execute(
+        text("SELECT day, tasks_overdue, tasks_completed FROM user_daily_stats WHERE user_id = :u"),
+        {"u": user_id},
+    )
+    return {day: (overdue, completed) for day, overdue, completed in rows if overdue or completed}
+
+
+def test_task_becomes_overdue_after_creation(database):
+    async def test(conn):
+        user_id = uuid4()
+        await conn.execute(
+            text("INSERT INTO users (id, email, password_hash) VALUES (:id, :email, 'x')"),
+            {"id": user_id, "email": f"{user_id}@rollups.test"},
+        )
+        created = DUE - timedelta(days=3)
+        task_id = (await conn.execute(
+            text("INSERT INTO tasks (user_id, title, due_at) VALUES (:u, 'Essay', :due) RETURNING id"),
+            {"u": user_id, "due": DUE},
+        )).scalar_one()
+        state = TaskState("pending", DUE, None, is_overdue("pending", DUE, None, created))
+        await rollups.record_task_changes(conn, user_id, [(None, state)])
+        assert await _stats(conn, user_id) == {}
+
+        # Not due yet: nothing to count
+        await rollups.record_overdue(conn, DUE - timedelta(hours=1))
+        assert await _stats(conn, user_id) == {}
+
+        # Past due with no write to the task: counted once
+        assert await rollups.record_overdue(conn, DUE + timedelta(hours=1)) >= 1
+        await rollups.record_overdue(conn, DUE + timedelta(hours=2))
+        assert await _stats(conn, user_id) == {DUE.date(): (1, 0)}
+        flagged = await conn.scalar(text("SELECT overdue_counted FROM tasks WHERE id = :id"), {"id": task_id})
+        assert flagged
+
+        # Completing it late keeps it overdue and adds the completion
+        before = TaskState("pending", DUE, None, True)
+        completed_at = DUE + timedelta(days=1)
+        after = TaskState("completed", DUE, completed_at, is_overdue("completed", DUE, completed_at, completed_at))
+        await rollups.record_task_changes(conn, user_id, [(before, after)])
+        assert await _stats(conn, user_id) == {DUE.date(): (1, 0), completed_at.date(): (0, 1)}
+
+    database(test)
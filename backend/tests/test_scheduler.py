@@ -0,0 +1,116 @@
+# tests/test_scheduler.py
+# app.scheduler on generated inputs: every plan must have no overlaps,
+# stay inside free time and before due dates, account for every requested
+# minute, and not depend on input order.
+import random
+import uuid
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app import scheduler
+from benchmarks.bench_scheduler import SEMESTER_START, make_inputs, plan
+
+UTC = timezone.utc
+LONDON = ZoneInfo("Europe/London")
+
+
+def check_plan(tasks, free, planned, unscheduled, options) -> None:
+    by_id = {task.id: task for task in tasks}
+
+    previous_end = None
+    slot = 0
+    planned_minutes = {}
+    for session in planned:
+        assert session.end > session.start
+        assert session.end - session.start <= options.max_session_minutes
+        if previous_end is not None:
+            assert session.start >= previous_end, "overlapping sessions"
+        previous_end = session.end
+        while free[slot][1] <= session.start:
+            slot += 1
+        assert free[slot][0] <= session.start and session.end <= free[slot][1], "outside free time"
+        due = by_id[session.task_id].due
+        if due is not None and due > free[0][0]:
+            assert session.end <= due, "session after due date"
+        planned_minutes[session.task_id] = planned_minutes.get(session.task_id, 0) + session.end - session.start
+
+    for task in tasks:
+        left = unscheduled.get(task.id, (0, None))[0]
+        assert planned_minutes.get(task.id, 0) + left == task.minutes, "minutes don't add up"
+
+
+@pytest.mark.parametrize("task_count, days, busy_count, seed", [
+    (50, 14, 20, 1),
+    (2000, 120, 300, 42),   # more work than free time
+    (300, 30, 1500, 7),     # crowded calendar
+])
+@pytest.mark.parametrize("options", [
+    scheduler.ScheduleOptions(),
+    scheduler.ScheduleOptions(max_session_minutes=45, min_session_minutes=15, break_minutes=0),
+])
+def test_plan_is_valid(task_count, days, busy_count, seed, options):
+    start, end, tasks, busy = make_inputs(task_count, days, busy_count, seed)
+    free, planned, unscheduled = plan(start, end, tasks, busy, LONDON, options)
+    assert planned
+    check_plan(tasks, free, planned, unscheduled, options)
+
+
+def test_plan_does_not_depend_on_input_order():
+    options = scheduler.ScheduleOptions()
+    start, end, tasks, busy = make_inputs(2000, 60, 300, seed=42)
+    _, planned, unscheduled = plan(start, end, tasks, busy, LONDON, options)
+
+    random.Random(43).shuffle(tasks)
+    random.Random(44).shuffle(busy)
+    _, planned_again, unscheduled_again = plan(start, end, tasks, busy, LONDON, options)
+    assert planned_again == planned
+    assert unscheduled_again == unscheduled
+
+
+def test_earliest_deadline_then_priority_goes_first():
+    day = 24 * 60
+    urgent = scheduler.SchedulingTask(uuid.UUID(int=1), priority=0, due=SEMESTER_START + day, minutes=30)
+    important = scheduler.SchedulingTask(uuid.UUID(int=2), priority=5, due=None, minutes=30)
+    unimportant = scheduler.SchedulingTask(uuid.UUID(int=3), priority=1, due=None, minutes=30)
+    free = [(SEMESTER_START, SEMESTER_START + 120)]
+
+    planned, unscheduled = scheduler.schedule([unimportant, important, urgent], free)
+    assert [session.task_id for session in planned] == [urgent.id, important.id, unimportant.id]
+    assert unscheduled == {}
+
+
+def test_unscheduled_reasons():
+    free = [(SEMESTER_START + 600, SEMESTER_START + 660)]
+    too_late = scheduler.SchedulingTask(uuid.UUID(int=1), priority=0, due=SEMESTER_START + 610, minutes=60)
+    too_big = scheduler.SchedulingTask(uuid.UUID(int=2), priority=0, due=None, minutes=120)
+
+    planned, unscheduled = scheduler.schedule([too_late, too_big], free)
+    assert unscheduled[too_late.id] == (60, scheduler.DUE_BEFORE_FREE_TIME)
+    assert unscheduled[too_big.id] == (120 - 60, scheduler.NO_FREE_TIME)
+    assert planned == [scheduler.PlannedSession(too_big.id, SEMESTER_START + 600, SEMESTER_START + 660)]
+
+
+def test_interval_merge_and_subtract():
+    assert scheduler.merge_intervals([(5, 8), (0, 2), (2, 3), (7, 10), (4, 4)]) == [(0, 3), (5, 10)]
+    assert scheduler.subtract_intervals([(0, 10), (20, 30)], [(2, 4), (8, 22), (25, 26)]) == [
+        (0, 2), (4, 8), (22, 25), (26, 30),
+    ]
+
+
+def test_daily_windows_follow_local_time_across_dst():
+    # Clocks go forward in London on 2026-03-29
+    start = scheduler.to_minutes(datetime(2026, 3, 28, tzinfo=UTC))
+    end = scheduler.to_minutes(datetime(2026, 3, 30, tzinfo=UTC))
+    windows = scheduler.daily_windows(start, end, LONDON, time(9, 0), time(17, 0))
+    assert [(scheduler.from_minutes(s), scheduler.from_minutes(e)) for s, e in windows] == [
+        (datetime(2026, 3, 28, 9, 0, tzinfo=UTC), datetime(2026, 3, 28, 17, 0, tzinfo=UTC)),
+        (datetime(2026, 3, 29, 8, 0, tzinfo=UTC), datetime(2026, 3, 29, 16, 0, tzinfo=UTC)),
+    ]
+
+
+def test_to_minutes_reads_naive_times_as_utc():
+    naive = datetime(2026, 3, 1, 9, 0, 30)
+    assert scheduler.to_minutes(naive) == scheduler.to_minutes(naive.replace(tzinfo=UTC))
+    assert scheduler.to_minutes(naive) == scheduler.to_minutes(naive, round_up=False) + 1
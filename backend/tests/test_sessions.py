@@ -0,0 +1,92 @@
+# tests/test_sessions.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import HTTPException
+
+from app import schemas
+from app.routers.sessions import (
+    as_aware, check_range, schedule_sessions, schedule_window, validate_session_times,
+)
+
+UTC = timezone.utc
+
+
+def test_as_aware_reads_naive_times_as_utc():
+    assert as_aware(datetime(2026, 3, 1, 9, 0)) == datetime(2026, 3, 1, 9, 0, tzinfo=UTC)
+
+
+def test_as_aware_keeps_offsets():
+    value = datetime(2026, 3, 1, 9, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert as_aware(value) is value
+
+
+def test_check_range_accepts_mixed_bounds():
+    from_, to = check_range(datetime(2026, 3, 1), datetime(2026, 3, 2, tzinfo=UTC))
+    assert from_ == datetime(2026, 3, 1, tzinfo=UTC)
+    assert to - from_ == timedelta(days=1)
+
+
+@pytest.mark.parametrize("from_, to", [
+    (datetime(2026, 3, 2), datetime(2026, 3, 1, tzinfo=UTC)),
+    (datetime(2026, 3, 1, tzinfo=UTC), datetime(2026, 3, 1)),
+    (datetime(2026, 1, 1), datetime(2027, 1, 3, tzinfo=UTC)),
+])
+def test_check_range_rejects_empty_and_long_ranges(from_, to):
+    with pytest.raises(HTTPException) as raised:
+        check_range(from_, to)
+    assert raised.value.status_code == 400
+
+
+def test_validate_session_times_with_mixed_offsets():
+    start = datetime(2026, 3, 1, 9, 0)
+    assert validate_session_times(start, datetime(2026, 3, 1, 10, 0, tzinfo=UTC)) is None
+    assert validate_session_times(start, datetime(2026, 3, 1, 9, 0, tzinfo=UTC)) == "end_at must be after start_at"
+    assert validate_session_times(start, datetime(2026, 3, 2, 10, 0, tzinfo=UTC)) == "Sessions can't be longer than 24 hours"
+
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+def test_schedule_window_reads_naive_times_in_the_request_zone():
+    request = schemas.ScheduleRequest(
+        start_at=datetime(2026, 3, 2, 9, 0),
+        end_at=datetime(2026, 3, 3, 9, 0),
+        tz="America/New_York",
+    )
+    start, end = schedule_window(request, ZoneInfo(request.tz), NOW)
+    assert start == datetime(2026, 3, 2, 14, 0, tzinfo=UTC)
+    assert end == datetime(2026, 3, 3, 14, 0, tzinfo=UTC)
+
+
+def test_schedule_window_mixes_naive_and_aware_bounds():
+    request = schemas.ScheduleRequest(start_at=datetime(2026, 3, 2, 9, 0), end_at=datetime(2026, 3, 3, tzinfo=UTC))
+    start, end = schedule_window(request, UTC, NOW)
+    assert (start, end) == (datetime(2026, 3, 2, 9, 0, tzinfo=UTC), datetime(2026, 3, 3, tzinfo=UTC))
+
+
+def test_schedule_window_starts_no_earlier_than_now():
+    request = schemas.ScheduleRequest(start_at=datetime(2026, 2, 1))
+    start, end = schedule_window(request, UTC, NOW)
+    assert start == NOW
+    assert end == NOW + timedelta(days=14)
+
+
+@pytest.mark.parametrize("start_at, end_at", [
+    (None, datetime(2026, 3, 1, 11, 0)),
+    (datetime(2026, 3, 1), datetime(2027, 3, 5)),
+])
+def test_schedule_window_rejects_past_and_long_ranges(start_at, end_at):
+    request = schemas.ScheduleRequest(start_at=start_at, end_at=end_at)
+    with pytest.raises(HTTPException) as raised:
+        schedule_window(request, UTC, NOW)
+    assert raised.value.status_code == 400
+
+
+def test_schedule_rejects_min_session_longer_than_max():
+    request = schemas.ScheduleRequest(max_session_minutes=30, min_session_minutes=60)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(schedule_sessions(request, db=None, current_user=None))
+    assert raised.value.status_code == 400
@@ -0,0 +1,40 @@
+# tests/test_streaming.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app import models, streaming
+from app.streaming import ExportSlots
+
+
+def test_export_slots_limit_and_release():
+    slots = ExportSlots(2)
+    first, second = slots.acquire(), slots.acquire()
+    with pytest.raises(HTTPException) as raised:
+        slots.acquire()
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == str(streaming.EXPORT_RETRY_AFTER_SECONDS)
+
+    first()
+    first()  # releasing twice frees one slot only
+    assert slots.active == 1
+    slots.acquire()
+    assert slots.active == 2
+    second()
+
+
+def test_streaming_export_is_refused_when_slots_are_taken(monkeypatch):
+    monkeypatch.setattr(streaming, "export_slots", ExportSlots(1))
+    query = select(models.Task.id, models.Task.title)
+
+    response = streaming.streaming_export(query, "csv", filename="tasks")
+    with pytest.raises(HTTPException) as raised:
+        streaming.streaming_export(query, "ndjson")
+    assert raised.value.status_code == 503
+
+    # A client that disconnects before the body starts still frees the slot
+    asyncio.run(response.background())
+    assert streaming.export_slots.active == 0
+    streaming.streaming_export(query, "csv")
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useAdminAuth } from '@/context/AdminAuthContext';
 import { GlassCard } from '@/components/GlassCard';
+import { fetchAllPages } from '@/lib/pagination';
 
 interface DetailsProps {
   isDeveloper?: boolean;
@@ -32,15 +33,14 @@ const Details = ({ isDeveloper = false }: DetailsProps) => {
           ? 'http://localhost:8000/api/admin/users?all=true'
           : `http://localhost:8000/api/admin/users?institution_id=${admin?.institution_id}`;
         
-        const response = await fetch(url, {
+        const data = await fetchAllPages<User>(url, {
           headers: { 'Authorization': `Bearer ${token}` }
         });
-        const data = await response.json();
         setUsers(data);
 
         // Extract unique institutions for developer
         if (isDeveloper) {
-          const instNames = [...new Set(data.map((u: User) => u.institution_name))];
+          const instNames = [...new Set(data.map((u) => u.institution_name))];
           setInstitutions(instNames);
         }
       } catch (error) {
@@ -13,27 +13,18 @@ const DeveloperDashboardOverview = () => {
     const fetchStats = async () => {
       try {
         const token = localStorage.getItem('admin_token');
-        
-        // Fetch institutions count
-        const instRes = await fetch('http://localhost:8000/api/admin/institutions', {
-          headers: { 'Authorization': `Bearer ${token}` }
-        });
-        const institutions = await instRes.json();
 
-        // Fetch all users count
-        const usersRes = await fetch('http://localhost:8000/api/admin/users?all=true', {
+        // Counts are aggregated server-side
+        const statsRes = await fetch('http://localhost:8000/api/admin/stats', {
           headers: { 'Authorization': `Bearer ${token}` }
         });
-        const users = await usersRes.json();
-
-        const teachers = users.filter((u: any) => u.role === 'teacher').length;
-        const students = users.filter((u: any) => u.role === 'student').length;
+        const data = await statsRes.json();
 
         setStats({
-          totalInstitutions: institutions.length,
-          totalUsers: users.length,
-          totalTeachers: teachers,
-          totalStudents: students,
+          totalInstitutions: data.total_institutions,
+          totalUsers: data.total_users,
+          totalTeachers: data.users_by_role.teacher ?? 0,
+          totalStudents: data.users_by_role.student ?? 0,
         });
       } catch (error) {
         console.error('Error fetching stats:', error);
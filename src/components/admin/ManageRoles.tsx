@@ -3,6 +3,7 @@ import { useAdminAuth } from '@/context/AdminAuthContext';
 import { GlassCard } from '@/components/GlassCard';
 import { useToast } from '@/hooks/use-toast';
 import { Check } from 'lucide-react';
+import { fetchAllPages } from '@/lib/pagination';
 
 interface ManageRolesProps {
   isDeveloper?: boolean;
@@ -40,10 +41,9 @@ const ManageRoles = ({ isDeveloper = false }: ManageRolesProps) => {
           ? 'http://localhost:8000/api/admin/teachers?all=true'
           : `http://localhost:8000/api/admin/teachers?institution_id=${institutionId}`;
         
-        const teachersRes = await fetch(teachersUrl, {
+        const teachersData = await fetchAllPages<Teacher>(teachersUrl, {
           headers: { 'Authorization': `Bearer ${token}` }
         });
-        const teachersData = await teachersRes.json();
         setTeachers(teachersData);
 
         // Fetch students
@@ -51,10 +51,9 @@ const ManageRoles = ({ isDeveloper = false }: ManageRolesProps) => {
           ? 'http://localhost:8000/api/admin/students?all=true'
           : `http://localhost:8000/api/admin/students?institution_id=${institutionId}`;
         
-        const studentsRes = await fetch(studentsUrl, {
+        const studentsData = await fetchAllPages<Student>(studentsUrl, {
           headers: { 'Authorization': `Bearer ${token}` }
         });
-        const studentsData = await studentsRes.json();
         setStudents(studentsData);
       } catch (error) {
         console.error('Error fetching data:', error);
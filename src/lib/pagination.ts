@@ -0,0 +1,22 @@
+// Cursor-paginated list endpoints (backend/app/pagination.py): each page
+// is a JSON array, and the cursor for the next one is in X-Next-Cursor.
+const PAGE_SIZE = 1000;
+
+export async function fetchAllPages<T>(url: string, init?: RequestInit): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const pageUrl = new URL(url);
+    pageUrl.searchParams.set('limit', String(PAGE_SIZE));
+    if (cursor) {
+      pageUrl.searchParams.set('cursor', cursor);
+    }
+    const response = await fetch(pageUrl, init);
+    if (!response.ok) {
+      throw new Error(`GET ${url} failed: ${response.status}`);
+    }
+    items.push(...(await response.json()));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}